@@ -2,56 +2,97 @@
 api/routes_approval.py — API endpoints for handling visitor approval workflows.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
-from app.core.config import SessionLocal
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.dependencies.db_dep import get_db
+from app.dependencies.auth_dep import get_current_user
 from app.services.approval_service import ApprovalService
-from app.schemas.approval import ApprovalOut, ApprovalAction
-from app.models import Approval
-from typing import Optional, Generator
+from app.schemas.approval import ApprovalOut, ApprovalAction, ApprovalBatchAction, ApprovalBatchResult
+from app.models import ApprovalStatus
+from app.repos.approval_repo import ApprovalRepository
+from app.utils.pagination import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, decode_cursor, parse_fields, project
+)
+from typing import Optional
 
 router = APIRouter(prefix="/approvals", tags=["Approvals"])
 
-def get_db() -> Generator[Session, None, None]:
+@router.post("/batch-action", response_model=ApprovalBatchResult)
+async def batch_update_approval_status(
+    action: ApprovalBatchAction,
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_current_user)
+):
     """
-    Dependency to provide a SQLAlchemy database session.
+    Approve or reject many of the current host's approvals in one request.
+    - One set-based UPDATE; approvals owned by other employees are skipped
+    - Badges for newly approved visitors are queued as a single background job
     """
-    db = SessionLocal()
+    service = ApprovalService(db)
     try:
-        yield db
-    finally:
-        db.close()
+        updated = await service.process_batch(action.approval_ids, current_user["id"], action.status.value)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    changed = set(updated)
+    skipped = [approval_id for approval_id in dict.fromkeys(action.approval_ids) if approval_id not in changed]
+    return ApprovalBatchResult(status=action.status, updated=sorted(changed), skipped=skipped)
+
 
 @router.get("/{employee_id}", response_model=list[ApprovalOut])
-def get_approvals(
+async def get_approvals(
     employee_id: int,
+    response: Response,
     status: Optional[str] = Query(None, description="Filter approvals by status"),
-    db: Session = Depends(get_db)
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description=f"Page size ({DEFAULT_PAGE_SIZE} with a cursor)"),
+    cursor: Optional[str] = Query(None, description=f"Value of the {NEXT_CURSOR_HEADER} header from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,status,requested_at"),
+    db: AsyncSession = Depends(get_db)
 ):
     """
-    Get all approval requests for a specific employee.
+    Get approval requests for a specific employee, newest first.
     - Optional filter: status (e.g., PENDING, APPROVED, REJECTED)
+    - Keyset pagination: pass the X-Next-Cursor response header back as `cursor`
+    - Without `limit` and `cursor` every approval is returned (the pre-pagination response)
+    - Optional sparse fields; the visitor is only joined when `visitor` is requested
     """
-    query = db.query(Approval).options(joinedload(Approval.visitor)).filter(Approval.employee_id == employee_id)
+    try:
+        status_filter = ApprovalStatus(status.upper()) if status else None
+        after = decode_cursor(cursor) if cursor else None
+        if after and limit is None:
+            limit = DEFAULT_PAGE_SIZE
+        selected = parse_fields(fields, ApprovalOut.model_fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    if status:
-        query = query.filter(Approval.status == status.upper())
+    page = await ApprovalRepository(db).list_for_employee(
+        employee_id,
+        limit,
+        status=status_filter,
+        cursor=after,
+        with_visitor=selected is None or "visitor" in selected
+    )
 
-    return query.all()
+    headers = {NEXT_CURSOR_HEADER: page.next_cursor} if page.next_cursor else {}
+    if selected is not None:
+        return JSONResponse(project(page.items, ApprovalOut, selected), headers=headers)
+    response.headers.update(headers)
+    return page.items
 
 
 @router.post("/{approval_id}/action", response_model=ApprovalOut)
-def update_approval_status(
+async def update_approval_status(
     approval_id: int,
     action: ApprovalAction,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Update the status of an approval request (approve or reject).
     - Changes status and records decision timestamp.
     """
     service = ApprovalService(db)
-    updated = service.process_approval(approval_id, action.status)
+    updated = await service.process_approval(approval_id, action.status)
 
     if not updated:
         raise HTTPException(
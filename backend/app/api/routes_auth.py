@@ -3,28 +3,18 @@ api/routes_auth.py — Handles user authentication (JWT login) for employees.
 """
 
 from fastapi import APIRouter, HTTPException, status, Depends
-from sqlalchemy.orm import Session
-from app.core.config import SessionLocal
-from app.utils.auth import verify_password, create_access_token
-from app.models import Employee
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.dependencies.db_dep import get_db
+from app.repos.employee_repo import EmployeeRepository
+from app.utils.auth import verify_password_async, create_access_token, PasswordHasherBusy
 from app.schemas.auth_schemas import LoginInput, TokenResponse
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
-def get_db():
-    """
-    Dependency that provides a database session.
-    """
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.post("/login", response_model=TokenResponse)
-def login(
+async def login(
     data: LoginInput,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Logs in an employee and returns a JWT access token.
@@ -35,9 +25,22 @@ def login(
     email = data.email
     password = data.password
 
-    employee = db.query(Employee).filter_by(email=email).first()
+    employee = await EmployeeRepository(db).get_employee_by_email(email)
+
+    # Give the pooled connection back while the password is checked
+    await db.close()
+
+    # bcrypt is CPU-bound; it runs in a bounded process pool and sheds load when that is full
+    try:
+        verified = bool(employee) and await verify_password_async(password, employee.password)
+    except PasswordHasherBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many login attempts in progress. Please retry shortly.",
+            headers={"Retry-After": "1"}
+        )
 
-    if not employee or not verify_password(password, employee.password):
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials"
@@ -0,0 +1,66 @@
+"""
+api/routes_media.py — Serves photos and badges stored by the local storage backend.
+"""
+
+import mimetypes
+import os
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse, Response
+from app.utils.storage import get_storage, LocalStorage
+
+router = APIRouter(prefix="/media", tags=["Media"])
+
+# When set (e.g. "/protected-media"), nginx serves the file itself via X-Accel-Redirect
+MEDIA_ACCEL_REDIRECT_PREFIX = os.getenv("MEDIA_ACCEL_REDIRECT_PREFIX")
+
+# Stored objects are content-addressed and never change
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class SendfileResponse(FileResponse):
+    """
+    FileResponse that hands whole-file responses to the server for zero-copy
+    sendfile when the ASGI server supports the `http.response.pathsend` extension.
+    Range requests and other servers fall back to FileResponse's chunked reads.
+    """
+
+    async def __call__(self, scope, receive, send):
+        headers = {k.lower(): v for k, v in scope.get("headers", [])}
+        pathsend = "http.response.pathsend" in scope.get("extensions", {})
+        if not pathsend or b"range" in headers or scope["method"].upper() == "HEAD":
+            return await super().__call__(scope, receive, send)
+
+        stat_result = os.stat(self.path)
+        self.set_stat_headers(stat_result)
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        await send({"type": "http.response.pathsend", "path": str(self.path)})
+
+
+@router.api_route("/{path:path}", methods=["GET", "HEAD"])
+def get_media(path: str, request: Request):
+    """
+    Serve a locally stored photo or badge.
+
+    - Supports HTTP range requests
+    - Uses zero-copy sendfile when the server (or an nginx X-Accel-Redirect) allows it
+    """
+    storage = get_storage()
+    if not isinstance(storage, LocalStorage):
+        raise HTTPException(status_code=404, detail="Media not found")
+
+    file_path = storage.resolve(path)
+    if not file_path or not os.path.isfile(file_path):
+        raise HTTPException(status_code=404, detail="Media not found")
+
+    media_type = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+
+    if MEDIA_ACCEL_REDIRECT_PREFIX:
+        return Response(
+            media_type=media_type,
+            headers={
+                "X-Accel-Redirect": f"{MEDIA_ACCEL_REDIRECT_PREFIX.rstrip('/')}/{path}",
+                "Cache-Control": CACHE_CONTROL,
+            }
+        )
+
+    return SendfileResponse(file_path, media_type=media_type, headers={"Cache-Control": CACHE_CONTROL})
@@ -2,27 +2,26 @@
 api/routes_preapproval.py — Handles employee visitor pre-approval logic.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.core.config import SessionLocal
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.dependencies.db_dep import get_db
 from app.schemas.preapproval import PreApprovalCreate, PreApprovalOut
 from app.services.preapproval_service import PreApprovalService
 from app.dependencies.auth_dep import get_current_user
-from app.models import Visitor, Employee
+from app.repos.visitor_repo import VisitorRepository
+from app.repos.employee_repo import EmployeeRepository
+from app.utils.pagination import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, decode_cursor, parse_fields, project
+)
+from typing import Optional
 
 router = APIRouter(prefix="/preapprovals", tags=["PreApprovals"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.post("/", response_model=PreApprovalOut, status_code=status.HTTP_201_CREATED)
-def create_preapproval(
+async def create_preapproval(
     data: PreApprovalCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user=Depends(get_current_user)
 ):
     """
@@ -39,24 +38,48 @@ def create_preapproval(
         raise HTTPException(status_code=403, detail="Unauthorized preapproval attempt")
 
     # Validate that visitor exists
-    visitor = db.query(Visitor).filter_by(id=data.visitor_id).first()
+    visitor = await VisitorRepository(db).get_visitor_by_id(data.visitor_id)
     if not visitor:
         raise HTTPException(status_code=404, detail="Visitor not found")
 
     # Validate employee is the host for this visitor
-    employee = db.query(Employee).get(current_user["id"])
+    employee = await EmployeeRepository(db).get_employee_by_id(current_user["id"])
     if visitor.host_employee_name.strip().lower() != employee.name.strip().lower():
         raise HTTPException(status_code=403, detail="Only the assigned host can pre-approve this visitor.")
 
     # Delegate to service
     service = PreApprovalService(db)
-    pa = service.schedule_visit(**data.dict())
+    pa = await service.schedule_visit(**data.dict())
     return pa
 
 @router.get("/{employee_id}", response_model=list[PreApprovalOut])
-def list_preapprovals(employee_id: int, db: Session = Depends(get_db)):
+async def list_preapprovals(
+    employee_id: int,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description=f"Page size ({DEFAULT_PAGE_SIZE} with a cursor)"),
+    cursor: Optional[str] = Query(None, description=f"Value of the {NEXT_CURSOR_HEADER} header from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,valid_from,valid_to"),
+    db: AsyncSession = Depends(get_db)
+):
     """
-    List all pre-approvals scheduled by a given employee.
+    List pre-approvals scheduled by a given employee, newest first.
+    - Keyset pagination: pass the X-Next-Cursor response header back as `cursor`
+    - Without `limit` and `cursor` every pre-approval is returned (the pre-pagination response)
+    - Optional sparse fields
     """
+    try:
+        after = decode_cursor(cursor) if cursor else None
+        if after and limit is None:
+            limit = DEFAULT_PAGE_SIZE
+        selected = parse_fields(fields, PreApprovalOut.model_fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     service = PreApprovalService(db)
-    return service.list_preapprovals(employee_id)
+    page = await service.list_preapprovals(employee_id, limit, after)
+
+    headers = {NEXT_CURSOR_HEADER: page.next_cursor} if page.next_cursor else {}
+    if selected is not None:
+        return JSONResponse(project(page.items, PreApprovalOut, selected), headers=headers)
+    response.headers.update(headers)
+    return page.items
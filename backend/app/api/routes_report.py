@@ -0,0 +1,64 @@
+"""
+api/routes_report.py — Visit analytics reports, streamed as CSV or NDJSON.
+"""
+
+from datetime import date, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from app.core.config import AsyncSessionLocal
+from app.dependencies.auth_dep import get_current_user
+from app.services.report_service import (
+    ReportService, REPORT_MAX_DAYS, parse_group_by, report_columns
+)
+from app.utils.record_stream import ENCODERS
+from app.logger_config import setup_logger
+
+logger = setup_logger(__name__)
+router = APIRouter(prefix="/reports", tags=["Reports"])
+
+
+@router.get("/visits")
+async def visit_report(
+    start: date = Query(..., description="First UTC day (YYYY-MM-DD)"),
+    end: Optional[date] = Query(None, description="Last UTC day, inclusive (default: start)"),
+    group_by: str = Query("day", description="Comma-separated dimensions: day, hour, department, host"),
+    department: Optional[str] = Query(None, description="Only hosts in this department"),
+    host_id: Optional[int] = Query(None, description="Only this host"),
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    current_user=Depends(get_current_user)
+):
+    """
+    Aggregate visit counts and average visit length over a day range.
+
+    - Served from the hourly rollup, so the cost does not grow with visitor volume
+    - Rows are streamed as they are read; the query runs in its own session
+    - Days after the last compaction reflect live counters
+    """
+    end = end or start
+    if end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    if end - start >= timedelta(days=REPORT_MAX_DAYS):
+        raise HTTPException(status_code=400, detail=f"Reports cover at most {REPORT_MAX_DAYS} days")
+    try:
+        dimensions = parse_group_by(group_by)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    encoder, media_type = ENCODERS[format]
+    columns = report_columns(dimensions)
+    logger.info(f"📊 Visit report {start}..{end} by {dimensions or 'total'} requested by employee {current_user['id']}")
+
+    async def body():
+        # The request's session would close before streaming ends, so the report opens its own
+        async with AsyncSessionLocal() as db:
+            rows = ReportService(db).visit_rows(start, end, dimensions, department, host_id)
+            async for chunk in encoder(columns, rows):
+                yield chunk
+
+    filename = f"visits_{start}_{end}.{format}"
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -2,141 +2,206 @@
 Visitor Route Module — Manages registration, badge issuance, pre-approvals, and check-out flows.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import func
-from sqlalchemy.orm import Session
-from datetime import datetime
-from app.models import Employee, PreApproval, Approval, ApprovalStatus
-from app.schemas.visitor import VisitorCreate, VisitorOut
+from fastapi import APIRouter, Depends, HTTPException, status, Form, File, UploadFile, Request, Query, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from app.models import ApprovalStatus
+from app.schemas.visitor import VisitorCreate, VisitorOut, VisitorImportResult
 from app.schemas.approval import ApprovalOut
+from app.schemas.scan import ScanDecisionOut
 from app.services.visitor_service import VisitorService
-from app.core.config import SessionLocal
-from app.utils.email import send_visitor_notification, send_badge_email
-from app.utils.qr_generator import generate_qr_and_upload
+from app.services.visitor_import_service import VisitorImportService
+from app.services.visitor_export_service import VisitorExportService
+from app.repos.visitor_repo import VisitorRepository
+from app.utils.employee_directory import employee_directory
+from app.core.config import AsyncSessionLocal
+from app.dependencies.db_dep import get_db
+from app.dependencies.auth_dep import get_current_user
+from app.utils.email import send_visitor_notification
+from app.utils.auth import create_visitor_watch_token
+from app.utils.image_uploader import PHOTO_MAX_UPLOAD_BYTES
+from app.utils.record_stream import ENCODERS, iter_csv_records, iter_ndjson_records
+from app.utils.pagination import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER, decode_cursor, decode_rank_cursor
+)
 from app.logger_config import setup_logger
 
-logger = setup_logger()
+logger = setup_logger(__name__)
 router = APIRouter(prefix="/visitors", tags=["Visitors"])
 
-def get_db():
-    db = SessionLocal()
+# Admitted visits never checked out drop off the on-site roster after this many hours (0 keeps them)
+ON_SITE_MAX_HOURS = int(os.getenv("ON_SITE_MAX_HOURS", "24"))
+
+# Bulk import parsers, selected by `format` or the request Content-Type
+IMPORT_PARSERS = {
+    "csv": iter_csv_records,
+    "ndjson": iter_ndjson_records,
+}
+IMPORT_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonlines": "ndjson",
+}
+
+# Declared before /{visitor_id} so "on-site" is not parsed as an ID
+@router.get("/on-site", response_model=list[VisitorOut])
+async def list_on_site_visitors(
+    response: Response,
+    department: Optional[str] = Query(None, description="Host department (case-insensitive)"),
+    host: Optional[str] = Query(None, description="Host employee name (case-insensitive)"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    cursor: Optional[str] = Query(None, description=f"Value of the {NEXT_CURSOR_HEADER} header from the previous page"),
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_current_user)
+):
+    """
+    Live roster of visitors in the building (admitted, not checked out), latest admission first.
+
+    - A visit counts once approved, by the host or by a pre-approval at the gate; pending,
+      rejected and no-show registrations never do
+    - Visits admitted more than ON_SITE_MAX_HOURS ago without a checkout are left out
+    - Optional filters: host department and host employee name
+    - X-Total-Count carries the headcount for the filters; X-Next-Cursor pages through the list
+    - Served from the partial index on admitted, open visits
+    """
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    since = datetime.now(timezone.utc) - timedelta(hours=ON_SITE_MAX_HOURS) if ON_SITE_MAX_HOURS else None
+    repo = VisitorRepository(db)
+    page = await repo.list_on_site(limit, department=department, host=host, since=since, cursor=after)
+    total = await repo.count_on_site(department=department, host=host, since=since)
+
+    response.headers[TOTAL_COUNT_HEADER] = str(total)
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return page.items
+
+# Declared before /{visitor_id} so "search" is not parsed as an ID
+@router.get("/search", response_model=list[VisitorOut])
+async def search_visitors(
+    response: Response,
+    q: str = Query(..., min_length=3, max_length=100, description="Part of a name, company or contact"),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    cursor: Optional[str] = Query(None, description=f"Value of the {NEXT_CURSOR_HEADER} header from the previous page"),
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_current_user)
+):
+    """
+    Fuzzy visitor search for the front desk, best match first.
+
+    - Matches substrings and near-misses (typos, partial words) of name and company, and
+      substrings of the contact compared on letters and digits only ("555 0102" finds "+1-555-0102")
+    - PostgreSQL uses the pg_trgm indexes; other databases an in-process trigram index
+    - X-Next-Cursor pages through the ranked results
+    """
     try:
-        yield db
-    finally:
-        db.close()
+        after = decode_rank_cursor(cursor) if cursor else None
+        page = await VisitorService(db).search(q.strip(), limit, cursor=after)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return page.items
+
+# Declared before /{visitor_id} so "export" is not parsed as an ID
+@router.get("/export")
+async def export_visitors(
+    since: Optional[datetime] = Query(None, description="Only visitors checked in at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only visitors checked in before this time"),
+    format: str = Query("ndjson", pattern="^(csv|ndjson)$"),
+    gzip: bool = Query(False, description="Compress the download on the fly"),
+    current_user=Depends(get_current_user)
+):
+    """
+    Full visitor history dump with each visitor's approvals and pre-approvals (compliance).
+
+    - One record per visitor; related rows are nested (JSON cells in CSV)
+    - Rows stream from a server-side cursor in fixed-size chunks, so memory stays constant
+    - The query runs in its own session, since the request's closes before streaming ends
+    """
+    if since and until and until <= since:
+        raise HTTPException(status_code=400, detail="until must be after since")
+
+    logger.info(f"📤 Visitor export ({format}{', gzip' if gzip else ''}) started by employee {current_user['id']}")
+
+    async def body():
+        async with AsyncSessionLocal() as db:
+            async for chunk in VisitorExportService(db).export(format, since, until, compress=gzip):
+                yield chunk
+
+    _, media_type = ENCODERS[format]
+    filename = f"visitors.{format}"
+    if gzip:
+        media_type, filename = "application/gzip", f"{filename}.gz"
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 @router.get("/{visitor_id}", response_model=VisitorOut)
-def get_visitor(visitor_id: int, db: Session = Depends(get_db)):
+async def get_visitor(visitor_id: int, db: AsyncSession = Depends(get_db)):
     """
     Fetch visitor details.
     If no approval exists or it is PENDING but falls within pre-approval window, auto-approve.
     """
     logger.info(f"Fetching visitor: {visitor_id}")
     service = VisitorService(db)
-    visitor = service.fetch_visitor(visitor_id)
-    if not visitor:
+    outcome = await service.scan_visitor(visitor_id)
+    if not outcome:
         raise HTTPException(status_code=404, detail="Visitor not found")
 
-    existing_approval = (
-        db.query(Approval)
-        .filter_by(visitor_id=visitor_id)
-        .order_by(Approval.requested_at.desc())
-        .first()
-    )
+    visitor_data = VisitorOut.from_orm(outcome.visitor)
+    if outcome.latest_approved:
+        visitor_data.approval = ApprovalOut.from_orm(outcome.latest_approved)
 
-    if existing_approval:
-        logger.info(f"Existing approval status: {existing_approval.status}")
-
-    # Check for auto-approval via pre-approval
-    if not existing_approval or existing_approval.status == ApprovalStatus.PENDING:
-        now = datetime.utcnow()
-        logger.info(f"Checking pre-approvals for visitor {visitor_id} at {now}")
-
-        pre = (
-            db.query(PreApproval)
-            .filter(
-                PreApproval.visitor_id == visitor_id,
-                PreApproval.valid_from <= now,
-                PreApproval.valid_to >= now
-            )
-            .first()
-        )
+    return visitor_data
 
-        if pre:
-            today = now.date()
-            visits_today = (
-                db.query(Approval)
-                .filter(
-                    Approval.visitor_id == visitor_id,
-                    func.date(Approval.decision_at) == today,
-                    Approval.status == ApprovalStatus.APPROVED
-                )
-                .count()
-            )
-
-            if visits_today < pre.max_visits_per_day:
-                try:
-                    logger.info("Pre-approval window and visit count valid. Proceeding to auto-approve...")
-
-                    # ✅ Update existing PENDING approval if exists
-                    if existing_approval and existing_approval.status == ApprovalStatus.PENDING:
-                        existing_approval.status = ApprovalStatus.APPROVED
-                        existing_approval.decision_at = datetime.utcnow()
-                        logger.info("Updated existing PENDING approval to APPROVED")
-                    else:
-                        auto_approval = Approval(
-                            visitor_id=visitor_id,
-                            employee_id=pre.employee_id,
-                            status=ApprovalStatus.APPROVED,
-                            decision_at=datetime.utcnow(),
-                            requested_at=datetime.utcnow()
-                        )
-                        db.add(auto_approval)
-                        logger.info("Inserted new auto-approval record")
-
-                    # ✅ Generate QR badge if not already present
-                    if not visitor.badge_url:
-                        badge_url = generate_qr_and_upload(str(visitor_id), filename=f"visitor_{visitor_id}")
-                        visitor.badge_url = badge_url
-                        logger.info(f"Generated QR badge for visitor {visitor_id}")
-
-                        # Optional: Email to visitor
-                        send_badge_email(visitor.contact, visitor.full_name, badge_url)
-
-                    db.commit()
-                    db.refresh(visitor)
-
-                except Exception as e:
-                    db.rollback()
-                    logger.error(f"❌ Auto-approval or badge generation failed: {e}", exc_info=True)
-
-    # 🧠 Fetch latest APPROVED approval to attach to response
-    latest_approval = (
-        db.query(Approval)
-        .filter_by(visitor_id=visitor_id, status=ApprovalStatus.APPROVED)
-        .order_by(Approval.decision_at.desc().nullslast())
-        .first()
-    )
+@router.post("/{visitor_id}/scan", response_model=ScanDecisionOut)
+async def scan_visitor(visitor_id: int, db: AsyncSession = Depends(get_db)):
+    """
+    Gate scan: decide whether a visitor may enter.
 
-    visitor_data = VisitorOut.from_orm(visitor)
-    if latest_approval:
-        visitor_data.approval = ApprovalOut.from_orm(latest_approval)
+    - Auto-approves visitors inside an active pre-approval window
+    - Answers from the in-memory pre-approval index plus one approval-state query
+    """
+    service = VisitorService(db)
+    outcome = await service.scan_visitor(visitor_id)
+    if not outcome:
+        raise HTTPException(status_code=404, detail="Visitor not found")
 
-    return visitor_data
+    visitor = outcome.visitor
+    latest = outcome.latest_approval
+    status_ = latest.status if latest else None
 
-@router.post("/register", response_model=VisitorOut, status_code=status.HTTP_201_CREATED)
-def register_visitor(data: VisitorCreate, db: Session = Depends(get_db)):
+    return ScanDecisionOut(
+        visitor_id=visitor.id,
+        full_name=visitor.full_name,
+        host_employee_name=visitor.host_employee_name,
+        host_department=visitor.host_department,
+        badge_url=visitor.badge_url,
+        status=status_,
+        allowed=status_ == ApprovalStatus.APPROVED and visitor.check_out is None,
+        auto_approved=outcome.auto_approved,
+        checked_out=visitor.check_out is not None
+    )
+
+async def _register(data: VisitorCreate, db: AsyncSession, photo: bytes | None = None):
     """
-    Register a new visitor. Send approval request email to host employee.
+    Shared registration flow for the JSON and multipart endpoints.
     """
-    host = (
-        db.query(Employee)
-        .filter(
-            Employee.name.ilike(data.host_employee_name.strip()),
-            Employee.department.ilike(data.host_department.strip())
-        )
-        .first()
-    )
+    host = await employee_directory.resolve(db, data.host_employee_name, data.host_department)
     if not host:
         raise HTTPException(
             status_code=400,
@@ -144,7 +209,10 @@ def register_visitor(data: VisitorCreate, db: Session = Depends(get_db)):
         )
 
     service = VisitorService(db)
-    visitor = service.register_visitor(data.dict())
+    try:
+        visitor = await service.register_visitor(data.dict(), photo=photo, host=host)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     # Notify host by email
     if host.email:
@@ -154,15 +222,97 @@ def register_visitor(data: VisitorCreate, db: Session = Depends(get_db)):
             purpose=data.purpose
         )
 
-    return visitor
+    visitor_data = VisitorOut.from_orm(visitor)
+    visitor_data.watch_token = create_visitor_watch_token(visitor.id)
+    return visitor_data
+
+@router.post("/register", response_model=VisitorOut, status_code=status.HTTP_201_CREATED)
+async def register_visitor(data: VisitorCreate, db: AsyncSession = Depends(get_db)):
+    """
+    Register a new visitor. Send approval request email to host employee.
+    The response's `watch_token` lets the kiosk follow the visitor's badge events.
+    """
+    return await _register(data, db)
+
+@router.post("/register/upload", response_model=VisitorOut, status_code=status.HTTP_201_CREATED)
+async def register_visitor_upload(
+    full_name: str = Form(...),
+    contact: str = Form(...),
+    company: Optional[str] = Form(None),
+    purpose: str = Form(...),
+    host_employee_name: str = Form(...),
+    host_department: str = Form(...),
+    photo: Optional[UploadFile] = File(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Register a new visitor with the photo sent as a multipart file instead of base64 JSON.
+
+    - The photo is streamed in chunks and rejected once it exceeds the size limit
+    - It is downscaled and re-encoded server-side before storage
+    - Fields are validated against VisitorCreate, answering 422 like the JSON route
+    """
+    try:
+        data = VisitorCreate(
+            full_name=full_name,
+            contact=contact,
+            company=company,
+            purpose=purpose,
+            host_employee_name=host_employee_name,
+            host_department=host_department
+        )
+    except ValidationError as e:
+        raise RequestValidationError([{**err, "loc": ("body", *err["loc"])} for err in e.errors()])
+
+    photo_bytes = None
+    if photo is not None and photo.filename:
+        if photo.content_type and not photo.content_type.startswith("image/"):
+            raise HTTPException(status_code=415, detail="Photo must be an image")
+
+        buffer = bytearray()
+        while chunk := await photo.read(64 * 1024):
+            buffer.extend(chunk)
+            if len(buffer) > PHOTO_MAX_UPLOAD_BYTES:
+                raise HTTPException(status_code=413, detail="Photo is too large")
+        photo_bytes = bytes(buffer)
+
+    return await _register(data, db, photo=photo_bytes)
+
+@router.post("/import", response_model=VisitorImportResult)
+async def import_visitors(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$", description="Overrides the Content-Type"),
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_current_user)
+):
+    """
+    Bulk-register visitors (e.g. an event delegation) from a CSV or NDJSON body.
+
+    - Columns / keys match the JSON registration body, minus the photo
+    - The body is parsed as it streams in and written in batches
+    - Each distinct host is looked up once and receives one summary email
+    - Rows that fail validation or name an unknown host are reported individually
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    fmt = format or IMPORT_CONTENT_TYPES.get(content_type)
+    if not fmt:
+        raise HTTPException(
+            status_code=415,
+            detail="Send text/csv or application/x-ndjson, or pass ?format=csv|ndjson"
+        )
+
+    logger.info(f"📥 Visitor import ({fmt}) started by employee {current_user['id']}")
+    service = VisitorImportService(db)
+    report = await service.import_records(IMPORT_PARSERS[fmt](request.stream()))
+    return VisitorImportResult(created=report.created, failed=report.failed, errors=report.errors)
 
 @router.patch("/{visitor_id}/checkout", response_model=VisitorOut)
-def checkout_visitor(visitor_id: int, db: Session = Depends(get_db)):
+async def checkout_visitor(visitor_id: int, db: AsyncSession = Depends(get_db)):
     """
     Mark a visitor as checked out.
     """
     service = VisitorService(db)
-    visitor = service.fetch_visitor(visitor_id)
+    visitor = await service.fetch_visitor(visitor_id)
 
     if not visitor:
         raise HTTPException(status_code=404, detail="Visitor not found")
@@ -170,8 +320,4 @@ def checkout_visitor(visitor_id: int, db: Session = Depends(get_db)):
     if visitor.check_out:
         raise HTTPException(status_code=400, detail="Visitor already checked out")
 
-    visitor.check_out = datetime.utcnow()
-    db.commit()
-    db.refresh(visitor)
-
-    return visitor
+    return await service.check_out(visitor)
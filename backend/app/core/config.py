@@ -1,11 +1,15 @@
 """
-core/config.py — Central configuration for database connection using SQLAlchemy.
+core/config.py — Central configuration for the async database connection using SQLAlchemy.
 """
 
 import os
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.engine import make_url, URL
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import declarative_base, Session
+from app.core.pool_metrics import InstrumentedPool
+from app.core.metrics import instrument_engine
 
 # Load environment variables from .env file
 load_dotenv()
@@ -16,14 +20,136 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise RuntimeError("DATABASE_URL environment variable is not set.")
 
-# SQLAlchemy engine with echo enabled for SQL query logging
-engine = create_engine(DATABASE_URL, echo=True)
+def _env_bool(name: str, default: bool) -> bool:
+    """Reads a boolean flag such as 1/0, true/false, yes/no from the environment."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
 
-# Create a thread-local session factory
-SessionLocal = sessionmaker(
-    autocommit=False,
+# SQL echo is off unless explicitly enabled; logging every statement is expensive under load
+DB_ECHO = _env_bool("DB_ECHO", False)
+
+# Connection pool sizing
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))        # seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))        # seconds before a connection is replaced
+DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", True)
+
+# Server-side statement timeout in milliseconds (PostgreSQL only, 0 disables it);
+# sessions from JobSessionLocal run without it
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "5000"))
+
+# Share of a search query's trigrams a visitor name or company must contain to match
+# fuzzily; applied as pg_trgm.word_similarity_threshold on PostgreSQL (default there: 0.6)
+SEARCH_MIN_SIMILARITY = float(os.getenv("SEARCH_MIN_SIMILARITY", "0.5"))
+
+# Async drivers used for each sync dialect that may appear in DATABASE_URL
+ASYNC_DRIVERS = {
+    "postgres": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(database_url: str) -> tuple[URL, dict]:
+    """
+    Converts a sync DATABASE_URL into its async-driver equivalent.
+
+    asyncpg does not understand libpq query parameters such as `sslmode` or
+    `channel_binding`, so they are stripped and translated into connect args.
+
+    Args:
+        database_url (str): Connection string as configured in the environment.
+
+    Returns:
+        tuple[URL, dict]: The async URL and the connect_args for the engine.
+    """
+    url = make_url(database_url)
+    url = url.set(drivername=ASYNC_DRIVERS.get(url.drivername, url.drivername))
+
+    connect_args = {}
+    if url.drivername == "postgresql+asyncpg":
+        query = dict(url.query)
+        sslmode = query.pop("sslmode", None)
+        query.pop("channel_binding", None)
+        if sslmode and sslmode != "disable":
+            connect_args["ssl"] = sslmode
+        url = url.set(query=query)
+
+    return url, connect_args
+
+
+ASYNC_DATABASE_URL, CONNECT_ARGS = to_async_url(DATABASE_URL)
+
+
+def engine_options(url: URL, connect_args: dict) -> dict:
+    """
+    Builds create_async_engine keyword arguments from the settings above.
+
+    SQLite uses SQLAlchemy's default pool, so pool sizing only applies to
+    server databases.
+    """
+    options = {
+        "echo": DB_ECHO,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "connect_args": dict(connect_args),
+    }
+    if url.get_backend_name() == "sqlite":
+        return options
+
+    options.update(
+        poolclass=InstrumentedPool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+    if url.get_backend_name() == "postgresql":
+        server_settings = options["connect_args"].setdefault("server_settings", {})
+        if DB_STATEMENT_TIMEOUT_MS > 0:
+            server_settings["statement_timeout"] = str(DB_STATEMENT_TIMEOUT_MS)
+        server_settings["pg_trgm.word_similarity_threshold"] = str(SEARCH_MIN_SIMILARITY)
+    return options
+
+
+# Async SQLAlchemy engine; pool and logging behavior come from the environment
+engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, CONNECT_ARGS))
+
+# Statement counts and timings for /metrics
+instrument_engine(engine.sync_engine)
+
+# Session factory; objects stay usable after commit since lazy loads are not allowed in async code
+AsyncSessionLocal = async_sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+
+class JobSession(Session):
+    """Session for batch jobs (app.jobs.*): exempt from the request-path statement timeout."""
+
+
+@event.listens_for(JobSession, "after_begin")
+def _lift_statement_timeout(session, transaction, connection) -> None:
+    # Whole-day aggregates, partition moves and archive counts legitimately run for
+    # longer than DB_STATEMENT_TIMEOUT_MS; LOCAL ends with the transaction, so the
+    # pooled connection goes back with the default timeout
+    if connection.dialect.name == "postgresql" and DB_STATEMENT_TIMEOUT_MS > 0:
+        connection.exec_driver_sql("SET LOCAL statement_timeout = 0")
+
+
+# Session factory for batch jobs
+JobSessionLocal = async_sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
+    sync_session_class=JobSession,
     autoflush=False,
-    bind=engine
+    expire_on_commit=False
 )
 
 # Base class for all ORM models
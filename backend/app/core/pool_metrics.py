@@ -0,0 +1,86 @@
+"""
+core/pool_metrics.py — Connection pool instrumentation.
+
+Wraps SQLAlchemy's async queue pool to record how long requests wait for a
+connection and how often a checkout fails (e.g. pool exhausted / timeout),
+and exposes a snapshot of the pool's live state.
+"""
+
+import threading
+import time
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+
+class PoolStats:
+    """Cumulative checkout counters shared by all instrumented pools in the process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.failures = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record(self, waited: float, failed: bool) -> None:
+        with self._lock:
+            if failed:
+                self.failures += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            attempts = self.checkouts + self.failures
+            return {
+                "checkouts_total": self.checkouts,
+                "checkout_failures_total": self.failures,
+                "checkout_wait_seconds_total": round(self.wait_seconds_total, 6),
+                "checkout_wait_seconds_avg": round(self.wait_seconds_total / attempts, 6) if attempts else 0.0,
+                "checkout_wait_seconds_max": round(self.wait_seconds_max, 6),
+            }
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    Async queue pool that times every checkout, including waits for a free slot
+    and failed checkouts (pool timeout, connection errors).
+    """
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except Exception:
+            pool_stats.record(time.perf_counter() - started, failed=True)
+            raise
+        pool_stats.record(time.perf_counter() - started, failed=False)
+        return conn
+
+
+def pool_status(pool: Pool) -> dict:
+    """
+    Returns the live state of a pool plus the cumulative checkout counters.
+
+    Args:
+        pool (Pool): The engine's connection pool (`engine.pool`).
+
+    Returns:
+        dict: Pool size, checked-out/idle connections, overflow and checkout stats.
+    """
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+            timeout=pool.timeout(),
+        )
+    status.update(pool_stats.snapshot())
+    return status
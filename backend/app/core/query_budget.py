@@ -0,0 +1,139 @@
+"""
+core/query_budget.py — Per-route SQL statement budgets to catch N+1 regressions.
+
+Statements are counted per request by the engine listeners in core/metrics.py.
+When a response starts, the count is compared with the route's budget:
+- off: nothing is checked
+- warn (default): the overrun is logged and reported in the X-Query-Budget-Exceeded header
+- strict: the response is replaced with a 500 naming the route, count and budget (test runs)
+
+The check runs when the response starts, after the handler has committed: in
+strict mode a write that went over budget is still applied, only its response
+is replaced.
+
+Every checked response also carries X-Query-Count. Budgets come from
+ROUTE_QUERY_BUDGETS below, overridden by QUERY_BUDGETS, e.g.
+`GET /visitors/on-site=4,POST /visitors/register=8`.
+"""
+
+import json
+import os
+from app.core.metrics import current_request
+from app.logger_config import setup_logger
+
+logger = setup_logger(__name__)
+
+QUERY_BUDGET_MODE = os.getenv("QUERY_BUDGET_MODE", "warn").lower()
+QUERY_BUDGET_DEFAULT = int(os.getenv("QUERY_BUDGET_DEFAULT", "20"))
+
+QUERY_COUNT_HEADER = "X-Query-Count"
+QUERY_BUDGET_EXCEEDED_HEADER = "X-Query-Budget-Exceeded"
+
+# Budgets for the hot endpoints, keyed by "<METHOD> <route template>"
+ROUTE_QUERY_BUDGETS = {
+    "GET /visitors/on-site": 3,
+    "GET /visitors/search": 2,
+    "GET /visitors/{visitor_id}": 8,  # runs the scan's auto-approval
+    "POST /visitors/{visitor_id}/scan": 8,
+    "POST /visitors/register": 8,
+    "PATCH /visitors/{visitor_id}/checkout": 5,
+    "GET /approvals/{employee_id}": 2,
+    "POST /approvals/{approval_id}/action": 5,
+    "GET /preapprovals/{employee_id}": 2,
+    "POST /auth/login": 1,
+    "GET /reports/visits": 1,
+    "GET /visitors/export": 1,
+}
+
+
+def parse_budgets(spec: str) -> dict[str, int]:
+    """
+    Parses `METHOD /path=N,...` into a budget per route key.
+
+    Raises:
+        ValueError: If an entry is malformed.
+    """
+    budgets = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        route, sep, budget = item.rpartition("=")
+        method, _, path = route.strip().partition(" ")
+        if not sep or not method or not path.strip():
+            raise ValueError(f"Invalid QUERY_BUDGETS entry '{item.strip()}'. Expected 'METHOD /path=N'")
+        budgets[f"{method.upper()} {path.strip()}"] = int(budget)
+    return budgets
+
+
+QUERY_BUDGETS = {**ROUTE_QUERY_BUDGETS, **parse_budgets(os.getenv("QUERY_BUDGETS", ""))}
+
+
+def budget_for(method: str, route: str) -> int:
+    """Returns the statement budget of a route, falling back to QUERY_BUDGET_DEFAULT."""
+    return QUERY_BUDGETS.get(f"{method} {route}", QUERY_BUDGET_DEFAULT)
+
+
+class QueryBudgetMiddleware:
+    """
+    Pure ASGI middleware enforcing route budgets; must run inside MetricsMiddleware,
+    which provides the per-request statement counter.
+    """
+
+    def __init__(self, app, mode: str = QUERY_BUDGET_MODE):
+        self.app = app
+        self.mode = mode
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.mode == "off":
+            await self.app(scope, receive, send)
+            return
+
+        replaced = False
+
+        async def send_wrapper(message):
+            nonlocal replaced
+            if message["type"] == "http.response.start":
+                message, failure = self._check(scope, message)
+                if failure is not None:
+                    # Strict mode: answer with the failure and drop the route's own body
+                    replaced = True
+                    await send(message)
+                    await send({"type": "http.response.body", "body": failure})
+                    return
+            elif replaced:
+                return
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _check(self, scope: dict, message: dict) -> tuple[dict, bytes | None]:
+        """Adds the budget headers to a response start, or builds the strict-mode failure."""
+        stats = current_request.get()
+        route = getattr(scope.get("route"), "path", None)
+        if stats is None or route is None:
+            return message, None
+
+        method = scope["method"]
+        budget = budget_for(method, route)
+        count_header = (QUERY_COUNT_HEADER.lower().encode(), str(stats.statements).encode())
+        headers = [*message.get("headers", []), count_header]
+        if stats.statements <= budget:
+            return {**message, "headers": headers}, None
+
+        detail = f"Query budget exceeded for {method} {route}: {stats.statements} statements (budget {budget})"
+        if self.mode != "strict":
+            logger.warning(f"⚠️ {detail}")
+            headers.append((QUERY_BUDGET_EXCEEDED_HEADER.lower().encode(), f"{stats.statements}/{budget}".encode()))
+            return {**message, "headers": headers}, None
+
+        logger.error(f"❌ {detail}")
+        body = json.dumps({"detail": detail}).encode()
+        return {
+            "type": "http.response.start",
+            "status": 500,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                count_header,
+            ],
+        }, body
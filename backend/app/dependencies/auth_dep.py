@@ -3,7 +3,7 @@ dependencies/auth_dep.py — Dependency for extracting the current authenticated
 """
 
 from fastapi import Depends, HTTPException, Header
-from app.utils.auth import decode_token
+from app.utils.auth import decode_token_cached
 
 
 def get_current_user(authorization: str = Header(...)) -> dict:
@@ -24,8 +24,9 @@ def get_current_user(authorization: str = Header(...)) -> dict:
     if scheme.lower() != "bearer" or not token:
         raise HTTPException(status_code=401, detail="Invalid authorization schema")
 
-    payload = decode_token(token)
-    if not payload:
+    payload = decode_token_cached(token)
+    # Only employee tokens carry an id; visitor watch tokens must not open the API
+    if not payload or "id" not in payload:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
 
     return payload
@@ -0,0 +1,17 @@
+"""
+dependencies/db_dep.py — Shared dependency providing an async database session per request.
+"""
+
+from typing import AsyncGenerator
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import AsyncSessionLocal
+
+
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency to provide an async SQLAlchemy session.
+
+    The session is closed (and any open transaction rolled back) when the request ends.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
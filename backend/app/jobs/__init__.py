@@ -0,0 +1,5 @@
+"""
+jobs — Maintenance jobs run on a schedule (cron, Kubernetes CronJob), e.g.
+`python -m app.jobs.compact_visit_rollups`, and one-off
+operational commands such as `python -m app.jobs.export_visitor_history`.
+"""
@@ -0,0 +1,74 @@
+"""
+jobs/compact_visit_rollups.py — Nightly compaction of the visit analytics rollup.
+
+The rollup is maintained incrementally, so intraday it counts decisions as they
+happen and can drift (rows edited outside the app, failed writes). Compaction
+recomputes whole UTC days from `visitors` and `approvals` and replaces their
+buckets, one transaction per day.
+
+    python -m app.jobs.compact_visit_rollups              # yesterday (nightly)
+    python -m app.jobs.compact_visit_rollups --days 7     # the last 7 full days
+    python -m app.jobs.compact_visit_rollups --since 2025-01-01 [--until 2025-12-31]   # backfill
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import date, datetime, timedelta, timezone
+from app.core.config import JobSessionLocal, engine
+from app.repos.visit_rollup_repo import VisitRollupRepository
+from app.logger_config import setup_logger
+
+logger = setup_logger(__name__)
+
+
+async def compact_days(start: date, end: date) -> int:
+    """
+    Rebuilds the rollup for every day in [start, end].
+
+    Args:
+        start (date): First UTC day.
+        end (date): Last UTC day (inclusive).
+
+    Returns:
+        int: Number of days compacted.
+    """
+    day, compacted = start, 0
+    while day <= end:
+        started = time.perf_counter()
+        async with JobSessionLocal() as db:
+            repo = VisitRollupRepository(db)
+            totals = await repo.aggregate_day(day)
+            await repo.replace_day(day, totals)
+            await db.commit()
+        logger.info(f"🧮 Compacted visit rollup for {day}: {len(totals.changes)} bucket(s) in {time.perf_counter() - started:.2f}s")
+        day += timedelta(days=1)
+        compacted += 1
+    return compacted
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild visit rollup days from the source tables.")
+    parser.add_argument("--days", type=int, default=1, help="Number of full days before today to compact")
+    parser.add_argument("--since", type=date.fromisoformat, help="First day to compact (YYYY-MM-DD)")
+    parser.add_argument("--until", type=date.fromisoformat, help="Last day to compact, inclusive (default: yesterday)")
+    args = parser.parse_args()
+
+    yesterday = datetime.now(timezone.utc).date() - timedelta(days=1)
+    end = args.until or yesterday
+    start = args.since or end - timedelta(days=args.days - 1)
+    if start > end:
+        parser.error("--since must not be after --until")
+
+    async def run():
+        try:
+            return await compact_days(start, end)
+        finally:
+            await engine.dispose()
+
+    compacted = asyncio.run(run())
+    logger.info(f"✅ Visit rollup compaction finished: {compacted} day(s) from {start} to {end}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+jobs/export_visitor_history.py — Writes the full visitor history export to a file.
+
+Same records as `GET /visitors/export`, streamed straight to disk (or stdout),
+so memory stays flat however large the tables are.
+
+    python -m app.jobs.export_visitor_history --output visitors.ndjson.gz --gzip
+    python -m app.jobs.export_visitor_history --format csv --since 2025-01-01 --until 2026-01-01 --output 2025.csv
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime
+from app.core.config import AsyncSessionLocal, engine
+from app.services.visitor_export_service import VisitorExportService, VISITOR_EXPORT_CHUNK_SIZE
+from app.utils.record_stream import ENCODERS
+from app.logger_config import setup_logger
+
+logger = setup_logger(__name__)
+
+
+async def export_to(out, format: str, since: datetime | None, until: datetime | None,
+                    compress: bool, chunk_size: int) -> int:
+    """
+    Streams the export into a binary file object.
+
+    Returns:
+        int: Bytes written.
+    """
+    written = 0
+    async with AsyncSessionLocal() as db:
+        service = VisitorExportService(db, chunk_size=chunk_size)
+        async for chunk in service.export(format, since, until, compress=compress):
+            out.write(chunk)
+            written += len(chunk)
+    return written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export visitors with their approvals and pre-approvals.")
+    parser.add_argument("--format", choices=ENCODERS, default="ndjson")
+    parser.add_argument("--gzip", action="store_true", help="Gzip the output")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="Only visitors checked in at or after this time")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="Only visitors checked in before this time")
+    parser.add_argument("--chunk-size", type=int, default=VISITOR_EXPORT_CHUNK_SIZE, help="Visitors per fetch")
+    parser.add_argument("--output", help="File to write (default: stdout)")
+    args = parser.parse_args()
+
+    if args.since and args.until and args.until <= args.since:
+        parser.error("--until must be after --since")
+
+    async def run(out):
+        try:
+            return await export_to(out, args.format, args.since, args.until, args.gzip, args.chunk_size)
+        finally:
+            await engine.dispose()
+
+    started = time.perf_counter()
+    if args.output:
+        with open(args.output, "wb") as out:
+            written = asyncio.run(run(out))
+    else:
+        written = asyncio.run(run(sys.stdout.buffer))
+    logger.info(
+        f"✅ Visitor export ({args.format}{', gzip' if args.gzip else ''}) wrote {written:,} bytes "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+jobs/maintain_partitions.py — Keeps the monthly partitions of visitors and approvals in shape.
+
+Run daily (cron); every step is idempotent and commits per partition:
+1. Months with rows in a table's default partition get their own partition (rows move across)
+2. Partitions exist for the current month and the next PARTITION_AHEAD_MONTHS
+3. Months older than PARTITION_RETENTION_MONTHS are written to
+   PARTITION_ARCHIVE_DIR/<partition>.ndjson.gz, the archive's row count is checked,
+   and only then is the partition detached and dropped. A visitors month takes the
+   rows that point at its visitors along (approvals of any month, pre-approvals,
+   daily visits): they go to <partition>.<table>.ndjson.gz and are deleted in the
+   same transaction as the drop, so no rows are left pointing at missing visitors
+
+    python -m app.jobs.maintain_partitions [--dry-run] [--retention-months 24] [--archive-dir archive]
+
+Does nothing on databases where the tables are not partitioned (SQLite). Runs
+without DB_STATEMENT_TIMEOUT_MS: moving rows out of default and archiving take
+longer than a request may.
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from datetime import date, datetime, timezone
+from typing import AsyncIterator
+from app.core.config import JobSessionLocal, engine
+from app.repos.partition_repo import (
+    PartitionRepository, Partition, PARTITIONED_TABLES, add_months, month_start
+)
+from app.utils.record_stream import encode_ndjson, gzip_chunks
+from app.logger_config import setup_logger
+
+logger = setup_logger(__name__)
+
+PARTITION_AHEAD_MONTHS = int(os.getenv("PARTITION_AHEAD_MONTHS", "3"))
+PARTITION_RETENTION_MONTHS = int(os.getenv("PARTITION_RETENTION_MONTHS", "24"))  # 0 keeps everything
+PARTITION_ARCHIVE_DIR = os.getenv("PARTITION_ARCHIVE_DIR", "archive")
+ARCHIVE_FETCH_SIZE = 5_000
+
+
+async def ensure_partitions(table_name: str, current: date, ahead: int, dry_run: bool) -> None:
+    """Creates missing partitions for months held in the default partition and the months ahead."""
+    async with JobSessionLocal() as db:
+        repo = PartitionRepository(db)
+        existing = {p.month for p in await repo.list_partitions(table_name)}
+        wanted = set(await repo.months_in_default(table_name))
+        wanted.update(add_months(current, n) for n in range(ahead + 1))
+
+    for month in sorted(wanted - existing):
+        name = Partition(table_name, month).name
+        if dry_run:
+            logger.info(f"📝 Would create partition {name}")
+            continue
+        async with JobSessionLocal() as db:
+            moved = await PartitionRepository(db).create_partition(table_name, month)
+            await db.commit()
+        logger.info(f"🧱 Created partition {name}" + (f" ({moved} row(s) moved from default)" if moved else ""))
+
+
+async def write_archive(path: str, columns: list[str], rows: AsyncIterator[tuple], expected: int) -> int:
+    """
+    Writes rows to a gzipped NDJSON file and checks how many were written.
+
+    Returns:
+        int: Number of rows written.
+
+    Raises:
+        RuntimeError: If the number written does not match `expected`.
+    """
+    written = 0
+
+    async def counted() -> AsyncIterator[tuple]:
+        nonlocal written
+        async for row in rows:
+            written += 1
+            yield row
+
+    # Written under a temporary name so a crash never leaves a partial archive behind
+    with open(f"{path}.part", "wb") as out:
+        async for chunk in gzip_chunks(encode_ndjson(columns, counted())):
+            out.write(chunk)
+    if written != expected:
+        raise RuntimeError(f"Archive {path} has {written} rows, expected {expected}")
+    os.replace(f"{path}.part", path)
+    return written
+
+
+async def archive_partition(partition: Partition, archive_dir: str) -> None:
+    """
+    Writes a partition and its dependent rows to gzipped NDJSON files, then deletes
+    the dependents and detaches and drops the partition in one transaction.
+
+    Raises:
+        RuntimeError: If an archive's row count does not match the table's, or rows
+            pointing at the partition changed between archiving and deleting them.
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f"{partition.name}.ndjson.gz")
+    started = time.perf_counter()
+    archived = {}
+
+    async with JobSessionLocal() as db:
+        repo = PartitionRepository(db)
+        written = await write_archive(
+            path, repo.columns(partition.table),
+            repo.stream_rows(partition, ARCHIVE_FETCH_SIZE), await repo.count_rows(partition),
+        )
+        for table_name in repo.dependents(partition):
+            archived[table_name] = await write_archive(
+                os.path.join(archive_dir, f"{partition.name}.{table_name}.ndjson.gz"),
+                repo.columns(table_name),
+                repo.stream_dependents(partition, table_name, ARCHIVE_FETCH_SIZE),
+                await repo.count_dependents(partition, table_name),
+            )
+
+    # A new transaction: the export's server-side cursor keeps the partition in use until its own ends
+    async with JobSessionLocal() as db:
+        repo = PartitionRepository(db)
+        for table_name, count in archived.items():
+            deleted = await repo.delete_dependents(partition, table_name)
+            if deleted != count:
+                await db.rollback()
+                raise RuntimeError(
+                    f"{partition.name}: {deleted} {table_name} row(s) to delete, {count} archived; rerun the job"
+                )
+        await repo.drop_partition(partition)
+        await db.commit()
+    dependents = "".join(f", {count} {table_name}" for table_name, count in archived.items())
+    logger.info(
+        f"🗄️ Archived {partition.name}: {written} row(s){dependents} to {archive_dir} "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+
+
+async def maintain(ahead: int, retention_months: int, archive_dir: str, dry_run: bool) -> None:
+    current = month_start(datetime.now(timezone.utc))
+    cutoff = add_months(current, -retention_months) if retention_months else None
+
+    for table_name in PARTITIONED_TABLES:
+        async with JobSessionLocal() as db:
+            if not await PartitionRepository(db).is_partitioned(table_name):
+                logger.info(f"ℹ️ {table_name} is not partitioned on this database, skipping")
+                continue
+        await ensure_partitions(table_name, current, ahead, dry_run)
+        if cutoff is None:
+            continue
+
+        async with JobSessionLocal() as db:
+            expired = [p for p in await PartitionRepository(db).list_partitions(table_name) if p.month < cutoff]
+        for partition in expired:
+            if dry_run:
+                logger.info(f"📝 Would archive and drop partition {partition.name}")
+            else:
+                await archive_partition(partition, archive_dir)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Create upcoming and archive expired monthly partitions.")
+    parser.add_argument("--ahead", type=int, default=PARTITION_AHEAD_MONTHS, help="Months to create in advance")
+    parser.add_argument("--retention-months", type=int, default=PARTITION_RETENTION_MONTHS,
+                        help="Months kept online before archival (0 keeps everything)")
+    parser.add_argument("--archive-dir", default=PARTITION_ARCHIVE_DIR)
+    parser.add_argument("--dry-run", action="store_true", help="Only log what would change")
+    args = parser.parse_args()
+
+    async def run():
+        try:
+            await maintain(args.ahead, args.retention_months, args.archive_dir, args.dry_run)
+        finally:
+            await engine.dispose()
+
+    asyncio.run(run())
+    logger.info("✅ Partition maintenance finished")
+
+
+if __name__ == "__main__":
+    main()
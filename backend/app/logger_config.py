@@ -1,36 +1,141 @@
 """
 logger_config.py - Centralized logging setup for the Visitor Management System.
 
-Creates a logger that logs:
-- To both console and a persistent `logs/server.log` file
-- With a consistent format and INFO-level by default
+Logging is non-blocking: every logger propagates to a single `QueueHandler` on
+the root logger, so a log call on the request path only enqueues the record. A
+background `QueueListener` thread does the formatting and I/O:
+- To the console and a size-rotated `logs/server.log` file
+- As plain text (default) or one JSON object per line (`LOG_FORMAT=json`)
+
+Environment:
+- LOG_LEVEL: root level, INFO by default
+- LOG_LEVELS: per-module overrides, e.g. `app.services=WARNING,app.utils.storage=DEBUG`
+- LOG_FORMAT: `text` or `json`
+- LOG_FILE: log file path (empty disables the file), LOG_MAX_BYTES / LOG_BACKUP_COUNT for rotation
+
+Rotation renames the file, which is only safe with a single writer. The file at
+LOG_FILE is therefore written only by a top-level process; processes started by
+multiprocessing (uvicorn --workers / --reload workers, the CPU process pools)
+each write their own `<name>.<pid><ext>` next to it, e.g. `logs/server.4242.log`.
 """
 
+import atexit
+import json
+import multiprocessing
 import os
 import logging
-# from logging.handlers import RotatingFileHandler  # Optional: for log rotation
+import queue
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from dotenv import load_dotenv
 
-def setup_logger() -> logging.Logger:
-    """
-    Sets up and returns a logger instance configured for the application.
+APP_LOGGER_NAME = "visitor-management"
+TEXT_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+_listener: QueueListener | None = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record as a single-line JSON object."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
 
-    - Logs INFO and above level messages
-    - Outputs to both terminal and 'logs/server.log'
-    - Creates 'logs' directory if it doesn't exist
+
+class _EnqueueHandler(QueueHandler):
+    """
+    QueueHandler for an in-process listener: the record is handed over as is, so
+    message formatting happens on the listener thread instead of the caller's.
     """
-    os.makedirs("logs", exist_ok=True)
-
-    # Optional: Use rotating file handler if log size becomes an issue
-    # file_handler = RotatingFileHandler("logs/server.log", maxBytes=5_000_000, backupCount=5)
-
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s - %(levelname)s - %(message)s",
-        handlers=[
-            logging.FileHandler("logs/server.log"),
-            logging.StreamHandler()
-            # file_handler
-        ]
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def _parse_levels(spec: str) -> dict[str, str]:
+    """Parses `module=LEVEL,other.module=LEVEL` into a dict, ignoring malformed entries."""
+    levels = {}
+    for item in spec.split(","):
+        name, sep, level = item.partition("=")
+        if sep and name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def _log_path(path: str) -> str:
+    """Returns `path` for a top-level process, a per-process variant of it otherwise."""
+    if multiprocessing.parent_process() is None:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.{os.getpid()}{ext}"
+
+
+def _configure() -> None:
+    """Installs the queue handler and starts the listener thread (once per process)."""
+    global _listener
+    load_dotenv()
+
+    formatter = (
+        JsonFormatter() if os.getenv("LOG_FORMAT", "text").lower() == "json"
+        else logging.Formatter(TEXT_FORMAT)
     )
+    handlers: list[logging.Handler] = [logging.StreamHandler()]
+
+    log_file = os.getenv("LOG_FILE", "logs/server.log")
+    if log_file:
+        log_file = _log_path(log_file)
+        os.makedirs(os.path.dirname(log_file) or ".", exist_ok=True)
+        handlers.append(RotatingFileHandler(
+            log_file,
+            maxBytes=int(os.getenv("LOG_MAX_BYTES", "5000000")),
+            backupCount=int(os.getenv("LOG_BACKUP_COUNT", "5")),
+            encoding="utf-8",
+        ))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers = [_EnqueueHandler(log_queue)]
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    for name, level in _parse_levels(os.getenv("LOG_LEVELS", "")).items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    # Flush whatever is still queued when the process exits
+    atexit.register(stop_logging)
+
+
+def stop_logging() -> None:
+    """Stops the listener thread after it has written every queued record."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
 
-    return logging.getLogger("visitor-management")
+
+def setup_logger(name: str = APP_LOGGER_NAME) -> logging.Logger:
+    """
+    Sets up and returns a logger instance configured for the application.
+
+    - The first call installs the queue-based pipeline for the whole process
+    - Pass `__name__` so the module's level can be tuned through LOG_LEVELS
+
+    Args:
+        name (str): Logger name, the application logger by default.
+
+    Returns:
+        logging.Logger: Logger whose records are written by the background listener.
+    """
+    if _listener is None:
+        _configure()
+    return logging.getLogger(name)
@@ -3,30 +3,65 @@ main.py - Entry point of the FastAPI Visitor Management System.
 
 Initializes:
 - FastAPI app
-- Routers for visitors, approvals, pre-approvals, employees, and auth
+- Routers for visitors, approvals, pre-approvals, employees, auth, and reports
 - Global CORS config
+- Request metrics, exposed in Prometheus format at /metrics
+- Per-route SQL statement budgets
 - Exception handling with logging
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.exception_handlers import http_exception_handler
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
-from app.core.config import Base, engine
+from app.core.config import engine
+from app.core.pool_metrics import pool_status, pool_stats
+from app.core.query_budget import QueryBudgetMiddleware
+from app.core.metrics import MetricsMiddleware, registry, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from app.utils.pagination import NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER
+from app.utils.email_queue import email_dispatcher
+from app.utils.badge_pipeline import badge_pipeline
+from app.utils.workers import shutdown_pools
 from app.api.routes_visitor import router as visitor_router
 from app.api.routes_approval import router as approval_router
 from app.api.routes_preapproval import router as preapproval_router
 from app.api.routes_employee import router as employee_router
 from app.api.routes_auth import router as auth_router
+from app.api.routes_media import router as media_router
+from app.api.routes_report import router as report_router
+from app.utils.realtime import socket_app, SOCKETIO_PATH
 from app.logger_config import setup_logger
 from fastapi.encoders import jsonable_encoder
+from starlette.concurrency import run_in_threadpool
 
-# Initialize app and logger
-app = FastAPI()
-logger = setup_logger()
+logger = setup_logger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application startup/shutdown hooks.
+    - Schema is managed by Alembic (`alembic upgrade head`), not at startup
+    - Starts the background email workers, flushing them on shutdown
+    - Waits for queued badge jobs and stops the worker process pools on shutdown
+    - Disposes the async engine's connection pool on shutdown
+    """
+    email_dispatcher.start()
+
+    yield
+
+    await badge_pipeline.drain()
+    await run_in_threadpool(shutdown_pools)
+    await run_in_threadpool(email_dispatcher.stop)
+
+    await engine.dispose()
+    logger.info("🛑 Database connections closed")
+
+# Initialize app
+app = FastAPI(lifespan=lifespan)
 logger.info("✅ FastAPI server started")
 
 # CORS Middleware Configuration (open for all origins)
@@ -36,11 +71,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER],  # lets the dashboard read pagination headers
 )
 
-# Create tables based on SQLAlchemy models
-Base.metadata.create_all(bind=engine)
-logger.info("✅ Database tables ensured via SQLAlchemy")
+# Per-route SQL statement budgets (QUERY_BUDGET_MODE); needs the counter set up by MetricsMiddleware
+app.add_middleware(QueryBudgetMiddleware)
+
+# Per-route latency, status and DB statement metrics
+app.add_middleware(MetricsMiddleware)
+
+registry.gauge("db_pool_checked_out", "Connections currently checked out of the pool.",
+               lambda: pool_status(engine.pool).get("checked_out", 0))
+registry.gauge("db_pool_checkout_failures", "Failed pool checkouts (timeouts, connection errors).",
+               lambda: pool_stats.failures)
+registry.gauge("db_pool_checkout_wait_seconds", "Total time spent waiting for a pooled connection.",
+               lambda: pool_stats.wait_seconds_total)
+registry.gauge("email_queue_pending", "Emails waiting in the outbound queue.",
+               lambda: email_dispatcher.pending())
 
 # Register route modules
 app.include_router(visitor_router)
@@ -48,6 +95,11 @@ app.include_router(approval_router)
 app.include_router(preapproval_router)
 app.include_router(employee_router)
 app.include_router(auth_router)
+app.include_router(media_router)
+app.include_router(report_router)
+
+# Socket.IO push channel (approval and badge events), served at /ws/socket.io
+app.mount(SOCKETIO_PATH, socket_app)
 
 @app.get("/")
 def root():
@@ -55,6 +107,22 @@ def root():
     logger.info("⚙️  Root endpoint accessed.")
     return {"message": "Visitor management API is live"}
 
+@app.get("/health/db-pool")
+def db_pool_health():
+    """
+    Connection pool instrumentation.
+    Reports checked-out connections, overflow, checkout wait time and checkout failures.
+    """
+    return pool_status(engine.pool)
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """
+    Prometheus scrape endpoint.
+    Per-route latency and status, SQL statements and DB time, outbound call latency and pool state.
+    """
+    return Response(registry.render(), media_type=METRICS_CONTENT_TYPE)
+
 @app.exception_handler(Exception)
 async def generic_exception_handler(request: Request, exc: Exception):
     """
@@ -6,10 +6,12 @@ Defines:
 - Employee: Host employee for the visitor
 - Approval: Manual/automatic approval records
 - PreApproval: Scheduled advance approvals
+- VisitorDailyVisit: Approved visits per visitor per day (max_visits_per_day enforcement)
+- VisitRollup: Hourly visit counters per host (analytics reports)
 - ApprovalStatus: Enum for visitor approval state
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, SmallInteger, BigInteger, String, Date, DateTime, ForeignKey, Enum, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .core.config import Base
@@ -29,10 +31,30 @@ class ApprovalStatus(str, enum.Enum):
 # Visitor Model
 # -----------------------
 
+# Separators dropped from a contact to recognize a returning visitor
+CONTACT_IDENTITY_SEPARATORS = " -()."
+
+
+def contact_identity(contact):
+    """
+    SQL form of a normalized contact: lower-cased, separators removed. Built from
+    plain replace() calls with literal arguments, so SQLite and PostgreSQL can both
+    index it and match the query to the index.
+    """
+    for separator in CONTACT_IDENTITY_SEPARATORS:
+        contact = func.replace(contact, text(f"'{separator}'"), text("''"))
+    return func.lower(contact)
+
+
 class Visitor(Base):
     """Represents a visitor record including identity, purpose, and timestamps."""
     __tablename__ = "visitors"
 
+    # On PostgreSQL the table is range-partitioned by month on created_at (migration 0008):
+    # the database key is (id, created_at) and other tables' visitor_id is not a database FK.
+    # Visitor search uses pg_trgm GIN indexes on full_name, company and the normalized
+    # contact there (migration 0009); they are PostgreSQL-only, so not declared below
+
     id = Column(Integer, primary_key=True)
     full_name = Column(String, nullable=False)
     contact = Column(String, nullable=False)
@@ -45,11 +67,31 @@ class Visitor(Base):
     badge_url = Column(String)           # Cloudinary-hosted QR badge
 
     check_in = Column(DateTime(timezone=True), server_default=func.now())
+    admitted_at = Column(DateTime(timezone=True), nullable=True)  # first approval (host or pre-approval at the gate)
     check_out = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     approvals = relationship("Approval", back_populates="visitor")
 
+    # Admitted, open visits only (migration 0006): the on-site roster stays an index scan
+    # over the people let into the building, however much history accumulates
+    __table_args__ = (
+        Index(
+            "ix_visitors_on_site", "admitted_at", "id",
+            postgresql_where=text("check_out IS NULL AND admitted_at IS NOT NULL"),
+            sqlite_where=text("check_out IS NULL AND admitted_at IS NOT NULL")
+        ),
+        # Day ranges recomputed by the visit rollup compaction (migration 0007)
+        Index("ix_visitors_check_in", "check_in"),
+        Index(
+            "ix_visitors_check_out", "check_out",
+            postgresql_where=text("check_out IS NOT NULL"),
+            sqlite_where=text("check_out IS NOT NULL")
+        ),
+        # Returning visitors: latest visit by normalized contact (migration 0010)
+        Index("ix_visitors_contact_identity", contact_identity(contact), "id"),
+    )
+
 # -----------------------
 # Employee Model
 # -----------------------
@@ -65,6 +107,16 @@ class Employee(Base):
     password = Column(String, nullable=False)  # Hashed password
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    # Host resolution matches on trimmed, lower-cased name + department (migration 0005).
+    # An expression index keeps rows provisioned outside the app covered as well.
+    __table_args__ = (
+        Index(
+            "ix_employees_host_lookup",
+            func.lower(func.trim(name)),
+            func.lower(func.trim(department))
+        ),
+    )
+
 # -----------------------
 # Approval Model
 # -----------------------
@@ -73,8 +125,11 @@ class Approval(Base):
     """Stores each approval action, including status and timestamps."""
     __tablename__ = "approvals"
 
+    # On PostgreSQL the table is range-partitioned by month on requested_at (migration 0008)
+
     id = Column(Integer, primary_key=True)
 
+    # Not a database FK on PostgreSQL, where visitors is partitioned (0008, migrations/env.py)
     visitor_id = Column(Integer, ForeignKey("visitors.id"), nullable=False)
     employee_id = Column(Integer, ForeignKey("employees.id"), nullable=False)
 
@@ -85,6 +140,24 @@ class Approval(Base):
 
     visitor = relationship("Visitor", back_populates="approvals")
 
+    # Indexes for the gate scan, host dashboard and pending-approval queries (migrations 0002, 0004)
+    # and the rollup compaction (0007)
+    __table_args__ = (
+        Index("ix_approvals_visitor_requested", "visitor_id", "requested_at"),
+        Index("ix_approvals_employee_requested_id", "employee_id", "requested_at", "id"),
+        Index("ix_approvals_visitor_status_decision", "visitor_id", "status", "decision_at"),
+        Index("ix_approvals_employee_status_requested", "employee_id", "status", "requested_at"),
+        Index(
+            "ix_approvals_employee_pending", "employee_id", "requested_at",
+            postgresql_where=text("status = 'PENDING'")
+        ),
+        Index(
+            "ix_approvals_decision_at", "decision_at",
+            postgresql_where=text("decision_at IS NOT NULL"),
+            sqlite_where=text("decision_at IS NOT NULL")
+        ),
+    )
+
 # -----------------------
 # Pre-Approval Model
 # -----------------------
@@ -95,6 +168,7 @@ class PreApproval(Base):
 
     id = Column(Integer, primary_key=True, index=True)
 
+    # Not a database FK on PostgreSQL, where visitors is partitioned (0008, migrations/env.py)
     visitor_id = Column(Integer, ForeignKey("visitors.id"), nullable=False)
     employee_id = Column(Integer, ForeignKey("employees.id"), nullable=False)
 
@@ -103,3 +177,47 @@ class PreApproval(Base):
 
     max_visits_per_day = Column(Integer, default=5)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Indexes for pre-approval window lookups and per-employee listings (migrations 0002, 0004)
+    __table_args__ = (
+        Index("ix_preapprovals_visitor_window", "visitor_id", "valid_from", "valid_to"),
+        Index("ix_preapprovals_employee_created_id", "employee_id", "created_at", "id"),
+    )
+
+# -----------------------
+# Daily Visit Counter Model
+# -----------------------
+
+class VisitorDailyVisit(Base):
+    """
+    Number of approved visits per visitor per UTC day.
+    Updated in the same transaction as the approval so limits hold under concurrent scans.
+    """
+    __tablename__ = "visitor_daily_visits"
+
+    # Not a database FK on PostgreSQL, where visitors is partitioned (0008, migrations/env.py)
+    visitor_id = Column(Integer, ForeignKey("visitors.id"), primary_key=True)
+    visit_date = Column(Date, primary_key=True)
+    visits = Column(Integer, nullable=False, default=0)
+
+# -----------------------
+# Visit Analytics Rollup Model
+# -----------------------
+
+class VisitRollup(Base):
+    """
+    Visit counters per UTC hour and host employee, read by the analytics reports.
+
+    Maintained incrementally in the same transaction as registrations, decisions and
+    checkouts; the nightly compaction job rebuilds whole days from the source tables.
+    """
+    __tablename__ = "visit_rollups"
+
+    day = Column(Date, primary_key=True)
+    hour = Column(SmallInteger, primary_key=True)
+    employee_id = Column(Integer, ForeignKey("employees.id"), primary_key=True)
+    registered = Column(Integer, nullable=False, default=0, server_default="0")
+    approved = Column(Integer, nullable=False, default=0, server_default="0")
+    rejected = Column(Integer, nullable=False, default=0, server_default="0")
+    checked_out = Column(Integer, nullable=False, default=0, server_default="0")
+    visit_seconds = Column(BigInteger, nullable=False, default=0, server_default="0")  # total on-site time of checked-out visits
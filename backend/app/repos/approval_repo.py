@@ -2,9 +2,16 @@
 repos/approval_repo.py — Repository layer for Approval operations (CRUD & status updates).
 """
 
-from sqlalchemy.orm import Session
-from app.models import Approval, ApprovalStatus
-from datetime import datetime
+from sqlalchemy import select, insert, update
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, noload
+from app.models import Approval, ApprovalStatus, Visitor
+from app.repos.visit_counter_repo import VisitCounterRepository
+from app.repos.visitor_repo import VisitorRepository
+from app.repos.visit_rollup_repo import VisitRollupRepository, RollupDeltas
+from app.utils.pagination import Page, keyset_before, paginate, sort_key
+from datetime import datetime, timezone
 
 
 class ApprovalRepository:
@@ -12,38 +19,218 @@ class ApprovalRepository:
     Repository class for managing approvals in the database.
     """
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def create_approval(self, visitor_id: int, employee_id: int) -> Approval:
+    async def create_approval(self, visitor_id: int, employee_id: int) -> Approval:
         """
         Creates a new approval request with default status = PENDING.
+        Counts the registration in the analytics rollup in the same transaction.
         """
         approval = Approval(visitor_id=visitor_id, employee_id=employee_id)
         self.db.add(approval)
-        self.db.commit()
-        self.db.refresh(approval)
+        deltas = RollupDeltas()
+        deltas.add(datetime.now(timezone.utc), employee_id, registered=1)
+        await VisitRollupRepository(self.db).apply(deltas)
+        await self.db.commit()
+        await self.db.refresh(approval)
         return approval
 
-    def get_pending_approvals_for_employee(self, employee_id: int):
+    async def bulk_create(self, rows: list[dict]) -> None:
+        """
+        Inserts many PENDING approval requests in one multi-row INSERT without committing,
+        counting the registrations in the analytics rollup.
+
+        Args:
+            rows (list[dict]): Dictionaries with `visitor_id` and `employee_id`.
+        """
+        await self.db.execute(insert(Approval), rows)
+        now = datetime.now(timezone.utc)
+        deltas = RollupDeltas()
+        for row in rows:
+            deltas.add(now, row["employee_id"], registered=1)
+        await VisitRollupRepository(self.db).apply(deltas)
+
+    async def get_pending_approvals_for_employee(self, employee_id: int):
         """
         Retrieves all pending approval requests assigned to a specific employee.
         """
-        return self.db.query(Approval).filter(
-            Approval.employee_id == employee_id,
-            Approval.status == ApprovalStatus.PENDING
-        ).all()
+        result = await self.db.execute(
+            select(Approval).filter(
+                Approval.employee_id == employee_id,
+                Approval.status == ApprovalStatus.PENDING
+            )
+        )
+        return result.scalars().all()
+
+    async def list_for_employee(
+        self,
+        employee_id: int,
+        limit: int | None,
+        status: ApprovalStatus | None = None,
+        cursor: tuple[datetime, int] | None = None,
+        with_visitor: bool = True
+    ) -> Page:
+        """
+        Retrieves one page of an employee's approvals, newest first, keyed on (requested_at, id).
+
+        Args:
+            employee_id (int): Host employee ID.
+            limit (int | None): Maximum number of approvals to return; None for all of them.
+            status (ApprovalStatus, optional): Only return approvals in this status.
+            cursor (tuple[datetime, int], optional): Key of the last approval on the previous page.
+            with_visitor (bool): Join the visitor onto each approval. Defaults to True.
+
+        Returns:
+            Page: The approvals and the cursor of the next page.
+        """
+        dialect = self.db.bind.dialect.name
+        requested = sort_key(Approval.requested_at, dialect)
+        query = (
+            select(Approval)
+            .options(joinedload(Approval.visitor) if with_visitor else noload(Approval.visitor))
+            .filter(Approval.employee_id == employee_id)
+            .order_by(requested.desc(), Approval.id.desc())
+        )
+        if limit is not None:
+            query = query.limit(limit + 1)
+        if status:
+            query = query.filter(Approval.status == status)
+        if cursor:
+            query = query.filter(keyset_before(Approval.requested_at, Approval.id, cursor, dialect))
+
+        result = await self.db.execute(query)
+        return paginate(result.scalars().all(), limit, "requested_at")
+
+    async def list_for_visitors(self, visitor_ids: list[int]) -> list[Row]:
+        """
+        Fetches the approvals of many visitors as plain rows, oldest request first per visitor.
+
+        Args:
+            visitor_ids (list[int]): Visitor IDs.
+
+        Returns:
+            list[Row]: Approval rows ordered by visitor ID and request time.
+        """
+        result = await self.db.execute(
+            select(*Approval.__table__.columns)
+            .filter(Approval.visitor_id.in_(visitor_ids))
+            .order_by(Approval.visitor_id, Approval.requested_at, Approval.id)
+        )
+        return result.all()
 
-    def update_status(self, approval_id: int, status: ApprovalStatus):
+    async def update_status(self, approval_id: int, status: ApprovalStatus):
         """
         Updates the status of an approval request (APPROVED or REJECTED).
-        Automatically sets decision time for terminal states.
+        Automatically sets decision time for terminal states, and keeps the visitor's
+        daily visit counter and admission time in step within the same transaction.
+        The visitor is loaded alongside so the result can be serialized without lazy loads.
         """
-        approval = self.db.query(Approval).filter(Approval.id == approval_id).first()
+        approval = await self.db.get(Approval, approval_id, options=[joinedload(Approval.visitor)])
         if approval:
+            counter = VisitCounterRepository(self.db)
+            was_approved = approval.status == ApprovalStatus.APPROVED
+
+            # Revoking an approved visit gives the visit back for the day it was counted on
+            if was_approved and status != ApprovalStatus.APPROVED and approval.decision_at:
+                await counter.increment(approval.visitor_id, approval.decision_at.date(), delta=-1)
+
+            # The rollup moves the decision from its previous bucket to the new one
+            deltas = RollupDeltas()
+            deltas.add_decision(approval.decision_at, approval.employee_id, approval.status, delta=-1)
+
             approval.status = status
             if status in [ApprovalStatus.APPROVED, ApprovalStatus.REJECTED]:
-                approval.decision_at = datetime.utcnow()
-            self.db.commit()
-            self.db.refresh(approval)
+                approval.decision_at = datetime.now(timezone.utc)
+            deltas.add_decision(approval.decision_at, approval.employee_id, status)
+
+            if status == ApprovalStatus.APPROVED and not was_approved:
+                await counter.increment(approval.visitor_id, approval.decision_at.date())
+                if approval.visitor.admitted_at is None:
+                    approval.visitor.admitted_at = approval.decision_at
+            await VisitRollupRepository(self.db).apply(deltas)
+            await self.db.commit()
         return approval
+
+    async def bulk_update_status(self, approval_ids: list[int], employee_id: int, status: ApprovalStatus) -> list[Row]:
+        """
+        Moves many of a host's approvals to `status` in one set-based UPDATE.
+
+        Only approvals owned by `employee_id` and not already in `status` are touched. On
+        PostgreSQL this is a single UPDATE ... FROM ... RETURNING that also hands back each
+        row's previous status; SQLite cannot return columns of the FROM subquery, so it
+        reads them with a SELECT first (same transaction, single writer). The daily visit
+        counters and, for approvals, the visitors' admission times are then updated in
+        the same transaction.
+
+        Args:
+            approval_ids (list[int]): Approvals to update.
+            employee_id (int): Host who must own every updated approval.
+            status (ApprovalStatus): APPROVED or REJECTED.
+
+        Returns:
+            list[Row]: (id, visitor_id, previous_status, previous_decision_at, badge_url)
+            for every updated approval.
+        """
+        decided_at = datetime.now(timezone.utc)
+        current = (
+            select(
+                Approval.id,
+                Approval.visitor_id,
+                Approval.status.label("previous_status"),
+                Approval.decision_at.label("previous_decision_at"),
+                Visitor.badge_url
+            )
+            .join(Visitor, Visitor.id == Approval.visitor_id)
+            .filter(
+                Approval.id.in_(approval_ids),
+                Approval.employee_id == employee_id,
+                Approval.status != status
+            )
+            .with_for_update(of=Approval)
+        )
+
+        if self.db.get_bind().dialect.name == "postgresql":
+            previous = current.subquery()
+            stmt = (
+                update(Approval)
+                .where(Approval.id == previous.c.id)
+                .values(status=status, decision_at=decided_at)
+                .returning(
+                    Approval.id,
+                    Approval.visitor_id,
+                    previous.c.previous_status,
+                    previous.c.previous_decision_at,
+                    previous.c.badge_url
+                )
+                .execution_options(synchronize_session=False)
+            )
+            rows = (await self.db.execute(stmt)).all()
+        else:
+            rows = (await self.db.execute(current)).all()
+            if rows:
+                await self.db.execute(
+                    update(Approval)
+                    .where(Approval.id.in_([row.id for row in rows]))
+                    .values(status=status, decision_at=decided_at)
+                    .execution_options(synchronize_session=False)
+                )
+
+        deltas: dict = {}
+        rollup = RollupDeltas()
+        for row in rows:
+            if row.previous_status == ApprovalStatus.APPROVED and row.previous_decision_at:
+                key = (row.visitor_id, row.previous_decision_at.date())
+                deltas[key] = deltas.get(key, 0) - 1
+            if status == ApprovalStatus.APPROVED:
+                key = (row.visitor_id, decided_at.date())
+                deltas[key] = deltas.get(key, 0) + 1
+            rollup.add_decision(row.previous_decision_at, employee_id, row.previous_status, delta=-1)
+            rollup.add_decision(decided_at, employee_id, status)
+        await VisitCounterRepository(self.db).apply_deltas(deltas)
+        await VisitRollupRepository(self.db).apply(rollup)
+        if status == ApprovalStatus.APPROVED and rows:
+            await VisitorRepository(self.db).mark_admitted([row.visitor_id for row in rows], decided_at)
+
+        await self.db.commit()
+        return rows
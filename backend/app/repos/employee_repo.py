@@ -2,7 +2,8 @@
 repos/employee_repo.py — Repository layer for querying employee records.
 """
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select, func, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import Employee
 
 
@@ -11,10 +12,10 @@ class EmployeeRepository:
     Repository class to manage employee data operations.
     """
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def get_employee_by_name(self, name: str) -> Employee | None:
+    async def get_employee_by_name(self, name: str) -> Employee | None:
         """
         Retrieves an employee record by their exact name.
 
@@ -24,4 +25,53 @@ class EmployeeRepository:
         Returns:
             Employee | None: Employee object if found, otherwise None.
         """
-        return self.db.query(Employee).filter(Employee.name == name).first()
+        result = await self.db.execute(select(Employee).filter(Employee.name == name).limit(1))
+        return result.scalars().first()
+
+    async def get_employee_by_id(self, employee_id: int) -> Employee | None:
+        """
+        Retrieves an employee record by ID.
+
+        Args:
+            employee_id (int): Employee's unique ID.
+
+        Returns:
+            Employee | None: Employee object if found, otherwise None.
+        """
+        return await self.db.get(Employee, employee_id)
+
+    async def get_employee_by_email(self, email: str) -> Employee | None:
+        """
+        Retrieves an employee record by email (used for login).
+
+        Args:
+            email (str): Employee's email address.
+
+        Returns:
+            Employee | None: Employee object if found, otherwise None.
+        """
+        result = await self.db.execute(select(Employee).filter_by(email=email).limit(1))
+        return result.scalars().first()
+
+    async def get_hosts(self, keys: set[tuple[str, str]]) -> list[Employee]:
+        """
+        Retrieves employees by normalized (name, department) using the host lookup index.
+
+        Args:
+            keys (set[tuple[str, str]]): Trimmed, lower-cased (name, department) pairs.
+
+        Returns:
+            list[Employee]: Matching employees, lowest ID first.
+        """
+        if not keys:
+            return []
+        name_key = func.lower(func.trim(Employee.name))
+        department_key = func.lower(func.trim(Employee.department))
+        # OR of equalities rather than a row-value IN: both PostgreSQL and SQLite
+        # turn it into index lookups, SQLite does not for row values
+        result = await self.db.execute(
+            select(Employee)
+            .filter(or_(*(and_(name_key == name, department_key == department) for name, department in keys)))
+            .order_by(Employee.id)
+        )
+        return result.scalars().all()
@@ -0,0 +1,228 @@
+"""
+repos/partition_repo.py — Maintenance of the monthly range partitions of visitors and approvals.
+
+Partitioning is PostgreSQL-only (migration 0008); on other databases the tables
+are plain and `is_partitioned` reports False. Partitions are named
+`<table>_pYYYY_MM` and cover one UTC month; `<table>_default` catches rows
+outside every monthly range.
+
+Nothing references visitors at the database level once it is partitioned, so
+a visitors month is dropped together with the rows that point at its visitors
+(VISITOR_DEPENDENTS); the job archives those first.
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import AsyncIterator
+from sqlalchemy import text, table, column, select, func, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Visitor, Approval, PreApproval, VisitorDailyVisit
+
+# Partitioned table -> (model, partition key column)
+PARTITIONED_TABLES = {
+    "visitors": (Visitor, "created_at"),
+    "approvals": (Approval, "requested_at"),
+}
+
+# Tables whose visitor_id points at visitors without a database FK (dropped in 0008)
+VISITOR_DEPENDENTS = {
+    "approvals": Approval,
+    "preapprovals": PreApproval,
+    "visitor_daily_visits": VisitorDailyVisit,
+}
+
+_PARTITION_NAME = re.compile(r"^(?P<table>[a-z_]+)_p(?P<year>\d{4})_(?P<month>\d{2})$")
+
+
+@dataclass(frozen=True)
+class Partition:
+    """One monthly partition: rows with `month` <= key < the next month (UTC)."""
+    table: str
+    month: date
+
+    @property
+    def name(self) -> str:
+        return partition_name(self.table, self.month)
+
+
+def month_start(value: date | datetime) -> date:
+    """Returns the first day of the UTC month containing `value`."""
+    if isinstance(value, datetime):
+        value = (value if value.tzinfo else value.replace(tzinfo=timezone.utc)).astimezone(timezone.utc).date()
+    return value.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    """Shifts a month start by `months` (negative to go back)."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table_name: str, month: date) -> str:
+    return f"{table_name}_p{month:%Y_%m}"
+
+
+def is_partition_name(name: str) -> bool:
+    """True for names of monthly or default partitions of the partitioned tables."""
+    match = _PARTITION_NAME.match(name)
+    if match:
+        return match["table"] in PARTITIONED_TABLES
+    return name.endswith("_default") and name[:-len("_default")] in PARTITIONED_TABLES
+
+
+def _model(table_name: str):
+    if table_name in PARTITIONED_TABLES:
+        return PARTITIONED_TABLES[table_name][0]
+    return VISITOR_DEPENDENTS[table_name]
+
+
+def _bound(month: date) -> str:
+    return f"'{month.isoformat()} 00:00:00+00'"
+
+
+class PartitionRepository:
+    """
+    Inspects and changes the partition layout. Methods do not commit; DDL is
+    transactional on PostgreSQL, so each caller-defined unit either applies whole or not at all.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def is_partitioned(self, table_name: str) -> bool:
+        """True if `table_name` is a partitioned table on this database."""
+        if self.db.get_bind().dialect.name != "postgresql":
+            return False
+        kind = await self.db.scalar(
+            text("SELECT relkind::text FROM pg_class WHERE relname = :name AND relkind IN ('r', 'p')"),
+            {"name": table_name}
+        )
+        return kind == "p"
+
+    async def list_partitions(self, table_name: str) -> list[Partition]:
+        """
+        Lists the monthly partitions attached to a table, oldest first (the default partition is excluded).
+        """
+        names = await self.db.scalars(
+            text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE parent.relname = :name"
+            ),
+            {"name": table_name}
+        )
+        partitions = []
+        for name in names:
+            match = _PARTITION_NAME.match(name)
+            if match and match["table"] == table_name:
+                partitions.append(Partition(table_name, date(int(match["year"]), int(match["month"]), 1)))
+        return sorted(partitions, key=lambda p: p.month)
+
+    async def months_in_default(self, table_name: str) -> list[date]:
+        """Returns the UTC months that have rows in the table's default partition."""
+        _, key = PARTITIONED_TABLES[table_name]
+        months = await self.db.scalars(text(
+            f"SELECT DISTINCT date_trunc('month', {key} AT TIME ZONE 'UTC') FROM {table_name}_default"
+        ))
+        return sorted(month.date() for month in months)
+
+    async def create_partition(self, table_name: str, month: date) -> int:
+        """
+        Creates and attaches the partition for `month`, moving in any of its rows
+        from the default partition first (attaching would fail while they are there).
+
+        Returns:
+            int: Number of rows moved out of the default partition.
+        """
+        _, key = PARTITIONED_TABLES[table_name]
+        name = partition_name(table_name, month)
+        lower, upper = _bound(month), _bound(add_months(month, 1))
+
+        await self.db.execute(text(f"CREATE TABLE {name} (LIKE {table_name} INCLUDING DEFAULTS)"))
+        moved = await self.db.execute(text(
+            f"WITH moved AS (DELETE FROM {table_name}_default "
+            f"WHERE {key} >= {lower} AND {key} < {upper} RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ))
+        await self.db.execute(text(
+            f"ALTER TABLE {table_name} ATTACH PARTITION {name} FOR VALUES FROM ({lower}) TO ({upper})"
+        ))
+        return moved.rowcount
+
+    async def count_rows(self, partition: Partition) -> int:
+        return await self.db.scalar(select(func.count()).select_from(table(partition.name)))
+
+    def columns(self, table_name: str) -> list[str]:
+        """Column names of a partitioned or dependent table, in table order."""
+        return [c.name for c in _model(table_name).__table__.columns]
+
+    async def stream_rows(self, partition: Partition, chunk_size: int) -> AsyncIterator[tuple]:
+        """
+        Streams a partition's rows in ID order from a server-side cursor.
+
+        Yields:
+            tuple: Values in `columns(partition.table)` order.
+        """
+        names = self.columns(partition.table)
+        source = table(partition.name, *(column(name) for name in names))
+        result = await self.db.stream(
+            select(*source.columns).order_by(source.c.id).execution_options(yield_per=chunk_size)
+        )
+        async for row in result:
+            yield tuple(row)
+
+    @staticmethod
+    def dependents(partition: Partition) -> list[str]:
+        """Tables with rows that point at the partition's rows (only visitors have any)."""
+        return list(VISITOR_DEPENDENTS) if partition.table == "visitors" else []
+
+    def _dependent_filter(self, partition: Partition, table_name: str):
+        model = VISITOR_DEPENDENTS[table_name]
+        return model.visitor_id.in_(select(column("id")).select_from(table(partition.name)))
+
+    async def count_dependents(self, partition: Partition, table_name: str) -> int:
+        """Counts the rows of `table_name` that point at visitors in the partition."""
+        model = VISITOR_DEPENDENTS[table_name]
+        return await self.db.scalar(
+            select(func.count()).select_from(model).filter(self._dependent_filter(partition, table_name))
+        )
+
+    async def stream_dependents(self, partition: Partition, table_name: str, chunk_size: int) -> AsyncIterator[tuple]:
+        """
+        Streams the rows of `table_name` that point at visitors in the partition, in key order.
+
+        Yields:
+            tuple: Values in `columns(table_name)` order.
+        """
+        model = VISITOR_DEPENDENTS[table_name]
+        table_ = model.__table__
+        result = await self.db.stream(
+            select(*table_.columns)
+            .filter(self._dependent_filter(partition, table_name))
+            .order_by(*table_.primary_key.columns)
+            .execution_options(yield_per=chunk_size)
+        )
+        async for row in result:
+            yield tuple(row)
+
+    async def delete_dependents(self, partition: Partition, table_name: str) -> int:
+        """
+        Deletes the rows of `table_name` that point at visitors in the partition.
+
+        Returns:
+            int: Number of rows deleted.
+        """
+        model = VISITOR_DEPENDENTS[table_name]
+        result = await self.db.execute(
+            delete(model)
+            .where(self._dependent_filter(partition, table_name))
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    async def drop_partition(self, partition: Partition) -> None:
+        """Detaches a partition from its table and drops it."""
+        await self.db.execute(text(f"ALTER TABLE {partition.table} DETACH PARTITION {partition.name}"))
+        await self.db.execute(text(f"DROP TABLE {partition.name}"))
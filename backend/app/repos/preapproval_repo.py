@@ -2,8 +2,12 @@
 repos/preapproval_repo.py — Repository for managing pre-approval data operations.
 """
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select, func, or_
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
 from app.models import PreApproval
+from app.utils.pagination import Page, keyset_before, paginate, sort_key
 
 
 class PreApprovalRepository:
@@ -11,10 +15,10 @@ class PreApprovalRepository:
     Handles database interactions related to pre-approvals.
     """
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def create_preapproval(
+    async def create_preapproval(
         self,
         visitor_id: int,
         employee_id: int,
@@ -43,11 +47,11 @@ class PreApprovalRepository:
             max_visits_per_day=max_visits_per_day
         )
         self.db.add(pa)
-        self.db.commit()
-        self.db.refresh(pa)
+        await self.db.commit()
+        await self.db.refresh(pa)
         return pa
 
-    def get_preapprovals_for_employee(self, employee_id: int) -> list[PreApproval]:
+    async def get_preapprovals_for_employee(self, employee_id: int) -> list[PreApproval]:
         """
         Retrieves all pre-approvals scheduled by a specific employee.
 
@@ -57,8 +61,103 @@ class PreApprovalRepository:
         Returns:
             list[PreApproval]: List of pre-approval records.
         """
-        return (
-            self.db.query(PreApproval)
+        result = await self.db.execute(
+            select(PreApproval).filter(PreApproval.employee_id == employee_id)
+        )
+        return result.scalars().all()
+
+    async def list_for_employee(
+        self,
+        employee_id: int,
+        limit: int | None,
+        cursor: tuple[datetime, int] | None = None
+    ) -> Page:
+        """
+        Retrieves one page of an employee's pre-approvals, newest first, keyed on (created_at, id).
+
+        Args:
+            employee_id (int): Employee ID.
+            limit (int | None): Maximum number of pre-approvals to return; None for all of them.
+            cursor (tuple[datetime, int], optional): Key of the last pre-approval on the previous page.
+
+        Returns:
+            Page: The pre-approvals and the cursor of the next page.
+        """
+        dialect = self.db.bind.dialect.name
+        created = sort_key(PreApproval.created_at, dialect)
+        query = (
+            select(PreApproval)
             .filter(PreApproval.employee_id == employee_id)
-            .all()
+            .order_by(created.desc(), PreApproval.id.desc())
+        )
+        if limit is not None:
+            query = query.limit(limit + 1)
+        if cursor:
+            query = query.filter(keyset_before(PreApproval.created_at, PreApproval.id, cursor, dialect))
+
+        result = await self.db.execute(query)
+        return paginate(result.scalars().all(), limit, "created_at")
+
+    async def list_for_visitors(self, visitor_ids: list[int]) -> list[Row]:
+        """
+        Fetches the pre-approvals of many visitors as plain rows, earliest window first per visitor.
+
+        Args:
+            visitor_ids (list[int]): Visitor IDs.
+
+        Returns:
+            list[Row]: Pre-approval rows ordered by visitor ID and window start.
+        """
+        result = await self.db.execute(
+            select(*PreApproval.__table__.columns)
+            .filter(PreApproval.visitor_id.in_(visitor_ids))
+            .order_by(PreApproval.visitor_id, PreApproval.valid_from, PreApproval.id)
+        )
+        return result.all()
+
+    async def get_overlapping(self, start: datetime, end: datetime) -> list[PreApproval]:
+        """
+        Retrieves all pre-approvals whose window overlaps [start, end).
+
+        Args:
+            start (datetime): Start of the range (inclusive).
+            end (datetime): End of the range (exclusive).
+
+        Returns:
+            list[PreApproval]: Overlapping pre-approval records.
+        """
+        result = await self.db.execute(
+            select(PreApproval).filter(PreApproval.valid_from < end, PreApproval.valid_to >= start)
         )
+        return result.scalars().all()
+
+    async def get_created_after(self, last_id: int, pending_ids: list[int] | None = None) -> list[PreApproval]:
+        """
+        Retrieves pre-approvals with an ID greater than `last_id`, oldest first.
+
+        Args:
+            last_id (int): Highest pre-approval ID already seen.
+            pending_ids (list[int], optional): Lower IDs not seen yet, fetched as well.
+
+        Returns:
+            list[PreApproval]: Newer pre-approval records.
+        """
+        condition = PreApproval.id > last_id
+        if pending_ids:
+            condition = or_(condition, PreApproval.id.in_(pending_ids))
+        result = await self.db.execute(
+            select(PreApproval).filter(condition).order_by(PreApproval.id)
+        )
+        return result.scalars().all()
+
+    async def get_ids_after(self, last_id: int) -> list[int]:
+        """
+        Returns the IDs of pre-approvals with an ID greater than `last_id`.
+        """
+        return list(await self.db.scalars(select(PreApproval.id).filter(PreApproval.id > last_id)))
+
+    async def get_max_id(self) -> int:
+        """
+        Returns the highest pre-approval ID, or 0 when the table is empty.
+        """
+        return (await self.db.scalar(select(func.max(PreApproval.id)))) or 0
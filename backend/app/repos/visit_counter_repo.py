@@ -0,0 +1,119 @@
+"""
+repos/visit_counter_repo.py — Repository for the per-visitor, per-day approved visit counter.
+"""
+
+from datetime import date
+from sqlalchemy import select, update, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import VisitorDailyVisit
+
+
+class VisitCounterRepository:
+    """
+    Maintains `visitor_daily_visits` with atomic upserts.
+
+    Methods do not commit; they run inside the caller's transaction so the counter
+    changes together with the approval it accounts for.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def _insert(self):
+        """Returns the dialect-specific INSERT construct supporting ON CONFLICT."""
+        dialect = self.db.get_bind().dialect.name
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        return insert(VisitorDailyVisit)
+
+    async def get_count(self, visitor_id: int, day: date) -> int:
+        """
+        Returns the number of approved visits for a visitor on a given day.
+
+        Args:
+            visitor_id (int): Visitor's unique ID.
+            day (date): UTC calendar day.
+
+        Returns:
+            int: Visit count (0 if none recorded).
+        """
+        count = await self.db.scalar(
+            select(VisitorDailyVisit.visits).filter_by(visitor_id=visitor_id, visit_date=day)
+        )
+        return count or 0
+
+    async def increment(self, visitor_id: int, day: date, delta: int = 1) -> int:
+        """
+        Unconditionally adjusts the day's visit count.
+
+        Args:
+            visitor_id (int): Visitor's unique ID.
+            day (date): UTC calendar day.
+            delta (int): Amount to add; -1 when an approved visit is revoked.
+
+        Returns:
+            int: The new visit count.
+        """
+        stmt = self._insert().values(visitor_id=visitor_id, visit_date=day, visits=max(delta, 0))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[VisitorDailyVisit.visitor_id, VisitorDailyVisit.visit_date],
+            set_={"visits": VisitorDailyVisit.visits + delta},
+        ).returning(VisitorDailyVisit.visits)
+        return (await self.db.execute(stmt)).scalar_one()
+
+    async def apply_deltas(self, deltas: dict[tuple[int, date], int]) -> None:
+        """
+        Applies many counter adjustments at once: one multi-row upsert for the
+        increments and one UPDATE per distinct decrement.
+
+        Args:
+            deltas (dict[tuple[int, date], int]): Change per (visitor_id, day); zero entries are ignored.
+        """
+        increments = [
+            {"visitor_id": visitor_id, "visit_date": day, "visits": delta}
+            for (visitor_id, day), delta in deltas.items() if delta > 0
+        ]
+        if increments:
+            stmt = self._insert().values(increments)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[VisitorDailyVisit.visitor_id, VisitorDailyVisit.visit_date],
+                set_={"visits": VisitorDailyVisit.visits + stmt.excluded.visits},
+            )
+            await self.db.execute(stmt)
+
+        decrements: dict[int, list[tuple[int, date]]] = {}
+        for key, delta in deltas.items():
+            if delta < 0:
+                decrements.setdefault(delta, []).append(key)
+        for delta, keys in decrements.items():
+            await self.db.execute(
+                update(VisitorDailyVisit)
+                .where(tuple_(VisitorDailyVisit.visitor_id, VisitorDailyVisit.visit_date).in_(keys))
+                .values(visits=VisitorDailyVisit.visits + delta)
+            )
+
+    async def try_increment(self, visitor_id: int, day: date, limit: int) -> int | None:
+        """
+        Records one more visit only if the day's count is below `limit`.
+
+        The check and the increment are a single conditional upsert, so concurrent
+        scans can never push the count past the limit.
+
+        Args:
+            visitor_id (int): Visitor's unique ID.
+            day (date): UTC calendar day.
+            limit (int): Maximum visits allowed for the day.
+
+        Returns:
+            int | None: The new visit count, or None if the limit was already reached.
+        """
+        if limit <= 0:
+            return None
+
+        stmt = self._insert().values(visitor_id=visitor_id, visit_date=day, visits=1)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[VisitorDailyVisit.visitor_id, VisitorDailyVisit.visit_date],
+            set_={"visits": VisitorDailyVisit.visits + 1},
+            where=VisitorDailyVisit.visits < limit,
+        ).returning(VisitorDailyVisit.visits)
+        return (await self.db.execute(stmt)).scalar_one_or_none()
@@ -0,0 +1,277 @@
+"""
+repos/visit_rollup_repo.py — Repository for the hourly visit analytics rollup.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from sqlalchemy import select, delete, func, cast, literal, Integer, Numeric, String, Select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import VisitRollup, Visitor, Approval, ApprovalStatus, Employee
+
+# (UTC day, UTC hour, host employee ID)
+RollupKey = tuple[date, int, int]
+
+COUNTERS = ("registered", "approved", "rejected", "checked_out", "visit_seconds")
+
+# Counter incremented by a decision in each terminal status
+DECISION_COUNTERS = {
+    ApprovalStatus.APPROVED: "approved",
+    ApprovalStatus.REJECTED: "rejected",
+}
+
+# Report dimensions: name -> output columns
+REPORT_DIMENSIONS = {
+    "day": ("day",),
+    "hour": ("hour",),
+    "department": ("department",),
+    "host": ("host_id", "host_name"),
+}
+REPORT_MEASURES = ("registered", "approved", "rejected", "checked_out", "avg_visit_minutes")
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Treats naive datetimes as UTC and normalizes aware ones to UTC."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def rollup_key(at: datetime, employee_id: int) -> RollupKey:
+    """Returns the bucket an event at `at` for host `employee_id` is counted in."""
+    at = _as_utc(at)
+    return at.date(), at.hour, employee_id
+
+
+class RollupDeltas:
+    """
+    Counter changes per rollup bucket, collected by a write path and applied in one upsert.
+    """
+
+    def __init__(self):
+        self.changes: dict[RollupKey, dict[str, int]] = {}
+
+    def add(self, at: datetime, employee_id: int, **counters: int) -> None:
+        """Adds `counters` (e.g. approved=1, visit_seconds=3600) to the bucket of `at`."""
+        bucket = self.changes.setdefault(rollup_key(at, employee_id), {})
+        for name, value in counters.items():
+            bucket[name] = bucket.get(name, 0) + value
+
+    def add_decision(self, at: datetime, employee_id: int, status: ApprovalStatus, delta: int = 1) -> None:
+        """Counts (or, with delta=-1, uncounts) a decision; non-terminal statuses are ignored."""
+        counter = DECISION_COUNTERS.get(status)
+        if counter and at:
+            self.add(at, employee_id, **{counter: delta})
+
+    def add_checkout(self, check_in: datetime, check_out: datetime, employee_id: int) -> None:
+        """Counts a checkout and the visit's time on site in the bucket of `check_out`."""
+        seconds = (_as_utc(check_out) - _as_utc(check_in)).total_seconds() if check_in else 0
+        self.add(check_out, employee_id, checked_out=1, visit_seconds=max(int(seconds), 0))
+
+    def __bool__(self) -> bool:
+        return any(any(bucket.values()) for bucket in self.changes.values())
+
+
+class VisitRollupRepository:
+    """
+    Maintains and reads `visit_rollups`.
+
+    Write methods do not commit; they run inside the caller's transaction so the
+    rollup changes together with the rows it summarizes.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @property
+    def _dialect(self) -> str:
+        return self.db.get_bind().dialect.name
+
+    def _insert(self):
+        """Returns the dialect-specific INSERT construct supporting ON CONFLICT."""
+        insert = postgresql.insert if self._dialect == "postgresql" else sqlite.insert
+        return insert(VisitRollup)
+
+    async def apply(self, deltas: RollupDeltas) -> None:
+        """
+        Adds the collected counter changes with one batched upsert (executemany, so a
+        compacted day of thousands of buckets stays within bind-parameter limits).
+
+        Args:
+            deltas (RollupDeltas): Changes per bucket; empty buckets are skipped.
+        """
+        rows = [
+            {"day": day, "hour": hour, "employee_id": employee_id, **{c: counters.get(c, 0) for c in COUNTERS}}
+            for (day, hour, employee_id), counters in deltas.changes.items()
+            if any(counters.values())
+        ]
+        if not rows:
+            return
+        stmt = self._insert()
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[VisitRollup.day, VisitRollup.hour, VisitRollup.employee_id],
+            set_={c: getattr(VisitRollup, c) + getattr(stmt.excluded, c) for c in COUNTERS},
+        )
+        await self.db.execute(stmt, rows)
+
+    async def get_host_id(self, visitor_id: int) -> int | None:
+        """
+        Returns the host a visitor registered with (owner of the visitor's first approval).
+        """
+        return await self.db.scalar(
+            select(Approval.employee_id)
+            .filter(Approval.visitor_id == visitor_id)
+            .order_by(Approval.id)
+            .limit(1)
+        )
+
+    # -----------------------
+    # Compaction
+    # -----------------------
+
+    def _utc_hour(self, column):
+        """UTC hour-of-day expression for a timestamp column."""
+        if self._dialect == "postgresql":
+            return cast(func.extract("hour", func.timezone("UTC", column)), Integer)
+        return cast(func.strftime("%H", column), Integer)
+
+    def _in_range(self, column, start: datetime, end: datetime) -> list:
+        """
+        `start <= column < end` on the bare column, so the column's index applies.
+
+        SQLite compares timestamps as text; the bounds are whole seconds, which order
+        correctly against both the "YYYY-MM-DD HH:MM:SS" server defaults and the
+        microsecond values the app writes.
+        """
+        if self._dialect == "sqlite":
+            return [
+                column >= literal(start.strftime("%Y-%m-%d %H:%M:%S"), String),
+                column < literal(end.strftime("%Y-%m-%d %H:%M:%S"), String),
+            ]
+        return [column >= start, column < end]
+
+    def _seconds_between(self, start, end):
+        if self._dialect == "postgresql":
+            return func.extract("epoch", end - start)
+        return (func.julianday(end) - func.julianday(start)) * 86400
+
+    async def aggregate_day(self, day: date) -> RollupDeltas:
+        """
+        Recomputes one UTC day's buckets from `visitors` and `approvals`.
+
+        Registrations and checkouts are attributed to the host of the visitor's first
+        approval; decisions to the approval's owner, by their current status.
+
+        Args:
+            day (date): UTC day to aggregate.
+
+        Returns:
+            RollupDeltas: Exact counters for every bucket of the day.
+        """
+        start = datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc)
+        end = start + timedelta(days=1)
+        host_id = (
+            select(Approval.employee_id)
+            .where(Approval.visitor_id == Visitor.id)
+            .order_by(Approval.id)
+            .limit(1)
+            .correlate(Visitor)
+            .scalar_subquery()
+        )
+        totals = RollupDeltas()
+
+        check_in_hour = self._utc_hour(Visitor.check_in)
+        registrations = await self.db.execute(
+            select(check_in_hour, host_id.label("host_id"), func.count())
+            .filter(*self._in_range(Visitor.check_in, start, end), host_id.is_not(None))
+            .group_by(check_in_hour, host_id)
+        )
+        for hour, employee_id, count in registrations:
+            totals.add(start.replace(hour=hour), employee_id, registered=count)
+
+        check_out_hour = self._utc_hour(Visitor.check_out)
+        checkouts = await self.db.execute(
+            select(
+                check_out_hour, host_id.label("host_id"), func.count(),
+                func.coalesce(func.sum(self._seconds_between(Visitor.check_in, Visitor.check_out)), 0)
+            )
+            .filter(*self._in_range(Visitor.check_out, start, end), host_id.is_not(None))
+            .group_by(check_out_hour, host_id)
+        )
+        for hour, employee_id, count, seconds in checkouts:
+            totals.add(start.replace(hour=hour), employee_id, checked_out=count, visit_seconds=int(seconds))
+
+        decision_hour = self._utc_hour(Approval.decision_at)
+        decisions = await self.db.execute(
+            select(decision_hour, Approval.employee_id, Approval.status, func.count())
+            .filter(
+                *self._in_range(Approval.decision_at, start, end),
+                Approval.status.in_(list(DECISION_COUNTERS))
+            )
+            .group_by(decision_hour, Approval.employee_id, Approval.status)
+        )
+        for hour, employee_id, status, count in decisions:
+            totals.add_decision(start.replace(hour=hour), employee_id, status, delta=count)
+
+        return totals
+
+    async def replace_day(self, day: date, totals: RollupDeltas) -> None:
+        """
+        Replaces every bucket of `day` with `totals` (no commit).
+        """
+        await self.db.execute(delete(VisitRollup).where(VisitRollup.day == day))
+        await self.apply(totals)
+
+    # -----------------------
+    # Reports
+    # -----------------------
+
+    @staticmethod
+    def report_query(
+        start: date,
+        end: date,
+        group_by: list[str],
+        department: str | None = None,
+        host_id: int | None = None
+    ) -> Select:
+        """
+        Builds the aggregate over the rollup for an inclusive day range.
+
+        Args:
+            start (date): First UTC day.
+            end (date): Last UTC day (inclusive).
+            group_by (list[str]): Dimensions from REPORT_DIMENSIONS, in output order.
+            department (str, optional): Only hosts in this department (case-insensitive).
+            host_id (int, optional): Only this host.
+
+        Returns:
+            Select: Rows of the dimension columns followed by REPORT_MEASURES.
+        """
+        dimensions = {
+            "day": [VisitRollup.day.label("day")],
+            "hour": [VisitRollup.hour.label("hour")],
+            "department": [Employee.department.label("department")],
+            "host": [Employee.id.label("host_id"), Employee.name.label("host_name")],
+        }
+        columns = [column for name in group_by for column in dimensions[name]]
+        checked_out = func.sum(VisitRollup.checked_out)
+        measures = [
+            func.sum(VisitRollup.registered).label("registered"),
+            func.sum(VisitRollup.approved).label("approved"),
+            func.sum(VisitRollup.rejected).label("rejected"),
+            checked_out.label("checked_out"),
+            # Numeric: PostgreSQL only rounds numeric values to a given scale
+            func.round(
+                cast(func.sum(VisitRollup.visit_seconds), Numeric) / 60 / func.nullif(checked_out, 0), 1
+            ).label("avg_visit_minutes"),
+        ]
+
+        query = select(*columns, *measures).filter(VisitRollup.day >= start, VisitRollup.day <= end)
+        if department or {"department", "host"} & set(group_by):
+            query = query.join(Employee, Employee.id == VisitRollup.employee_id)
+        if department:
+            query = query.filter(func.lower(func.trim(Employee.department)) == department.strip().lower())
+        if host_id is not None:
+            query = query.filter(VisitRollup.employee_id == host_id)
+        if columns:
+            query = query.group_by(*columns).order_by(*columns)
+        return query
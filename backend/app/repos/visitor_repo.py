@@ -2,8 +2,40 @@
 repos/visitor_repo.py — Repository for managing visitor data operations.
 """
 
-from sqlalchemy.orm import Session
-from app.models import Visitor
+from datetime import date, datetime
+from typing import AsyncIterator
+from sqlalchemy import select, func, update, insert, literal, or_, text, tuple_, DateTime, Float
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from app.models import Visitor, Approval, ApprovalStatus, VisitorDailyVisit, CONTACT_IDENTITY_SEPARATORS, contact_identity
+from app.utils.pagination import Page, keyset_before, paginate, sort_key, encode_rank_cursor
+
+# Contacts are searched on their lower-cased alphanumerics, so "+1 (555) 010-2030" and
+# "5550102030" match. Spelled as constants so the expression matches ix_visitors_contact_trgm.
+CONTACT_SEARCH_KEY = func.lower(func.regexp_replace(Visitor.contact, text("'[^[:alnum:]]'"), text("''"), text("'g'")))
+
+
+def contact_search_key(value: str) -> str:
+    """Python counterpart of CONTACT_SEARCH_KEY."""
+    return "".join(ch for ch in value.lower() if ch.isalnum())
+
+
+# Returning visitors are recognized on this form of the contact (ix_visitors_contact_identity)
+CONTACT_IDENTITY_KEY = contact_identity(Visitor.contact)
+
+
+def contact_identity_key(value: str) -> str:
+    """Python counterpart of CONTACT_IDENTITY_KEY."""
+    for separator in CONTACT_IDENTITY_SEPARATORS:
+        value = value.replace(separator, "")
+    return value.lower()
+
+
+def _like_pattern(term: str) -> str:
+    """Substring ILIKE pattern with the LIKE wildcards in `term` escaped."""
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
 
 
 class VisitorRepository:
@@ -11,16 +43,16 @@ class VisitorRepository:
     Handles database operations related to the Visitor entity.
     """
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         """
-        Initialize the repository with a SQLAlchemy session.
+        Initialize the repository with an async SQLAlchemy session.
 
         Args:
-            db (Session): SQLAlchemy database session.
+            db (AsyncSession): Async SQLAlchemy database session.
         """
         self.db = db
 
-    def create_visitor(self, visitor_data: dict) -> Visitor:
+    async def create_visitor(self, visitor_data: dict) -> Visitor:
         """
         Creates a new visitor record in the database.
 
@@ -32,11 +64,74 @@ class VisitorRepository:
         """
         visitor = Visitor(**visitor_data)
         self.db.add(visitor)
-        self.db.commit()
-        self.db.refresh(visitor)
+        await self.db.commit()
+        await self.db.refresh(visitor)
         return visitor
 
-    def get_visitor_by_id(self, visitor_id: int) -> Visitor | None:
+    async def bulk_create(self, rows: list[dict]) -> list[int]:
+        """
+        Inserts many visitors in one multi-row INSERT without committing.
+
+        Args:
+            rows (list[dict]): Visitor field dictionaries.
+
+        Returns:
+            list[int]: The new visitor IDs, in the same order as `rows`.
+        """
+        result = await self.db.execute(
+            insert(Visitor).returning(Visitor.id, sort_by_parameter_order=True),
+            rows
+        )
+        return list(result.scalars())
+
+    async def find_returning_photo(self, contact: str, full_name: str) -> tuple[str, datetime] | None:
+        """
+        Finds the photo of a returning visitor: the one on their latest visit with a
+        photo, matched by normalized contact and (case-insensitively) name.
+
+        Args:
+            contact (str): Contact given at registration.
+            full_name (str): Name given at registration.
+
+        Returns:
+            tuple[str, datetime] | None: The photo URL and when it was first used, or None for a new visitor.
+        """
+        same_visitor = (
+            CONTACT_IDENTITY_KEY == contact_identity_key(contact),
+            func.lower(func.trim(Visitor.full_name)) == full_name.strip().lower(),
+        )
+        latest_photo = (
+            select(Visitor.photo_url)
+            .filter(*same_visitor, Visitor.photo_url.is_not(None))
+            .order_by(Visitor.id.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+        # Visits reusing a photo share its URL; the earliest of them dates the photo
+        result = await self.db.execute(
+            select(Visitor.photo_url, func.min(Visitor.created_at))
+            .filter(*same_visitor, Visitor.photo_url == latest_photo)
+            .group_by(Visitor.photo_url)
+        )
+        row = result.first()
+        return tuple(row) if row else None
+
+    async def mark_admitted(self, visitor_ids: list[int], at: datetime) -> None:
+        """
+        Records the admission time of visitors not admitted yet (no commit).
+
+        Args:
+            visitor_ids (list[int]): Visitors whose visit was just approved.
+            at (datetime): Approval time.
+        """
+        await self.db.execute(
+            update(Visitor)
+            .where(Visitor.id.in_(visitor_ids), Visitor.admitted_at.is_(None))
+            .values(admitted_at=at)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def get_visitor_by_id(self, visitor_id: int) -> Visitor | None:
         """
         Fetches a visitor by their ID.
 
@@ -46,4 +141,255 @@ class VisitorRepository:
         Returns:
             Visitor | None: Visitor object if found, else None.
         """
-        return self.db.query(Visitor).filter(Visitor.id == visitor_id).first()
+        return await self.db.get(Visitor, visitor_id)
+
+    def _on_site_filters(self, department: str | None, host: str | None, since: datetime | None) -> list:
+        """
+        Admitted, open-visit predicate (matching `ix_visitors_on_site`), the stale-visit
+        cutoff and case-insensitive host filters.
+        """
+        filters = [Visitor.check_out.is_(None), Visitor.admitted_at.is_not(None)]
+        if since:
+            # Bare column, so the index range applies: admitted_at is only ever written by
+            # the app, in one format, so SQLite's text comparison orders it correctly
+            filters.append(Visitor.admitted_at >= since)
+        if department:
+            filters.append(func.lower(func.trim(Visitor.host_department)) == department.strip().lower())
+        if host:
+            filters.append(func.lower(func.trim(Visitor.host_employee_name)) == host.strip().lower())
+        return filters
+
+    async def list_on_site(
+        self,
+        limit: int,
+        department: str | None = None,
+        host: str | None = None,
+        since: datetime | None = None,
+        cursor: tuple[datetime, int] | None = None
+    ) -> Page:
+        """
+        Retrieves one page of visitors currently on site (admitted, not checked out),
+        latest admission first.
+
+        Args:
+            limit (int): Maximum number of visitors to return.
+            department (str, optional): Only visitors hosted by this department.
+            host (str, optional): Only visitors hosted by this employee (by name).
+            since (datetime, optional): Leave out visits admitted before this (never checked out).
+            cursor (tuple[datetime, int], optional): Key of the last visitor on the previous page.
+
+        Returns:
+            Page: The visitors and the cursor of the next page.
+        """
+        dialect = self.db.bind.dialect.name
+        query = (
+            select(Visitor)
+            .filter(*self._on_site_filters(department, host, since))
+            .order_by(sort_key(Visitor.admitted_at, dialect).desc(), Visitor.id.desc())
+            .limit(limit + 1)
+        )
+        if cursor:
+            query = query.filter(keyset_before(Visitor.admitted_at, Visitor.id, cursor, dialect))
+
+        result = await self.db.execute(query)
+        return paginate(result.scalars().all(), limit, "admitted_at")
+
+    async def count_on_site(
+        self, department: str | None = None, host: str | None = None, since: datetime | None = None
+    ) -> int:
+        """
+        Counts visitors currently on site, with the same filters as `list_on_site`.
+
+        Returns:
+            int: Number of admitted, open visits.
+        """
+        result = await self.db.execute(
+            select(func.count()).select_from(Visitor).filter(*self._on_site_filters(department, host, since))
+        )
+        return result.scalar_one()
+
+    async def stream_history(
+        self,
+        chunk_size: int,
+        since: datetime | None = None,
+        until: datetime | None = None
+    ) -> AsyncIterator[list[Row]]:
+        """
+        Streams visitor rows in ID order from a server-side cursor.
+
+        Plain column rows are read instead of ORM objects, so nothing accumulates
+        in the session's identity map however many visitors are read.
+
+        Args:
+            chunk_size (int): Rows fetched per round trip and per yielded chunk.
+            since (datetime, optional): Only visitors checked in at or after this time.
+            until (datetime, optional): Only visitors checked in before this time.
+
+        Yields:
+            list[Row]: Up to `chunk_size` visitor rows.
+        """
+        dialect = self.db.bind.dialect.name
+        key = sort_key(Visitor.check_in, dialect)
+        query = select(*Visitor.__table__.columns).order_by(Visitor.id)
+        if since:
+            query = query.filter(key >= sort_key(literal(since, DateTime(timezone=True)), dialect))
+        if until:
+            query = query.filter(key < sort_key(literal(until, DateTime(timezone=True)), dialect))
+
+        result = await self.db.stream(query.execution_options(yield_per=chunk_size))
+        async for rows in result.partitions():
+            yield rows
+
+    async def search(self, query: str, limit: int, cursor: tuple[float, int] | None = None) -> Page:
+        """
+        Fuzzy search on name, company and contact, best match first (PostgreSQL, pg_trgm).
+
+        A name or company matches when it contains the query or is similar to it
+        (`<%`, pg_trgm.word_similarity_threshold); a contact matches on substring
+        only, since phone numbers share long prefixes. All conditions are answered
+        by the trigram GIN indexes of migration 0009. The score is the best
+        word_similarity over the three fields; ties go to the newest visitor.
+
+        Args:
+            query (str): Search text with at least three letters or digits.
+            limit (int): Maximum number of visitors to return.
+            cursor (tuple[float, int], optional): (score, id) of the last visitor on the previous page.
+
+        Returns:
+            Page: The visitors and the cursor of the next page.
+        """
+        contact = contact_search_key(query)
+        score = func.greatest(
+            func.word_similarity(query, Visitor.full_name),
+            func.word_similarity(query, Visitor.company),
+            func.word_similarity(contact, CONTACT_SEARCH_KEY),
+        ).cast(Float)
+        pattern = _like_pattern(query)
+        matches = or_(
+            literal(query).op("<%")(Visitor.full_name),
+            literal(query).op("<%")(Visitor.company),
+            Visitor.full_name.ilike(pattern, escape="\\"),
+            Visitor.company.ilike(pattern, escape="\\"),
+            CONTACT_SEARCH_KEY.like(_like_pattern(contact), escape="\\"),
+        )
+        statement = (
+            select(Visitor, score)
+            .filter(matches)
+            .order_by(score.desc(), Visitor.id.desc())
+            .limit(limit + 1)
+        )
+        if cursor:
+            statement = statement.filter(tuple_(score, Visitor.id) < tuple_(*cursor))
+
+        rows = (await self.db.execute(statement)).all()
+        page = Page(items=[visitor for visitor, _ in rows[:limit]])
+        if len(rows) > limit:
+            last, last_score = rows[limit - 1]
+            page.next_cursor = encode_rank_cursor(last_score, last.id)
+        return page
+
+    async def stream_search_terms(self, after_id: int = 0, chunk_size: int = 5000) -> AsyncIterator[list[Row]]:
+        """
+        Streams (id, full_name, company, contact) of visitors with an ID above `after_id`,
+        in ID order; feeds the in-process search index on databases without pg_trgm.
+
+        Yields:
+            list[Row]: Up to `chunk_size` rows.
+        """
+        result = await self.db.stream(
+            select(Visitor.id, Visitor.full_name, Visitor.company, Visitor.contact)
+            .filter(Visitor.id > after_id)
+            .order_by(Visitor.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        async for rows in result.partitions():
+            yield rows
+
+    async def get_by_ids(self, visitor_ids: list[int]) -> list[Visitor]:
+        """
+        Fetches visitors by ID in one query, returned in the order of `visitor_ids`.
+
+        Args:
+            visitor_ids (list[int]): Visitor IDs; unknown IDs are skipped.
+
+        Returns:
+            list[Visitor]: The visitors found.
+        """
+        if not visitor_ids:
+            return []
+        result = await self.db.execute(select(Visitor).filter(Visitor.id.in_(visitor_ids)))
+        by_id = {visitor.id: visitor for visitor in result.scalars()}
+        return [by_id[visitor_id] for visitor_id in visitor_ids if visitor_id in by_id]
+
+    async def set_badge_url(self, visitor_id: int, badge_url: str) -> None:
+        """
+        Stores the hosted badge URL for a visitor.
+
+        Args:
+            visitor_id (int): Visitor's unique ID.
+            badge_url (str): URL of the rendered QR badge.
+        """
+        await self.db.execute(update(Visitor).where(Visitor.id == visitor_id).values(badge_url=badge_url))
+        await self.db.commit()
+
+    async def set_badge_urls(self, badge_urls: dict[int, str]) -> None:
+        """
+        Stores hosted badge URLs for many visitors in one bulk UPDATE by primary key.
+
+        Args:
+            badge_urls (dict[int, str]): Badge URL per visitor ID.
+        """
+        if not badge_urls:
+            return
+        await self.db.execute(
+            update(Visitor),
+            [{"id": visitor_id, "badge_url": url} for visitor_id, url in badge_urls.items()]
+        )
+        await self.db.commit()
+
+    async def get_scan_state(self, visitor_id: int, day: date):
+        """
+        Fetches a visitor together with its approval state in a single round trip.
+
+        Args:
+            visitor_id (int): Visitor's unique ID.
+            day (date): Current UTC day, used to read the daily visit counter.
+
+        Returns:
+            Row | None: (visitor, latest approval, latest APPROVED approval, approved visits today),
+            or None if the visitor does not exist.
+        """
+        latest = aliased(Approval)
+        latest_approved = aliased(Approval)
+
+        latest_id = (
+            select(Approval.id)
+            .where(Approval.visitor_id == Visitor.id)
+            .order_by(Approval.requested_at.desc(), Approval.id.desc())
+            .limit(1)
+            .correlate(Visitor)
+            .scalar_subquery()
+        )
+        latest_approved_id = (
+            select(Approval.id)
+            .where(Approval.visitor_id == Visitor.id, Approval.status == ApprovalStatus.APPROVED)
+            .order_by(Approval.decision_at.desc().nullslast(), Approval.id.desc())
+            .limit(1)
+            .correlate(Visitor)
+            .scalar_subquery()
+        )
+        visits_today = (
+            select(VisitorDailyVisit.visits)
+            .where(VisitorDailyVisit.visitor_id == Visitor.id, VisitorDailyVisit.visit_date == day)
+            .correlate(Visitor)
+            .scalar_subquery()
+        )
+
+        result = await self.db.execute(
+            select(Visitor, latest, latest_approved, func.coalesce(visits_today, 0))
+            .select_from(Visitor)
+            .outerjoin(latest, latest.id == latest_id)
+            .outerjoin(latest_approved, latest_approved.id == latest_approved_id)
+            .filter(Visitor.id == visitor_id)
+        )
+        return result.first()
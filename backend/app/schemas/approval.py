@@ -2,7 +2,7 @@
 schemas/approval.py — Pydantic schemas for Approval-related operations and responses.
 """
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from enum import Enum
 from typing import Optional
 from datetime import datetime
@@ -37,3 +37,21 @@ class ApprovalAction(BaseModel):
     Schema for performing an approval action (approve or reject).
     """
     status: ApprovalStatus
+
+# Input schema for deciding many approvals at once
+class ApprovalBatchAction(BaseModel):
+    """
+    Schema for approving or rejecting several approvals in one request.
+    """
+    approval_ids: list[int] = Field(..., min_length=1, max_length=500)
+    status: ApprovalStatus
+
+# Result of a batch action
+class ApprovalBatchResult(BaseModel):
+    """
+    Approvals that changed status, and those skipped because they were not found,
+    belong to another host, or already had the requested status.
+    """
+    status: ApprovalStatus
+    updated: list[int]
+    skipped: list[int]
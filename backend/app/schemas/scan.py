@@ -0,0 +1,22 @@
+"""
+schemas/scan.py — Pydantic schema for gate scan decisions.
+"""
+
+from pydantic import BaseModel, HttpUrl
+from typing import Optional
+from app.schemas.approval import ApprovalStatus
+
+
+class ScanDecisionOut(BaseModel):
+    """
+    Compact response returned to guard tablets when a visitor badge is scanned.
+    """
+    visitor_id: int
+    full_name: str
+    host_employee_name: str
+    host_department: str
+    badge_url: Optional[HttpUrl]
+    status: Optional[ApprovalStatus]  # Latest approval status, None if never requested
+    allowed: bool
+    auto_approved: bool
+    checked_out: bool
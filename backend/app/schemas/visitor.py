@@ -18,7 +18,7 @@ class VisitorCreate(BaseModel):
     purpose: str
     host_employee_name: str
     host_department: str
-    photo_base64: str  # base64-encoded photo string
+    photo_base64: Optional[str] = None  # base64-encoded photo string; prefer the multipart upload endpoint
 
 
 class VisitorOut(BaseModel):
@@ -36,14 +36,33 @@ class VisitorOut(BaseModel):
     photo_url: Optional[HttpUrl]
     badge_url: Optional[HttpUrl]
     check_in: datetime
+    admitted_at: Optional[datetime] = None
     check_out: Optional[datetime]
     created_at: datetime
     approval: Optional["ApprovalOut"] = None  # forward ref
+    watch_token: Optional[str] = None  # registration only: subscribes a kiosk to this visitor's events
 
     class Config:
         from_attributes = True
 
 
+class VisitorImportError(BaseModel):
+    """
+    A row that could not be imported, numbered from 1 (CSV header excluded).
+    """
+    row: int
+    error: str
+
+
+class VisitorImportResult(BaseModel):
+    """
+    Summary returned by the bulk visitor import endpoint.
+    """
+    created: int
+    failed: int
+    errors: list[VisitorImportError]
+
+
 # Import after class definition to resolve circular reference
 from app.schemas.approval import ApprovalOut
 VisitorOut.update_forward_refs()
@@ -2,14 +2,14 @@
 services/approval_service.py — Contains business logic for handling visitor approvals.
 """
 
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.repos.approval_repo import ApprovalRepository
-from app.repos.visitor_repo import VisitorRepository
-from app.utils.qr_generator import generate_qr_and_upload
+from app.utils.badge_pipeline import badge_pipeline
+from app.utils.realtime import events
 from app.models import ApprovalStatus
 from app.logger_config import setup_logger
 
-logger = setup_logger()
+logger = setup_logger(__name__)
 
 class ApprovalService:
     """
@@ -19,11 +19,11 @@ class ApprovalService:
     - Generating QR badges for approved visitors
     """
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.repo = ApprovalRepository(db)
 
-    def create_approval_request(self, visitor_id: int, employee_id: int):
+    async def create_approval_request(self, visitor_id: int, employee_id: int):
         """
         Creates a new approval request for a visitor.
 
@@ -35,9 +35,11 @@ class ApprovalService:
             Approval: The created approval record.
         """
         logger.info(f"🔄 Creating approval request for visitor {visitor_id} and employee {employee_id}")
-        return self.repo.create_approval(visitor_id, employee_id)
+        approval = await self.repo.create_approval(visitor_id, employee_id)
+        events.approval_created(approval)
+        return approval
 
-    def get_pending_for_employee(self, employee_id: int):
+    async def get_pending_for_employee(self, employee_id: int):
         """
         Fetches all pending approval requests for a given employee.
 
@@ -48,11 +50,12 @@ class ApprovalService:
             List[Approval]: List of pending approvals.
         """
         logger.info(f"📥 Fetching pending approvals for employee {employee_id}")
-        return self.repo.get_pending_approvals_for_employee(employee_id)
+        return await self.repo.get_pending_approvals_for_employee(employee_id)
 
-    def process_approval(self, approval_id: int, status: str):
+    async def process_approval(self, approval_id: int, status: str):
         """
-        Updates the approval status and generates a badge if approved.
+        Updates the approval status and schedules badge generation if approved.
+        The badge is rendered and uploaded in the background; `badge_url` is filled in when ready.
 
         Args:
             approval_id (int): ID of the approval to update.
@@ -66,24 +69,42 @@ class ApprovalService:
             raise ValueError("Invalid approval status")
 
         logger.info(f"⚙️ Processing approval ID {approval_id} with status {status}")
-        updated = self.repo.update_status(approval_id, ApprovalStatus[status])
+        updated = await self.repo.update_status(approval_id, ApprovalStatus[status])
+        if updated:
+            events.approval_decided(updated)
 
-        # If approval successful and status is APPROVED, generate QR badge
-        if updated and status == "APPROVED":
-            qr_data = f"visitor:{updated.visitor_id}"
-            badge_url = generate_qr_and_upload(qr_data, filename=f"badge_{updated.visitor_id}")
+        # If approval successful and status is APPROVED, queue the QR badge (once per visitor)
+        if updated and status == "APPROVED" and not updated.visitor.badge_url:
+            badge_pipeline.submit(updated.visitor_id)
+            logger.info(f"🪪 Badge generation queued for visitor {updated.visitor_id}")
 
-            if not badge_url:
-                logger.warning(f"⚠️ QR badge generation failed for visitor {updated.visitor_id}")
+        return updated
 
-            visitor_repo = VisitorRepository(self.db)
-            visitor = visitor_repo.get_visitor_by_id(updated.visitor_id)
+    async def process_batch(self, approval_ids: list[int], employee_id: int, status: str) -> list[int]:
+        """
+        Applies one decision to many of a host's approvals and queues the resulting badges as one job.
 
-            if visitor:
-                visitor.badge_url = badge_url
-                self.db.commit()
-                logger.info(f"✅ Badge URL saved for visitor {visitor.id}")
-            else:
-                logger.error(f"❌ Visitor {updated.visitor_id} not found while saving badge")
+        Args:
+            approval_ids (list[int]): Approvals to decide.
+            employee_id (int): Host making the decision; approvals owned by others are left untouched.
+            status (str): 'APPROVED' or 'REJECTED'.
 
-        return updated
+        Returns:
+            list[int]: IDs of the approvals that changed status.
+        """
+        if status not in (ApprovalStatus.APPROVED.value, ApprovalStatus.REJECTED.value):
+            logger.warning(f"❌ Invalid batch approval status received: {status}")
+            raise ValueError("Batch actions only support APPROVED or REJECTED")
+
+        logger.info(f"⚙️ Processing {len(approval_ids)} approval(s) for employee {employee_id} with status {status}")
+        rows = await self.repo.bulk_update_status(approval_ids, employee_id, ApprovalStatus[status])
+        if rows:
+            events.approvals_bulk_decided(employee_id, status, [row.id for row in rows])
+
+        if status == "APPROVED":
+            needs_badge = [row.visitor_id for row in rows if not row.badge_url]
+            if needs_badge:
+                badge_pipeline.submit_many(needs_badge)
+                logger.info(f"🪪 Badge generation queued for {len(needs_badge)} visitor(s)")
+
+        return [row.id for row in rows]
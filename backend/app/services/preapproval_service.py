@@ -2,23 +2,24 @@
 services/preapproval_service.py — Handles business logic for scheduling and retrieving pre-approvals.
 """
 
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 from app.repos.preapproval_repo import PreApprovalRepository
+from app.utils.preapproval_index import preapproval_index
 from app.logger_config import setup_logger
 
-logger = setup_logger()
+logger = setup_logger(__name__)
 
 class PreApprovalService:
     """
     Manages pre-approval logic, including scheduling and retrieving pre-approved visit windows.
     """
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.repo = PreApprovalRepository(db)
 
-    def schedule_visit(
+    async def schedule_visit(
         self,
         visitor_id: int,
         employee_id: int,
@@ -43,7 +44,7 @@ class PreApprovalService:
             f"📅 Scheduling pre-approval: visitor={visitor_id}, employee={employee_id}, "
             f"from={valid_from}, to={valid_to}, max/day={max_visits_per_day}"
         )
-        return self.repo.create_preapproval(
+        pa = await self.repo.create_preapproval(
             visitor_id=visitor_id,
             employee_id=employee_id,
             valid_from=valid_from,
@@ -51,15 +52,21 @@ class PreApprovalService:
             max_visits_per_day=max_visits_per_day
         )
 
-    def list_preapprovals(self, employee_id: int):
+        # Make the new window visible to gate scans in this worker immediately
+        preapproval_index.add(pa)
+        return pa
+
+    async def list_preapprovals(self, employee_id: int, limit: int | None, cursor: tuple[datetime, int] | None = None):
         """
-        Lists all pre-approvals scheduled by a given employee.
+        Lists one page of the pre-approvals scheduled by a given employee, newest first.
 
         Args:
             employee_id (int): ID of the employee.
+            limit (int | None): Page size; None for every entry.
+            cursor (tuple[datetime, int], optional): Key of the last entry on the previous page.
 
         Returns:
-            List[PreApproval]: List of pre-approval entries.
+            Page: Pre-approval entries and the cursor of the next page.
         """
-        logger.info(f"📋 Fetching pre-approvals for employee {employee_id}")
-        return self.repo.get_preapprovals_for_employee(employee_id)
+        logger.info(f"📋 Fetching pre-approvals for employee {employee_id} (limit={limit})")
+        return await self.repo.list_for_employee(employee_id, limit, cursor)
@@ -0,0 +1,74 @@
+"""
+services/report_service.py — Visit analytics reports served from the hourly rollup.
+"""
+
+import os
+from datetime import date
+from typing import AsyncIterator
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.repos.visit_rollup_repo import VisitRollupRepository, REPORT_DIMENSIONS, REPORT_MEASURES
+
+# Rows fetched per round trip while a report streams
+REPORT_FETCH_SIZE = int(os.getenv("REPORT_FETCH_SIZE", "1000"))
+
+# Longest day range a single report may cover
+REPORT_MAX_DAYS = int(os.getenv("REPORT_MAX_DAYS", "1096"))
+
+
+def parse_group_by(spec: str) -> list[str]:
+    """
+    Parses a comma-separated list of report dimensions.
+
+    Raises:
+        ValueError: If a dimension is unknown or repeated.
+    """
+    group_by = [name.strip().lower() for name in spec.split(",") if name.strip()]
+    unknown = [name for name in group_by if name not in REPORT_DIMENSIONS]
+    if unknown:
+        raise ValueError(
+            f"Unknown group_by dimension(s): {', '.join(unknown)}. "
+            f"Allowed: {', '.join(REPORT_DIMENSIONS)}"
+        )
+    if len(set(group_by)) != len(group_by):
+        raise ValueError("group_by dimensions must not repeat")
+    return group_by
+
+
+def report_columns(group_by: list[str]) -> list[str]:
+    """Returns the output column names of a report grouped by `group_by`."""
+    return [column for name in group_by for column in REPORT_DIMENSIONS[name]] + list(REPORT_MEASURES)
+
+
+class ReportService:
+    """
+    Reads aggregate visit reports; the rollup keeps their cost independent of visitor volume.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def visit_rows(
+        self,
+        start: date,
+        end: date,
+        group_by: list[str],
+        department: str | None = None,
+        host_id: int | None = None
+    ) -> AsyncIterator[tuple]:
+        """
+        Streams report rows for an inclusive UTC day range.
+
+        Args:
+            start (date): First day.
+            end (date): Last day (inclusive).
+            group_by (list[str]): Dimensions, in output order; empty for a single total row.
+            department (str, optional): Only hosts in this department.
+            host_id (int, optional): Only this host.
+
+        Yields:
+            tuple: Values in `report_columns(group_by)` order.
+        """
+        query = VisitRollupRepository.report_query(start, end, group_by, department, host_id)
+        result = await self.db.stream(query.execution_options(yield_per=REPORT_FETCH_SIZE))
+        async for row in result:
+            yield tuple(row)
@@ -0,0 +1,143 @@
+"""
+services/visitor_import_service.py — Bulk visitor registration from streamed CSV / NDJSON.
+
+Rows are validated one by one and written in batches: hosts are resolved
+through the shared employee directory (one query per batch at most), visitors and their approval requests go in as
+multi-row INSERTs with one commit per batch, and every host gets a single
+summary email at the end. Photos are not part of bulk imports.
+"""
+
+import os
+from dataclasses import dataclass, field
+from typing import AsyncIterator
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.repos.visitor_repo import VisitorRepository
+from app.repos.approval_repo import ApprovalRepository
+from app.schemas.visitor import VisitorCreate
+from app.utils.email import send_bulk_visitor_notification
+from app.utils.record_stream import ParsedRow
+from app.utils.realtime import events
+from app.utils.employee_directory import employee_directory, host_key
+from app.logger_config import setup_logger
+
+logger = setup_logger(__name__)
+
+VISITOR_IMPORT_BATCH_SIZE = int(os.getenv("VISITOR_IMPORT_BATCH_SIZE", "500"))
+VISITOR_IMPORT_MAX_ROWS = int(os.getenv("VISITOR_IMPORT_MAX_ROWS", "20000"))
+VISITOR_IMPORT_MAX_ERRORS = int(os.getenv("VISITOR_IMPORT_MAX_ERRORS", "1000"))
+
+
+@dataclass
+class ImportReport:
+    """Outcome of a bulk import; only the first VISITOR_IMPORT_MAX_ERRORS errors are kept."""
+    created: int = 0
+    failed: int = 0
+    errors: list[dict] = field(default_factory=list)
+
+    def add_error(self, row: int, error: str) -> None:
+        self.failed += 1
+        if len(self.errors) < VISITOR_IMPORT_MAX_ERRORS:
+            self.errors.append({"row": row, "error": error})
+
+
+def _describe(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc']) or 'row'}: {e['msg']}"
+        for e in error.errors()
+    )
+
+
+class VisitorImportService:
+    """
+    Imports visitors in batches on a single session.
+    """
+
+    def __init__(self, db: AsyncSession, batch_size: int = VISITOR_IMPORT_BATCH_SIZE):
+        self.db = db
+        self.batch_size = batch_size
+        self.visitors = VisitorRepository(db)
+        self.approvals = ApprovalRepository(db)
+        self._notify: dict[str, list[str]] = {}
+        self._created: dict[int, int] = {}
+
+    async def import_records(self, records: AsyncIterator[ParsedRow]) -> ImportReport:
+        """
+        Validates and stores every parsed record, reporting failures per row.
+
+        Args:
+            records (AsyncIterator[ParsedRow]): Output of `iter_csv_records` / `iter_ndjson_records`.
+
+        Returns:
+            ImportReport: Number of visitors created and the rows that failed.
+        """
+        report = ImportReport()
+        batch: list[tuple[int, VisitorCreate]] = []
+
+        async for row, record, error in records:
+            if row > VISITOR_IMPORT_MAX_ROWS:
+                report.add_error(row, f"Import is limited to {VISITOR_IMPORT_MAX_ROWS} rows; remaining rows were skipped")
+                break
+            if error:
+                report.add_error(row, error)
+                continue
+            try:
+                batch.append((row, VisitorCreate(**record)))
+            except ValidationError as e:
+                report.add_error(row, _describe(e))
+                continue
+
+            if len(batch) >= self.batch_size:
+                await self._flush(batch, report)
+                batch = []
+
+        if batch:
+            await self._flush(batch, report)
+
+        for email, names in self._notify.items():
+            send_bulk_visitor_notification(email, names)
+        for employee_id, count in self._created.items():
+            events.approvals_bulk_created(employee_id, count)
+
+        logger.info(f"📥 Visitor import finished: {report.created} created, {report.failed} failed")
+        return report
+
+    async def _flush(self, batch: list[tuple[int, VisitorCreate]], report: ImportReport) -> None:
+        """Writes one batch of visitors and their approval requests in a single transaction."""
+        keys = [host_key(data.host_employee_name, data.host_department) for _, data in batch]
+        hosts_by_key = await employee_directory.resolve_many(self.db, set(keys))
+
+        rows, visitors, hosts = [], [], []
+        for (row, data), key in zip(batch, keys):
+            host = hosts_by_key[key]
+            if not host:
+                report.add_error(row, "Host employee not found in the specified department")
+                continue
+            rows.append(row)
+            visitors.append(data.dict(exclude={"photo_base64"}))
+            hosts.append(host)
+
+        if not visitors:
+            return
+
+        try:
+            visitor_ids = await self.visitors.bulk_create(visitors)
+            await self.approvals.bulk_create([
+                {"visitor_id": visitor_id, "employee_id": host.id}
+                for visitor_id, host in zip(visitor_ids, hosts)
+            ])
+            await self.db.commit()
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            logger.error(f"❌ Failed to import batch of {len(visitors)} visitor(s): {e}")
+            for row in rows:
+                report.add_error(row, "Database error while saving this row's batch")
+            return
+
+        report.created += len(visitor_ids)
+        for data, host in zip(visitors, hosts):
+            self._created[host.id] = self._created.get(host.id, 0) + 1
+            if host.email:
+                self._notify.setdefault(host.email, []).append(data["full_name"])
+        logger.info(f"📥 Imported batch of {len(visitor_ids)} visitor(s)")
@@ -2,46 +2,86 @@
 services/visitor_service.py — Handles visitor registration and data retrieval.
 """
 
-from sqlalchemy.orm import Session
-from app.repos.visitor_repo import VisitorRepository
-from app.repos.employee_repo import EmployeeRepository
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Visitor, Approval, ApprovalStatus
+from app.repos.visitor_repo import VisitorRepository, contact_search_key
+from app.repos.visit_counter_repo import VisitCounterRepository
+from app.repos.visit_rollup_repo import VisitRollupRepository, RollupDeltas
 from app.services.approval_service import ApprovalService
-from app.utils.image_uploader import upload_image_base64
+from app.utils.image_uploader import decode_base64_image, store_photo, PHOTO_REUSE_MAX_AGE_DAYS
+from app.utils.employee_directory import employee_directory, HostEntry
+from app.utils.preapproval_index import preapproval_index
+from app.utils.visitor_search_index import visitor_search_index
+from app.utils.pagination import Page, encode_rank_cursor
+from app.utils.badge_pipeline import badge_pipeline
+from app.utils.realtime import events
 from app.logger_config import setup_logger
 
-logger = setup_logger()
+logger = setup_logger(__name__)
+
+
+@dataclass
+class ScanOutcome:
+    """Result of evaluating a visitor at the gate."""
+    visitor: Visitor
+    latest_approval: Approval | None
+    latest_approved: Approval | None
+    auto_approved: bool = False
 
 class VisitorService:
     """
     Manages business logic for visitor-related operations:
-    - Registration
+    - Registration (returning visitors keep their stored photo)
     - Lookup
+    - Gate scans (pre-approval auto-approval)
+    - Fuzzy search
     """
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.repo = VisitorRepository(db)
 
-    def register_visitor(self, data: dict):
+    async def register_visitor(self, data: dict, photo: bytes | None = None, host: HostEntry | None = None):
         """
         Registers a new visitor, uploads photo, stores info, and sends approval request.
 
+        A returning visitor (same normalized contact and name as an earlier visit) keeps
+        the photo already stored, and any photo sent with the registration is ignored.
+
         Args:
             data (dict): Visitor details from the request body.
+            photo (bytes | None): Raw photo from a multipart upload; falls back to `photo_base64`.
+            host (HostEntry | None): Host already resolved by the caller; looked up otherwise.
 
         Returns:
             Visitor: The created visitor instance.
         
         Raises:
-            Exception: If host employee is not found.
+            ValueError: If the photo is not a readable image or the host employee is not found.
         """
         logger.info(f"📝 Registering visitor: {data.get('full_name')}")
 
-        # Upload photo if provided
-        photo_url = None
-        if data.get("photo_base64"):
-            logger.info("📷 Uploading visitor photo...")
-            photo_url = upload_image_base64(data["photo_base64"])
+        # Resolve the host before any upload or insert so a bad host leaves nothing behind
+        if host is None:
+            host = await employee_directory.resolve(self.db, data["host_employee_name"], data["host_department"])
+        if not host:
+            logger.error("❌ Host employee not found")
+            raise ValueError("Host employee not found in the specified department")
+
+        # A returning visitor's stored photo is reused: no decode, downscale or upload
+        photo_url = await self._returning_photo(data["contact"], data["full_name"])
+        if photo_url:
+            logger.info("♻️ Returning visitor, reusing stored photo")
+        else:
+            if photo is None and data.get("photo_base64"):
+                photo = decode_base64_image(data["photo_base64"])
+
+            # Downscale and upload photo if provided
+            if photo:
+                logger.info("📷 Uploading visitor photo...")
+                photo_url = await store_photo(photo)
 
         # Build visitor data dict
         visitor_data = {
@@ -54,25 +94,35 @@ class VisitorService:
             "photo_url": photo_url,
         }
 
-        visitor = self.repo.create_visitor(visitor_data)
+        visitor = await self.repo.create_visitor(visitor_data)
+        visitor_search_index.add(visitor)
         logger.info(f"✅ Visitor record created with ID {visitor.id}")
 
-        # Fetch host employee
-        employee_repo = EmployeeRepository(self.db)
-        host = employee_repo.get_employee_by_name(data["host_employee_name"])
-
-        if not host:
-            logger.error("❌ Host employee not found")
-            raise Exception("Host employee not found")
-
         # Create approval request
         logger.info(f"🔔 Creating approval request for host ID {host.id}")
         approval_service = ApprovalService(self.db)
-        approval_service.create_approval_request(visitor.id, employee_id=host.id)
+        await approval_service.create_approval_request(visitor.id, employee_id=host.id)
 
         return visitor
 
-    def fetch_visitor(self, visitor_id: int):
+    async def _returning_photo(self, contact: str, full_name: str) -> str | None:
+        """
+        Returns the stored photo of a returning visitor (same normalized contact and name)
+        unless it is older than PHOTO_REUSE_MAX_AGE_DAYS.
+        """
+        if PHOTO_REUSE_MAX_AGE_DAYS <= 0:
+            return None
+        found = await self.repo.find_returning_photo(contact, full_name)
+        if not found:
+            return None
+        photo_url, first_used = found
+        if first_used.tzinfo is None:  # SQLite returns naive UTC timestamps
+            first_used = first_used.replace(tzinfo=timezone.utc)
+        if datetime.now(timezone.utc) - first_used > timedelta(days=PHOTO_REUSE_MAX_AGE_DAYS):
+            return None
+        return photo_url
+
+    async def fetch_visitor(self, visitor_id: int):
         """
         Fetches visitor details by ID.
 
@@ -83,4 +133,145 @@ class VisitorService:
             Visitor | None: Visitor object or None if not found.
         """
         logger.info(f"🔎 Fetching visitor with ID {visitor_id}")
-        return self.repo.get_visitor_by_id(visitor_id)
+        return await self.repo.get_visitor_by_id(visitor_id)
+
+    async def search(self, query: str, limit: int, cursor: tuple[float, int] | None = None) -> Page:
+        """
+        Ranked fuzzy search on visitor name, company and contact.
+
+        PostgreSQL answers from its trigram indexes in one query; other databases
+        rank in the per-process search index and load the page's visitors by ID.
+
+        Args:
+            query (str): Search text.
+            limit (int): Page size.
+            cursor (tuple[float, int], optional): (score, id) of the last visitor on the previous page.
+
+        Returns:
+            Page: Matching visitors, best match first.
+
+        Raises:
+            ValueError: If the query has fewer than three letters or digits.
+        """
+        if len(contact_search_key(query)) < 3:
+            raise ValueError("Search text must contain at least 3 letters or digits")
+        if self.db.bind.dialect.name == "postgresql":
+            return await self.repo.search(query, limit, cursor)
+
+        await visitor_search_index.ensure_fresh(self.db)
+        hits = visitor_search_index.search(query, limit + 1, cursor)
+        page = Page(items=await self.repo.get_by_ids([visitor_id for _, visitor_id in hits[:limit]]))
+        if len(hits) > limit:
+            page.next_cursor = encode_rank_cursor(*hits[limit - 1])
+        return page
+
+    async def check_out(self, visitor: Visitor) -> Visitor:
+        """
+        Records a visitor's checkout and counts it (with the time spent on site) in the
+        analytics rollup, in one transaction.
+
+        Args:
+            visitor (Visitor): A visitor that has not checked out yet.
+
+        Returns:
+            Visitor: The refreshed visitor.
+        """
+        visitor.check_out = datetime.now(timezone.utc)
+        host_id = await VisitRollupRepository(self.db).get_host_id(visitor.id)
+        if host_id is not None:
+            deltas = RollupDeltas()
+            deltas.add_checkout(visitor.check_in, visitor.check_out, host_id)
+            await VisitRollupRepository(self.db).apply(deltas)
+
+        await self.db.commit()
+        await self.db.refresh(visitor)
+        logger.info(f"👋 Visitor {visitor.id} checked out")
+        return visitor
+
+    async def scan_visitor(self, visitor_id: int) -> ScanOutcome | None:
+        """
+        Evaluates a visitor at the gate.
+
+        Loads the visitor and its approval state in one query and checks the in-memory
+        pre-approval index. If there is no approval yet (or it is PENDING) and the visitor
+        is inside a pre-approved window with visits left today, the visit is auto-approved.
+
+        Args:
+            visitor_id (int): The ID of the scanned visitor.
+
+        Returns:
+            ScanOutcome | None: Visitor with its approval state, or None if not found.
+        """
+        now = datetime.now(timezone.utc)
+        await preapproval_index.ensure_fresh(self.db, now)
+
+        row = await self.repo.get_scan_state(visitor_id, now.date())
+        if not row:
+            return None
+
+        visitor, latest, latest_approved, visits_today = row
+        outcome = ScanOutcome(visitor=visitor, latest_approval=latest, latest_approved=latest_approved)
+
+        if latest and latest.status != ApprovalStatus.PENDING:
+            return outcome
+
+        window = preapproval_index.lookup(visitor_id, now)
+        if not window:
+            return outcome
+
+        if visits_today >= window.max_visits_per_day:
+            logger.info(f"🚫 Visitor {visitor_id} reached {window.max_visits_per_day} visits today")
+            return outcome
+
+        try:
+            # Atomic check-and-increment; commits or rolls back together with the approval
+            counted = await VisitCounterRepository(self.db).try_increment(
+                visitor_id, now.date(), window.max_visits_per_day
+            )
+            if counted is None:
+                logger.info(f"🚫 Visitor {visitor_id} reached {window.max_visits_per_day} visits today")
+                return outcome
+
+            logger.info(f"⚡ Visitor {visitor_id} inside pre-approval window {window.id}, auto-approving")
+
+            # Update existing PENDING approval if exists
+            if latest:
+                latest.status = ApprovalStatus.APPROVED
+                latest.decision_at = now
+                approval = latest
+            else:
+                approval = Approval(
+                    visitor_id=visitor_id,
+                    employee_id=window.employee_id,
+                    status=ApprovalStatus.APPROVED,
+                    decision_at=now,
+                    requested_at=now
+                )
+                self.db.add(approval)
+            if visitor.admitted_at is None:
+                visitor.admitted_at = now
+
+            deltas = RollupDeltas()
+            deltas.add_decision(now, approval.employee_id, ApprovalStatus.APPROVED)
+            await VisitRollupRepository(self.db).apply(deltas)
+            await self.db.commit()
+            outcome.latest_approval = approval
+            outcome.latest_approved = approval
+            outcome.auto_approved = True
+            events.approval_decided(approval)
+
+            # Render/upload the QR badge in the background and email it when ready
+            if not visitor.badge_url:
+                badge_pipeline.submit(visitor_id, notify=(visitor.contact, visitor.full_name))
+                logger.info(f"🪪 Badge generation queued for visitor {visitor_id}")
+
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"❌ Auto-approval failed: {e}", exc_info=True)
+
+            # Rollback expires loaded rows; reload them so callers never trigger lazy IO
+            for obj in (visitor, latest, latest_approved):
+                if obj is not None:
+                    await self.db.refresh(obj)
+
+        return outcome
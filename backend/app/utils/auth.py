@@ -2,13 +2,19 @@
 auth.py — Utility functions for handling authentication in the Visitor Management System.
 
 Includes:
-- Password hashing/verification (bcrypt)
-- JWT access token creation and decoding
+- Password hashing/verification (bcrypt), optionally in a bounded process pool
+- JWT access token creation and decoding, with a cache of verified payloads
+- Short-lived visitor watch tokens, letting a kiosk follow one visitor's badge events
 """
 
 from passlib.context import CryptContext
 from jose import JWTError, jwt
+import asyncio
+import hashlib
 import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 
 # ------------------------
@@ -25,6 +31,17 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 # Password hashing context using bcrypt
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt verification pool: worker processes, and how many verifications may wait for one
+AUTH_HASH_WORKERS = int(os.getenv("AUTH_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+AUTH_HASH_MAX_PENDING = int(os.getenv("AUTH_HASH_MAX_PENDING", str(AUTH_HASH_WORKERS * 8)))
+
+# Lifetime of the watch token returned with a registration (minutes)
+VISITOR_WATCH_TOKEN_MINUTES = int(os.getenv("VISITOR_WATCH_TOKEN_MINUTES", "30"))
+VISITOR_WATCH_SCOPE = "watch_visitor"
+
+# Verified JWT payloads kept in memory, keyed by token digest
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "4096"))
+
 
 # ------------------------
 # Password Utilities
@@ -57,6 +74,45 @@ def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
 
 
+class PasswordHasherBusy(Exception):
+    """Raised when too many password verifications are already queued."""
+
+
+_pending_verifications = 0
+
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    """
+    Verifies a password in the "auth" process pool so bcrypt never competes with
+    request handling for the server's CPU time.
+
+    Args:
+        plain (str): Raw password string.
+        hashed (str): Hashed password from DB.
+
+    Returns:
+        bool: True if match, else False.
+
+    Raises:
+        PasswordHasherBusy: If AUTH_HASH_MAX_PENDING verifications are already running or queued.
+    """
+    # Imported here: this module is also loaded inside the pool's worker processes
+    from app.utils.workers import process_pool
+
+    global _pending_verifications
+    if _pending_verifications >= AUTH_HASH_MAX_PENDING:
+        raise PasswordHasherBusy()
+
+    _pending_verifications += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            process_pool("auth", max_workers=AUTH_HASH_WORKERS), verify_password, plain, hashed
+        )
+    finally:
+        _pending_verifications -= 1
+
+
 # ------------------------
 # JWT Token Utilities
 # ------------------------
@@ -93,3 +149,88 @@ def decode_token(token: str) -> dict | None:
         return payload
     except JWTError:
         return None  # You can optionally log the failure here
+
+
+def create_visitor_watch_token(visitor_id: int) -> str:
+    """
+    Creates the token a kiosk presents to subscribe to one visitor's events.
+
+    Args:
+        visitor_id (int): The registered visitor.
+
+    Returns:
+        str: Encoded JWT, valid for VISITOR_WATCH_TOKEN_MINUTES.
+    """
+    return create_access_token(
+        {"scope": VISITOR_WATCH_SCOPE, "visitor_id": visitor_id},
+        timedelta(minutes=VISITOR_WATCH_TOKEN_MINUTES)
+    )
+
+
+def decode_visitor_watch_token(token: str) -> int | None:
+    """
+    Returns the visitor ID of a valid watch token, or None if it is invalid, expired
+    or another kind of token.
+    """
+    payload = decode_token_cached(token)
+    if not payload or payload.get("scope") != VISITOR_WATCH_SCOPE:
+        return None
+    visitor_id = payload.get("visitor_id")
+    return visitor_id if isinstance(visitor_id, int) else None
+
+
+class TokenCache:
+    """
+    Bounded LRU of verified token payloads keyed by the token's SHA-256 digest.
+    Entries are dropped once the token's `exp` has passed.
+    """
+
+    def __init__(self, max_entries: int = JWT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[bytes, tuple[dict, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, digest: bytes) -> dict | None:
+        with self._lock:
+            cached = self._entries.get(digest)
+            if cached is None:
+                return None
+            payload, expires_at = cached
+            if expires_at <= time.time():
+                del self._entries[digest]
+                return None
+            self._entries.move_to_end(digest)
+            return dict(payload)
+
+    def put(self, digest: bytes, payload: dict) -> None:
+        expires_at = payload.get("exp")
+        if not isinstance(expires_at, (int, float)):
+            return  # tokens without an expiry are never cached
+        with self._lock:
+            self._entries[digest] = (dict(payload), float(expires_at))
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+token_cache = TokenCache()
+
+
+def decode_token_cached(token: str) -> dict | None:
+    """
+    Same as `decode_token`, but repeat calls with a still-valid token skip
+    signature verification.
+
+    Args:
+        token (str): Encoded JWT token.
+
+    Returns:
+        dict | None: Payload if valid, else None (invalid/expired).
+    """
+    digest = hashlib.sha256(token.encode("utf-8")).digest()
+    payload = token_cache.get(digest)
+    if payload is None:
+        payload = decode_token(token)
+        if payload:
+            token_cache.put(digest, payload)
+    return payload
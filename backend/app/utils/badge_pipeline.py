@@ -0,0 +1,174 @@
+"""
+utils/badge_pipeline.py — Background QR badge generation with content-addressed caching.
+
+Approving a visitor only schedules its badge; the request returns immediately.
+In the background the badge is:
+- Keyed by the SHA-256 of its payload, so identical badges share one image
+- Rendered in a worker process (CPU-bound QR/PNG encoding)
+- Uploaded from a thread (blocking storage I/O)
+- Saved to `visitors.badge_url` and pushed to kiosks watching the visitor,
+  optionally followed by the badge email
+
+Identical badges requested concurrently are rendered once; finished ones are
+remembered in a bounded LRU, so they are never re-rendered or re-uploaded.
+"""
+
+import asyncio
+import hashlib
+import os
+from collections import OrderedDict
+from app.core.config import AsyncSessionLocal
+from app.repos.visitor_repo import VisitorRepository
+from app.utils.email import send_badge_email
+from app.utils.realtime import events
+from app.utils.imaging import render_qr_png
+from app.utils.qr_generator import upload_badge_png, find_badge
+from app.utils.workers import process_pool
+from app.logger_config import setup_logger
+
+logger = setup_logger(__name__)
+
+BADGE_CACHE_SIZE = int(os.getenv("BADGE_CACHE_SIZE", "10000"))
+
+
+def badge_payload(visitor_id: int) -> str:
+    """Returns the content encoded in a visitor's QR badge."""
+    return f"visitor:{visitor_id}"
+
+
+def badge_key(payload: str) -> str:
+    """Returns the content address (SHA-256 hex digest) of a badge payload."""
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class BadgePipeline:
+    """
+    Schedules and deduplicates badge rendering/upload jobs for this worker process.
+    """
+
+    def __init__(self, cache_size: int = BADGE_CACHE_SIZE):
+        self.cache_size = cache_size
+        self._urls: OrderedDict[str, str] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._jobs: set[asyncio.Task] = set()
+
+    def submit(self, visitor_id: int, notify: tuple[str, str] | None = None) -> asyncio.Task:
+        """
+        Schedules badge generation for a visitor and returns without waiting.
+
+        Args:
+            visitor_id (int): Visitor to generate the badge for.
+            notify (tuple[str, str] | None): (email, full name) to send the badge to once ready.
+
+        Returns:
+            asyncio.Task: The background job (callers normally ignore it).
+        """
+        job = asyncio.create_task(self._run(visitor_id, notify))
+        self._jobs.add(job)
+        job.add_done_callback(self._jobs.discard)
+        return job
+
+    async def _run(self, visitor_id: int, notify: tuple[str, str] | None) -> None:
+        try:
+            url = await self.get_or_create(badge_payload(visitor_id))
+            if not url:
+                logger.warning(f"⚠️ QR badge generation failed for visitor {visitor_id}")
+                return
+
+            async with AsyncSessionLocal() as db:
+                await VisitorRepository(db).set_badge_url(visitor_id, url)
+            logger.info(f"✅ Badge URL saved for visitor {visitor_id}")
+            events.badge_ready(visitor_id, url)
+
+            if notify:
+                send_badge_email(notify[0], notify[1], url)
+        except Exception as e:
+            logger.error(f"❌ Badge job failed for visitor {visitor_id}: {e}", exc_info=True)
+
+    def submit_many(self, visitor_ids: list[int]) -> asyncio.Task:
+        """
+        Schedules badges for a batch of visitors as one background job.
+
+        Badges render concurrently and all URLs are saved with a single bulk UPDATE.
+
+        Args:
+            visitor_ids (list[int]): Visitors to generate badges for.
+
+        Returns:
+            asyncio.Task: The background job (callers normally ignore it).
+        """
+        job = asyncio.create_task(self._run_many(list(dict.fromkeys(visitor_ids))))
+        self._jobs.add(job)
+        job.add_done_callback(self._jobs.discard)
+        return job
+
+    async def _run_many(self, visitor_ids: list[int]) -> None:
+        try:
+            urls = await asyncio.gather(
+                *(self.get_or_create(badge_payload(visitor_id)) for visitor_id in visitor_ids),
+                return_exceptions=True
+            )
+            ready = {
+                visitor_id: url for visitor_id, url in zip(visitor_ids, urls)
+                if isinstance(url, str)
+            }
+            if len(ready) < len(visitor_ids):
+                logger.warning(f"⚠️ QR badge generation failed for {len(visitor_ids) - len(ready)} visitor(s)")
+
+            async with AsyncSessionLocal() as db:
+                await VisitorRepository(db).set_badge_urls(ready)
+            logger.info(f"✅ Badge URLs saved for {len(ready)} visitor(s)")
+            for visitor_id, url in ready.items():
+                events.badge_ready(visitor_id, url)
+        except Exception as e:
+            logger.error(f"❌ Batch badge job failed for {len(visitor_ids)} visitor(s): {e}", exc_info=True)
+
+    async def get_or_create(self, payload: str) -> str | None:
+        """
+        Returns the hosted URL for a badge, rendering and uploading it only if needed.
+
+        Args:
+            payload (str): Content to encode in the QR code.
+
+        Returns:
+            str | None: Badge URL, or None if rendering/upload failed.
+        """
+        key = badge_key(payload)
+
+        url = self._urls.get(key)
+        if url:
+            self._urls.move_to_end(key)
+            return url
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._render_and_upload(key, payload))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _render_and_upload(self, key: str, payload: str) -> str | None:
+        # Another worker (or an earlier run) may already have stored this badge
+        url = await asyncio.to_thread(find_badge, key)
+        if not url:
+            loop = asyncio.get_running_loop()
+            png = await loop.run_in_executor(process_pool("render"), render_qr_png, payload)
+            url = await asyncio.to_thread(upload_badge_png, png, key)
+
+        if url:
+            self._urls[key] = url
+            if len(self._urls) > self.cache_size:
+                self._urls.popitem(last=False)
+        return url
+
+    async def drain(self, timeout: float = 30.0) -> None:
+        """Waits for scheduled badge jobs to finish (used on shutdown)."""
+        if not self._jobs:
+            return
+        done, pending = await asyncio.wait(set(self._jobs), timeout=timeout)
+        if pending:
+            logger.warning(f"⚠️ {len(pending)} badge job(s) still running at shutdown")
+
+
+# Shared per-process pipeline
+badge_pipeline = BadgePipeline()
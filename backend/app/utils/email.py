@@ -1,24 +1,18 @@
 """
-utils/email.py — SendGrid-based email utility functions for visitor notifications and badge delivery.
+utils/email.py — Email templates for visitor notifications and badge delivery.
+
+Messages are handed to the background email queue (utils/email_queue.py);
+these functions return as soon as the message is enqueued.
 """
 
-import os
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
-from dotenv import load_dotenv
+from app.utils.email_queue import email_dispatcher, OutboundEmail
 from app.logger_config import setup_logger
 
-# Load environment variables and initialize logger
-load_dotenv()
-logger = setup_logger()
-
-# Email Configuration
-SENDGRID_API_KEY = os.getenv("SENDGRID_API_KEY")
-FROM_EMAIL = os.getenv("FROM_EMAIL")
+logger = setup_logger(__name__)
 
-def send_visitor_notification(to_email: str, visitor_name: str, purpose: str) -> int | None:
+def send_visitor_notification(to_email: str, visitor_name: str, purpose: str) -> bool:
     """
-    Sends an approval request email to the host employee when a visitor registers.
+    Queues an approval request email to the host employee when a visitor registers.
 
     Args:
         to_email (str): Host employee's email address.
@@ -26,17 +20,12 @@ def send_visitor_notification(to_email: str, visitor_name: str, purpose: str) ->
         purpose (str): Purpose of the visit.
 
     Returns:
-        int | None: HTTP status code if sent successfully, None otherwise.
+        bool: True if the email was queued, False otherwise.
     """
-    if not SENDGRID_API_KEY or not FROM_EMAIL:
-        logger.error("❌ SendGrid API key or FROM_EMAIL is not configured.")
-        return None
-
-    message = Mail(
-        from_email=FROM_EMAIL,
-        to_emails=to_email,
+    message = OutboundEmail(
+        to=to_email,
         subject="🔔 New Visitor Approval Request",
-        html_content=f"""
+        html=f"""
             <div style="font-family: Arial, sans-serif; font-size: 15px; color: #333;">
                 <p><strong>New Visitor Registered</strong></p>
                 <p>
@@ -49,18 +38,14 @@ def send_visitor_notification(to_email: str, visitor_name: str, purpose: str) ->
         """
     )
 
-    try:
-        sg = SendGridAPIClient(SENDGRID_API_KEY)
-        response = sg.send(message)
-        logger.info(f"📧 Visitor request email sent to {to_email} — status {response.status_code}")
-        return response.status_code
-    except Exception as e:
-        logger.error(f"❌ Error sending approval email to {to_email}: {e}")
-        return None
+    queued = email_dispatcher.enqueue(message)
+    if queued:
+        logger.info(f"📧 Visitor request email queued for {to_email}")
+    return queued
 
-def send_badge_email(to_email: str, visitor_name: str, badge_url: str) -> int | None:
+def send_badge_email(to_email: str, visitor_name: str, badge_url: str) -> bool:
     """
-    Sends the visitor their QR badge via email after pre-approval.
+    Queues the visitor's QR badge email after pre-approval.
 
     Args:
         to_email (str): Visitor's email address.
@@ -68,17 +53,12 @@ def send_badge_email(to_email: str, visitor_name: str, badge_url: str) -> int |
         badge_url (str): URL to the hosted QR badge.
 
     Returns:
-        int | None: HTTP status code if sent successfully, None otherwise.
+        bool: True if the email was queued, False otherwise.
     """
-    if not SENDGRID_API_KEY or not FROM_EMAIL:
-        logger.error("❌ SendGrid API key or FROM_EMAIL is not configured.")
-        return None
-
-    message = Mail(
-        from_email=FROM_EMAIL,
-        to_emails=to_email,
+    message = OutboundEmail(
+        to=to_email,
         subject="🪪 Your Visitor QR Badge",
-        html_content=f"""
+        html=f"""
             <div style="font-family: Arial, sans-serif; font-size: 15px; color: #333;">
                 <p><strong>Hello {visitor_name},</strong></p>
                 <p>
@@ -91,11 +71,42 @@ def send_badge_email(to_email: str, visitor_name: str, badge_url: str) -> int |
         """
     )
 
-    try:
-        sg = SendGridAPIClient(SENDGRID_API_KEY)
-        response = sg.send(message)
-        logger.info(f"📧 Badge email sent to {to_email} — status {response.status_code}")
-        return response.status_code
-    except Exception as e:
-        logger.error(f"❌ Error sending badge email to {to_email}: {e}")
-        return None
+    queued = email_dispatcher.enqueue(message)
+    if queued:
+        logger.info(f"📧 Badge email queued for {to_email}")
+    return queued
+
+def send_bulk_visitor_notification(to_email: str, visitor_names: list[str], max_listed: int = 50) -> bool:
+    """
+    Queues a single summary email to a host for visitors registered through a bulk import.
+
+    Args:
+        to_email (str): Host employee's email address.
+        visitor_names (list[str]): Names of the imported visitors awaiting approval.
+        max_listed (int): Maximum number of names written into the email body.
+
+    Returns:
+        bool: True if the email was queued, False otherwise.
+    """
+    listed = "".join(f"<li>{name}</li>" for name in visitor_names[:max_listed])
+    remaining = len(visitor_names) - max_listed
+    more = f"<p>…and {remaining} more.</p>" if remaining > 0 else ""
+
+    message = OutboundEmail(
+        to=to_email,
+        subject=f"🔔 {len(visitor_names)} New Visitor Approval Request(s)",
+        html=f"""
+            <div style="font-family: Arial, sans-serif; font-size: 15px; color: #333;">
+                <p><strong>{len(visitor_names)} visitor(s) were registered for you</strong></p>
+                <ul>{listed}</ul>
+                {more}
+                <p>Please log in to your dashboard to approve or reject these requests.</p>
+                <p>Regards,<br><b>Visitor Management System</b></p>
+            </div>
+        """
+    )
+
+    queued = email_dispatcher.enqueue(message)
+    if queued:
+        logger.info(f"📧 Bulk visitor request email ({len(visitor_names)} visitors) queued for {to_email}")
+    return queued
@@ -0,0 +1,335 @@
+"""
+utils/email_queue.py — Background outbound email queue with pluggable transports.
+
+Request handlers only enqueue messages; a small pool of worker threads drains the
+queue in batches, reusing one transport (and one provider client) for every send.
+Failed messages are retried with exponential backoff.
+
+Transports (EMAIL_TRANSPORT):
+- sendgrid: SendGrid Web API; identical messages are merged into one API call
+- smtp: any SMTP server, e.g. a local MailHog/Mailpit sink
+- file: writes each message as an .eml file (local development)
+- memory: keeps messages in a list (tests, benchmarks)
+"""
+
+import os
+import queue
+import random
+import smtplib
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from email.message import EmailMessage as MIMEMessage
+from dotenv import load_dotenv
+from app.core.metrics import outbound_timer
+from app.logger_config import setup_logger
+
+load_dotenv()
+logger = setup_logger(__name__)
+
+# Queue configuration
+EMAIL_TRANSPORT = os.getenv("EMAIL_TRANSPORT", "sendgrid").lower()
+EMAIL_WORKERS = int(os.getenv("EMAIL_WORKERS", "2"))
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", "50"))
+EMAIL_QUEUE_SIZE = int(os.getenv("EMAIL_QUEUE_SIZE", "10000"))
+EMAIL_MAX_RETRIES = int(os.getenv("EMAIL_MAX_RETRIES", "5"))
+EMAIL_RETRY_BACKOFF_SECONDS = float(os.getenv("EMAIL_RETRY_BACKOFF_SECONDS", "1"))
+
+FROM_EMAIL = os.getenv("FROM_EMAIL")
+
+
+@dataclass
+class OutboundEmail:
+    """A single queued email."""
+    to: str
+    subject: str
+    html: str
+    attempts: int = 0
+
+
+class EmailTransport:
+    """
+    Base class for delivery backends.
+
+    `send_batch` delivers as many messages as it can and returns the ones that
+    failed, so the dispatcher can retry only those.
+    """
+    name = "base"
+
+    def send_batch(self, messages: list[OutboundEmail]) -> list[OutboundEmail]:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class SendGridTransport(EmailTransport):
+    """Sends through the SendGrid Web API with a single shared client."""
+    name = "sendgrid"
+
+    # SendGrid accepts up to 1000 personalizations per request
+    MAX_RECIPIENTS = 1000
+
+    def __init__(self, api_key: str | None = None, from_email: str | None = None):
+        from sendgrid import SendGridAPIClient
+
+        self.api_key = api_key or os.getenv("SENDGRID_API_KEY")
+        self.from_email = from_email or FROM_EMAIL
+        self.client = SendGridAPIClient(self.api_key) if self.api_key else None
+
+    def send_batch(self, messages: list[OutboundEmail]) -> list[OutboundEmail]:
+        from sendgrid.helpers.mail import Mail, To
+
+        if not self.client or not self.from_email:
+            logger.error("❌ SendGrid API key or FROM_EMAIL is not configured.")
+            return messages
+
+        # Identical subject/body can go out as one request with one personalization per recipient
+        groups: dict[tuple[str, str], list[OutboundEmail]] = {}
+        for msg in messages:
+            groups.setdefault((msg.subject, msg.html), []).append(msg)
+
+        failed = []
+        for (subject, html), group in groups.items():
+            for i in range(0, len(group), self.MAX_RECIPIENTS):
+                chunk = group[i:i + self.MAX_RECIPIENTS]
+                mail = Mail(
+                    from_email=self.from_email,
+                    to_emails=[To(m.to) for m in chunk],
+                    subject=subject,
+                    html_content=html,
+                    is_multiple=True
+                )
+                try:
+                    response = self.client.send(mail)
+                    logger.info(f"📧 Sent {len(chunk)} email(s) via SendGrid — status {response.status_code}")
+                except Exception as e:
+                    logger.error(f"❌ SendGrid send failed for {len(chunk)} email(s): {e}")
+                    failed.extend(chunk)
+        return failed
+
+
+class SMTPTransport(EmailTransport):
+    """Sends over SMTP, opening one connection per batch."""
+    name = "smtp"
+
+    def __init__(self):
+        self.host = os.getenv("SMTP_HOST", "localhost")
+        self.port = int(os.getenv("SMTP_PORT", "1025"))
+        self.username = os.getenv("SMTP_USERNAME")
+        self.password = os.getenv("SMTP_PASSWORD")
+        self.starttls = os.getenv("SMTP_STARTTLS", "false").lower() in ("1", "true", "yes")
+        self.from_email = FROM_EMAIL or "no-reply@localhost"
+
+    def send_batch(self, messages: list[OutboundEmail]) -> list[OutboundEmail]:
+        failed = []
+        try:
+            with smtplib.SMTP(self.host, self.port, timeout=10) as smtp:
+                if self.starttls:
+                    smtp.starttls()
+                if self.username:
+                    smtp.login(self.username, self.password or "")
+                for msg in messages:
+                    try:
+                        smtp.send_message(_to_mime(msg, self.from_email))
+                    except smtplib.SMTPException as e:
+                        logger.error(f"❌ SMTP send to {msg.to} failed: {e}")
+                        failed.append(msg)
+        except (OSError, smtplib.SMTPException) as e:
+            logger.error(f"❌ SMTP connection to {self.host}:{self.port} failed: {e}")
+            return messages
+        logger.info(f"📧 Sent {len(messages) - len(failed)} email(s) via SMTP")
+        return failed
+
+
+class FileTransport(EmailTransport):
+    """Writes each message to `<EMAIL_FILE_DIR>/<uuid>.eml`."""
+    name = "file"
+
+    def __init__(self, directory: str | None = None):
+        self.directory = directory or os.getenv("EMAIL_FILE_DIR", "logs/outbox")
+        self.from_email = FROM_EMAIL or "no-reply@localhost"
+        os.makedirs(self.directory, exist_ok=True)
+
+    def send_batch(self, messages: list[OutboundEmail]) -> list[OutboundEmail]:
+        for msg in messages:
+            path = os.path.join(self.directory, f"{uuid.uuid4().hex}.eml")
+            with open(path, "wb") as f:
+                f.write(bytes(_to_mime(msg, self.from_email)))
+        return []
+
+
+class MemoryTransport(EmailTransport):
+    """Keeps delivered messages in memory."""
+    name = "memory"
+
+    def __init__(self):
+        self.sent: list[OutboundEmail] = []
+        self._lock = threading.Lock()
+
+    def send_batch(self, messages: list[OutboundEmail]) -> list[OutboundEmail]:
+        with self._lock:
+            self.sent.extend(messages)
+        return []
+
+
+TRANSPORTS = {
+    "sendgrid": SendGridTransport,
+    "smtp": SMTPTransport,
+    "file": FileTransport,
+    "memory": MemoryTransport,
+}
+
+
+def _to_mime(msg: OutboundEmail, from_email: str) -> MIMEMessage:
+    mime = MIMEMessage()
+    mime["From"] = from_email
+    mime["To"] = msg.to
+    mime["Subject"] = msg.subject
+    mime.set_content(msg.html, subtype="html")
+    return mime
+
+
+def build_transport(name: str = EMAIL_TRANSPORT) -> EmailTransport:
+    """Instantiates the transport configured by EMAIL_TRANSPORT."""
+    if name not in TRANSPORTS:
+        raise RuntimeError(f"Unknown EMAIL_TRANSPORT '{name}'. Expected one of: {', '.join(TRANSPORTS)}")
+    return TRANSPORTS[name]()
+
+
+class EmailDispatcher:
+    """
+    Bounded queue plus worker threads delivering emails in batches.
+
+    `enqueue` never blocks: when the queue is full the message is dropped and logged.
+    """
+
+    def __init__(
+        self,
+        transport: EmailTransport | None = None,
+        workers: int = EMAIL_WORKERS,
+        batch_size: int = EMAIL_BATCH_SIZE,
+        max_retries: int = EMAIL_MAX_RETRIES,
+        backoff_seconds: float = EMAIL_RETRY_BACKOFF_SECONDS,
+        maxsize: int = EMAIL_QUEUE_SIZE,
+    ):
+        self._transport = transport
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self._queue: queue.Queue[OutboundEmail] = queue.Queue(maxsize=maxsize)
+        self._threads: list[threading.Thread] = []
+        self._retry_timers: set[threading.Timer] = set()
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def transport(self) -> EmailTransport:
+        if self._transport is None:
+            self._transport = build_transport()
+        return self._transport
+
+    def start(self) -> None:
+        """Starts the worker threads (idempotent)."""
+        with self._lock:
+            if self._threads:
+                return
+            self._stopping.clear()
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"email-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        logger.info(f"📮 Email dispatcher started ({self.workers} workers, transport={self.transport.name})")
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stops accepting retries and waits for queued messages to be flushed."""
+        deadline = time.monotonic() + timeout
+        while not self._queue.empty() and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        self._stopping.set()
+        for timer in list(self._retry_timers):
+            timer.cancel()
+        with self._lock:
+            for thread in self._threads:
+                thread.join(max(deadline - time.monotonic(), 0.1))
+            self._threads = []
+        self.transport.close()
+
+        if not self._queue.empty():
+            logger.warning(f"⚠️ Email dispatcher stopped with {self._queue.qsize()} message(s) unsent")
+
+    def enqueue(self, message: OutboundEmail) -> bool:
+        """
+        Queues a message for delivery and returns immediately.
+
+        Returns:
+            bool: True if queued, False if the queue is full.
+        """
+        if not self._threads:
+            self.start()
+        try:
+            self._queue.put_nowait(message)
+            return True
+        except queue.Full:
+            logger.error(f"❌ Email queue full, dropping message to {message.to}")
+            return False
+
+    def pending(self) -> int:
+        """Number of messages waiting to be sent."""
+        return self._queue.qsize()
+
+    def _next_batch(self) -> list[OutboundEmail]:
+        try:
+            first = self._queue.get(timeout=0.5)
+        except queue.Empty:
+            return []
+        batch = [first]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while not (self._stopping.is_set() and self._queue.empty()):
+            batch = self._next_batch()
+            if not batch:
+                continue
+            try:
+                with outbound_timer(self.transport.name, "send_batch"):
+                    failed = self.transport.send_batch(batch)
+            except Exception as e:
+                logger.error(f"❌ Email transport error: {e}", exc_info=True)
+                failed = batch
+            for msg in failed:
+                self._schedule_retry(msg)
+
+    def _schedule_retry(self, msg: OutboundEmail) -> None:
+        msg.attempts += 1
+        if msg.attempts > self.max_retries or self._stopping.is_set():
+            logger.error(f"❌ Giving up on email to {msg.to} after {msg.attempts} attempt(s)")
+            return
+
+        # Exponential backoff with jitter
+        delay = self.backoff_seconds * (2 ** (msg.attempts - 1)) * random.uniform(0.8, 1.2)
+        logger.warning(f"🔁 Retrying email to {msg.to} in {delay:.1f}s (attempt {msg.attempts + 1})")
+
+        def requeue():
+            self._retry_timers.discard(timer)
+            try:
+                self._queue.put_nowait(msg)
+            except queue.Full:
+                logger.error(f"❌ Email queue full, dropping retry to {msg.to}")
+
+        timer = threading.Timer(delay, requeue)
+        timer.daemon = True
+        self._retry_timers.add(timer)
+        timer.start()
+
+
+# Shared per-process dispatcher
+email_dispatcher = EmailDispatcher()
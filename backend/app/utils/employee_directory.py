@@ -0,0 +1,160 @@
+"""
+utils/employee_directory.py — In-process cache for resolving host employees.
+
+Visitors name their host by free-text name and department. Both are normalized
+(trimmed, lower-cased) and looked up through the `ix_employees_host_lookup`
+expression index; results, including misses, are cached per process.
+
+Invalidation:
+- Any employee insert/update/delete made through the ORM in this process bumps
+  the directory version, dropping every cached entry: at flush, and again when
+  the session commits or rolls back, so a lookup between flush and commit cannot
+  keep the uncommitted (or not yet visible) row for the whole TTL
+- Other processes (and rows changed outside the app) are picked up when the
+  entry's TTL expires; misses use a shorter TTL so new employees appear quickly
+"""
+
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Employee
+from app.repos.employee_repo import EmployeeRepository
+
+EMPLOYEE_DIRECTORY_TTL_SECONDS = float(os.getenv("EMPLOYEE_DIRECTORY_TTL_SECONDS", "300"))
+EMPLOYEE_DIRECTORY_MISS_TTL_SECONDS = float(os.getenv("EMPLOYEE_DIRECTORY_MISS_TTL_SECONDS", "30"))
+EMPLOYEE_DIRECTORY_MAX_ENTRIES = int(os.getenv("EMPLOYEE_DIRECTORY_MAX_ENTRIES", "10000"))
+
+HostKey = tuple[str, str]
+
+
+@dataclass(frozen=True)
+class HostEntry:
+    """Detached snapshot of a host employee; safe to share across sessions and requests."""
+    id: int
+    name: str
+    department: str
+    email: str
+
+
+def host_key(name: str, department: str) -> HostKey:
+    """Normalizes a host name and department the same way the lookup index does."""
+    return name.strip().lower(), department.strip().lower()
+
+
+class EmployeeDirectory:
+    """
+    TTL + version-invalidated cache of normalized (name, department) -> HostEntry.
+    """
+
+    def __init__(
+        self,
+        ttl: float = EMPLOYEE_DIRECTORY_TTL_SECONDS,
+        miss_ttl: float = EMPLOYEE_DIRECTORY_MISS_TTL_SECONDS,
+        max_entries: int = EMPLOYEE_DIRECTORY_MAX_ENTRIES,
+    ):
+        self.ttl = ttl
+        self.miss_ttl = miss_ttl
+        self.max_entries = max_entries
+        self.version = 0
+        # key -> (entry or None for a miss, expiry, version)
+        self._entries: OrderedDict[HostKey, tuple[HostEntry | None, float, int]] = OrderedDict()
+
+    def invalidate(self) -> None:
+        """Drops every cached entry (called when employees change)."""
+        self.version += 1
+        self._entries.clear()
+
+    def _get(self, key: HostKey, now: float) -> tuple[bool, HostEntry | None]:
+        cached = self._entries.get(key)
+        if cached is None:
+            return False, None
+        entry, expires_at, version = cached
+        if version != self.version or expires_at <= now:
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, entry
+
+    def _put(self, key: HostKey, entry: HostEntry | None, now: float, version: int) -> None:
+        if version != self.version:
+            return  # employees changed while this lookup was in flight
+        ttl = self.ttl if entry else self.miss_ttl
+        self._entries[key] = (entry, now + ttl, version)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def resolve(self, db: AsyncSession, name: str, department: str) -> HostEntry | None:
+        """
+        Resolves a host employee by name and department, case-insensitively.
+
+        Args:
+            db (AsyncSession): Session used only on a cache miss.
+            name (str): Host name as entered by the visitor.
+            department (str): Host department as entered by the visitor.
+
+        Returns:
+            HostEntry | None: The host, or None if no employee matches.
+        """
+        key = host_key(name, department)
+        return (await self.resolve_many(db, {key}))[key]
+
+    async def resolve_many(self, db: AsyncSession, keys: set[HostKey]) -> dict[HostKey, HostEntry | None]:
+        """
+        Resolves many normalized keys, querying the database once for all cache misses.
+
+        Args:
+            db (AsyncSession): Session used only for cache misses.
+            keys (set[HostKey]): Keys produced by `host_key`.
+
+        Returns:
+            dict[HostKey, HostEntry | None]: Host (or None) for every requested key.
+        """
+        now = time.monotonic()
+        resolved: dict[HostKey, HostEntry | None] = {}
+        missing: set[HostKey] = set()
+        for key in keys:
+            hit, entry = self._get(key, now)
+            if hit:
+                resolved[key] = entry
+            else:
+                missing.add(key)
+
+        if missing:
+            version = self.version
+            found: dict[HostKey, HostEntry] = {}
+            for employee in await EmployeeRepository(db).get_hosts(missing):
+                found.setdefault(
+                    host_key(employee.name, employee.department),
+                    HostEntry(employee.id, employee.name, employee.department, employee.email)
+                )
+            for key in missing:
+                resolved[key] = found.get(key)
+                self._put(key, resolved[key], now, version)
+
+        return resolved
+
+
+# Shared per-process directory
+employee_directory = EmployeeDirectory()
+
+
+@event.listens_for(Employee, "after_insert")
+@event.listens_for(Employee, "after_update")
+@event.listens_for(Employee, "after_delete")
+def _employee_changed(mapper, connection, target) -> None:
+    employee_directory.invalidate()
+    session = object_session(target)
+    if session is not None:
+        session.info["employees_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_soft_rollback")
+def _employee_changes_settled(session, *args) -> None:
+    if session.info.pop("employees_changed", False):
+        employee_directory.invalidate()
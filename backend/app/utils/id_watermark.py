@@ -0,0 +1,76 @@
+"""
+utils/id_watermark.py — Tracks which rows a per-process cache has read, by ID.
+
+The in-process indexes (pre-approvals, visitor search) refresh by pulling rows with
+an ID above the highest one they have seen. IDs come from a sequence and are
+assigned at INSERT, not at commit, so a row can become visible after rows with
+higher IDs: once the high-water mark has passed it, a plain `id > max_id` never
+reads it. The watermark therefore remembers the IDs skipped below it as pending
+and callers re-query them until they appear, or until ID_GAP_GRACE_SECONDS pass
+(sequence values lost to rolled-back inserts never appear).
+"""
+
+import os
+import time
+from typing import Iterable
+
+# How long (seconds) a skipped ID is re-queried before it is taken as rolled back
+ID_GAP_GRACE_SECONDS = float(os.getenv("ID_GAP_GRACE_SECONDS", "600"))
+
+# Gaps wider than this are not tracked (bulk deletes, archived months, sequence resets)
+MAX_TRACKED_GAP = 1000
+
+# IDs just below the mark that a full load checks for stragglers
+RELOAD_LOOKBACK = 1000
+
+
+class IdWatermark:
+    """
+    High-water mark plus the IDs below it that have not been seen yet.
+
+    Not thread-safe: callers serialize refreshes (each index holds its refresh lock).
+    """
+
+    def __init__(self, grace_seconds: float = ID_GAP_GRACE_SECONDS):
+        self.grace_seconds = grace_seconds
+        self.max_id = 0
+        self._pending: dict[int, float] = {}  # id -> monotonic time it was first missed
+
+    @property
+    def pending(self) -> list[int]:
+        """IDs to re-query on the next refresh; expired ones are dropped."""
+        cutoff = time.monotonic() - self.grace_seconds
+        self._pending = {i: missed for i, missed in self._pending.items() if missed >= cutoff}
+        return sorted(self._pending)
+
+    def reset(self, max_id: int, recent_ids: Iterable[int]) -> None:
+        """
+        Restarts from a full load.
+
+        Args:
+            max_id (int): Highest ID when the load started.
+            recent_ids (Iterable[int]): IDs visible to the load within RELOAD_LOOKBACK
+                below `max_id`; the others in that range become pending.
+        """
+        now = time.monotonic()
+        seen = set(recent_ids)
+        self.max_id = max_id
+        self._pending = {
+            i: now for i in range(max(max_id - RELOAD_LOOKBACK, 0) + 1, max_id + 1) if i not in seen
+        }
+
+    def observe(self, ids: Iterable[int]) -> None:
+        """Records IDs read by a refresh: pending ones are settled and new gaps remembered."""
+        now = time.monotonic()
+        for i in sorted(ids):
+            self._pending.pop(i, None)
+            if i <= self.max_id:
+                continue
+            if i - self.max_id - 1 <= MAX_TRACKED_GAP:
+                for missing in range(self.max_id + 1, i):
+                    self._pending[missing] = now
+            self.max_id = i
+
+    def clear(self) -> None:
+        self.max_id = 0
+        self._pending = {}
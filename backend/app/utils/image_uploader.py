@@ -1,47 +1,99 @@
 """
-utils/image_uploader.py — Uploads base64 image data to Cloudinary and returns the secure image URL.
+utils/image_uploader.py — Prepares visitor photos and uploads them to the storage backend, returning the image URL.
+
+Photos are downscaled to badge resolution and re-encoded in a worker process
+before upload, so only a few tens of kilobytes are ever stored per visitor.
 """
 
+import asyncio
+import base64
+import binascii
+import hashlib
+import mimetypes
 import os
-import cloudinary
-import cloudinary.uploader
 from dotenv import load_dotenv
+from app.utils.imaging import downscale_photo
+from app.utils.storage import get_storage
+from app.utils.workers import process_pool
 from app.logger_config import setup_logger
 
 # Load environment variables
 load_dotenv()
-logger = setup_logger()
+logger = setup_logger(__name__)
+
+# Photo processing settings
+PHOTO_MAX_DIMENSION = int(os.getenv("PHOTO_MAX_DIMENSION", "480"))
+PHOTO_FORMAT = os.getenv("PHOTO_FORMAT", "WEBP")
+PHOTO_QUALITY = int(os.getenv("PHOTO_QUALITY", "80"))
+PHOTO_MAX_UPLOAD_BYTES = int(os.getenv("PHOTO_MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+# Returning visitors keep their stored photo until it is this old (0 always takes a new one)
+PHOTO_REUSE_MAX_AGE_DAYS = int(os.getenv("PHOTO_REUSE_MAX_AGE_DAYS", "180"))
 
-# Cloudinary configuration
-cloudinary.config(
-    cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
-    api_key=os.getenv("CLOUDINARY_API_KEY"),
-    api_secret=os.getenv("CLOUDINARY_API_SECRET")
-)
 
-def upload_image_base64(image_base64: str, folder: str = "visitors") -> str | None:
+def decode_base64_image(image_base64: str) -> bytes:
     """
-    Uploads a base64-encoded image string to Cloudinary and returns the secure URL.
+    Decodes a base64 image string, accepting data URLs (`data:image/...;base64,...`).
+
+    Raises:
+        ValueError: If the string is not valid base64.
+    """
+    _, sep, encoded = image_base64.partition(",")
+    if not sep:
+        encoded = image_base64
+    try:
+        return base64.b64decode(encoded, validate=False)
+    except (binascii.Error, ValueError) as e:
+        raise ValueError(f"Invalid base64 image: {e}") from e
+
+
+async def process_photo(data: bytes) -> tuple[bytes, str]:
+    """
+    Downscales and re-encodes a photo in the shared worker process pool.
+
+    Returns:
+        tuple[bytes, str]: Compact image bytes and MIME type.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        process_pool("images"), downscale_photo, data, PHOTO_MAX_DIMENSION, PHOTO_FORMAT, PHOTO_QUALITY
+    )
+
+
+def upload_image_bytes(image: bytes, content_type: str, folder: str = "visitors") -> str | None:
+    """
+    Uploads image bytes to the storage backend and returns the URL.
+
+    The key is the SHA-256 of the bytes, so re-uploading an identical image is a no-op.
 
     Args:
-        image_base64 (str): The base64-encoded image string.
-        folder (str): Target Cloudinary folder (default: "visitors").
+        image (bytes): Encoded image bytes.
+        content_type (str): MIME type of the image.
+        folder (str): Target folder (default: "visitors").
 
     Returns:
-        str | None: Secure URL of the uploaded image or None if failed.
+        str | None: URL of the uploaded image or None if failed.
     """
-    try:
-        result = cloudinary.uploader.upload(
-            image_base64,
-            folder=folder,
-            resource_type="image"
-        )
-        url = result.get("secure_url")
-        if not url:
-            logger.warning("⚠️ Image uploaded but no secure_url returned.")
-        else:
-            logger.info(f"🖼️ Image uploaded to Cloudinary — {url}")
-        return url
-    except Exception as e:
-        logger.error(f"❌ Failed to upload image to Cloudinary: {e}", exc_info=True)
-        return None
+    ext = mimetypes.guess_extension(content_type) or ".img"
+    key = f"{folder}/{hashlib.sha256(image).hexdigest()}{ext}"
+    url = get_storage().save(key, image, content_type)
+    if url:
+        logger.info(f"🖼️ Image stored ({len(image)} bytes) — {url}")
+    return url
+
+
+async def store_photo(data: bytes) -> str | None:
+    """
+    Downscales a raw photo in a worker process, then uploads it from a thread.
+
+    Args:
+        data (bytes): Original photo bytes.
+
+    Returns:
+        str | None: URL of the stored photo, or None if it could not be stored.
+
+    Raises:
+        ValueError: If the data is not a readable image.
+    """
+    image, content_type = await process_photo(data)
+    logger.info(f"📷 Photo recompressed {len(data)} → {len(image)} bytes")
+    return await asyncio.to_thread(upload_image_bytes, image, content_type)
@@ -0,0 +1,63 @@
+"""
+utils/imaging.py — CPU-bound image work executed in worker processes.
+
+Functions here must stay importable without app configuration (no database or
+settings imports) because they are pickled into a process pool.
+"""
+
+import io
+import qrcode
+
+
+def render_qr_png(data: str) -> bytes:
+    """
+    Renders a QR code for the given data as PNG bytes.
+
+    Args:
+        data (str): The content to encode in the QR code.
+
+    Returns:
+        bytes: PNG-encoded QR image.
+    """
+    qr = qrcode.make(data)
+    buffered = io.BytesIO()
+    qr.save(buffered, format="PNG")
+    return buffered.getvalue()
+
+
+def downscale_photo(data: bytes, max_dimension: int, image_format: str, quality: int) -> tuple[bytes, str]:
+    """
+    Downscales a visitor photo to badge resolution and re-encodes it compactly.
+
+    - Honors EXIF orientation (phone/kiosk cameras)
+    - Fits the image inside a `max_dimension` square, keeping the aspect ratio
+    - Strips metadata and re-encodes as `image_format` (e.g. WEBP or JPEG)
+
+    Args:
+        data (bytes): Original image bytes in any format Pillow can read.
+        max_dimension (int): Longest allowed side in pixels.
+        image_format (str): Output format name understood by Pillow.
+        quality (int): Encoder quality (1-100).
+
+    Returns:
+        tuple[bytes, str]: Encoded image bytes and its MIME type.
+
+    Raises:
+        ValueError: If the data is not a readable image.
+    """
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            # Decode at reduced scale when the codec supports it (JPEG), then finish with a proper resample
+            img.draft("RGB", (max_dimension, max_dimension))
+            img = ImageOps.exif_transpose(img)
+            img = img.convert("RGB")
+            img.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+
+            out = io.BytesIO()
+            img.save(out, format=image_format, quality=quality, optimize=True)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+        raise ValueError(f"Invalid image: {e}") from e
+
+    return out.getvalue(), Image.MIME.get(image_format.upper(), "application/octet-stream")
@@ -0,0 +1,143 @@
+"""
+utils/pagination.py — Keyset (cursor) pagination and sparse field selection for list endpoints.
+
+Listings are ordered newest first on `(timestamp, id)`. The cursor is an opaque
+token holding the last row's key; the next page is everything strictly before it,
+which the `(employee_id, timestamp, id)` indexes answer without scanning history.
+Relevance-ranked results (visitor search) page the same way on `(score, id)`.
+"""
+
+import base64
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Iterable
+from pydantic import BaseModel
+from sqlalchemy import DateTime, func, literal, tuple_
+from sqlalchemy.sql.elements import ColumnElement
+
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "200"))
+
+# Response header carrying the cursor of the next page (absent on the last page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Response header carrying the number of matching rows across all pages, where a listing reports it
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+
+@dataclass
+class Page:
+    """One page of results plus the cursor for the following page."""
+    items: list[Any]
+    next_cursor: str | None = None
+
+
+def encode_cursor(sort_value: datetime, row_id: int) -> str:
+    """Encodes the key of the last row on a page into an opaque, URL-safe cursor."""
+    raw = json.dumps([sort_value.isoformat(), row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Decodes a cursor produced by `encode_cursor`.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_value, row_id = json.loads(raw)
+        return datetime.fromisoformat(sort_value), int(row_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def encode_rank_cursor(score: float, row_id: int) -> str:
+    """Encodes the `(score, id)` key of the last row of a relevance-ranked page."""
+    raw = json.dumps([score, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_rank_cursor(cursor: str) -> tuple[float, int]:
+    """
+    Decodes a cursor produced by `encode_rank_cursor`.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        score, row_id = json.loads(raw)
+        return float(score), int(row_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def sort_key(column, dialect_name: str) -> ColumnElement:
+    """
+    Returns the expression to order and compare a timestamp column by.
+
+    SQLite stores `func.now()` defaults without microseconds but binds datetimes
+    with them, so equal instants would compare unequal as text; julianday() puts
+    both on the same numeric scale. Server databases compare the column directly.
+    """
+    return func.julianday(column) if dialect_name == "sqlite" else column
+
+
+def keyset_before(column, id_column, cursor: tuple[datetime, int], dialect_name: str) -> ColumnElement:
+    """
+    Builds the `(column, id) < (cursor_value, cursor_id)` filter for a descending listing.
+    """
+    sort_value, row_id = cursor
+    bound = literal(sort_value, DateTime(timezone=True))
+    return tuple_(sort_key(column, dialect_name), id_column) < tuple_(sort_key(bound, dialect_name), row_id)
+
+
+def paginate(rows: list[Any], limit: int | None, sort_attr: str) -> Page:
+    """
+    Trims a result fetched with `limit + 1` rows into a page and its next cursor.
+
+    Args:
+        rows (list): Rows ordered newest first, at most `limit + 1` of them.
+        limit (int | None): Page size requested by the client; None for every row.
+        sort_attr (str): Name of the timestamp attribute used for ordering.
+
+    Returns:
+        Page: The page items and the cursor of the next page, if there is one.
+    """
+    if limit is None or len(rows) <= limit:
+        return Page(items=rows)
+    items = rows[:limit]
+    last = items[-1]
+    return Page(items=items, next_cursor=encode_cursor(getattr(last, sort_attr), last.id))
+
+
+def parse_fields(fields: str | None, allowed: Iterable[str]) -> set[str] | None:
+    """
+    Parses a comma-separated `fields` query parameter.
+
+    Returns:
+        set[str] | None: The requested field names, or None when every field is wanted.
+
+    Raises:
+        ValueError: If an unknown field is requested.
+    """
+    if not fields:
+        return None
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(sorted(unknown))}")
+    # The id is always returned so clients can act on the row
+    return requested | {"id"}
+
+
+def project(items: list[Any], schema: type[BaseModel], fields: set[str]) -> list[dict]:
+    """Serializes ORM objects through `schema`, keeping only the requested fields."""
+    return [
+        schema.model_validate(item).model_dump(mode="json", include=fields)
+        for item in items
+    ]
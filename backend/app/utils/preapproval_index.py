@@ -0,0 +1,193 @@
+"""
+utils/preapproval_index.py — In-memory interval index of today's active pre-approval windows.
+
+The gate scan path asks one question per scan: "is this visitor inside a pre-approved
+window right now?". Instead of querying `preapprovals` on every scan, each worker keeps
+the windows overlapping the current UTC day grouped by visitor, sorted by start time.
+
+- Loaded once per day (day rollover triggers a full reload)
+- Refreshed incrementally: rows created since the last refresh are pulled by ID
+  high-water mark (re-querying IDs skipped below it, which may still be
+  committing), and windows created in this process are added immediately
+- Expired windows are pruned lazily on lookup
+"""
+
+import asyncio
+import os
+import threading
+import time
+from bisect import insort
+from dataclasses import dataclass, field
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import PreApproval
+from app.repos.preapproval_repo import PreApprovalRepository
+from app.utils.id_watermark import IdWatermark, RELOAD_LOOKBACK
+from app.logger_config import setup_logger
+
+logger = setup_logger(__name__)
+
+# How often (seconds) a worker pulls pre-approvals created by other workers
+REFRESH_INTERVAL_SECONDS = float(os.getenv("PREAPPROVAL_INDEX_REFRESH_SECONDS", "5"))
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Treats naive datetimes as UTC and normalizes aware ones to UTC."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def day_bounds(day: date) -> tuple[datetime, datetime]:
+    """Returns the [start, end) UTC datetimes of a calendar day."""
+    start = datetime.combine(day, dt_time.min, tzinfo=timezone.utc)
+    return start, start + timedelta(days=1)
+
+
+@dataclass(frozen=True, order=True)
+class PreApprovalWindow:
+    """Lightweight, immutable copy of a pre-approval row kept in the index."""
+    valid_from: datetime
+    valid_to: datetime
+    id: int
+    visitor_id: int = field(compare=False)
+    employee_id: int = field(compare=False)
+    max_visits_per_day: int = field(compare=False)
+
+    @classmethod
+    def from_model(cls, pa: PreApproval) -> "PreApprovalWindow":
+        return cls(
+            valid_from=_as_utc(pa.valid_from),
+            valid_to=_as_utc(pa.valid_to),
+            id=pa.id,
+            visitor_id=pa.visitor_id,
+            employee_id=pa.employee_id,
+            max_visits_per_day=pa.max_visits_per_day or 5,
+        )
+
+
+class PreApprovalIndex:
+    """
+    Per-process index of pre-approval windows overlapping the current UTC day.
+
+    Lookups are O(windows for that visitor), independent of the total number of
+    pre-approvals in the system.
+    """
+
+    def __init__(self, refresh_interval: float = REFRESH_INTERVAL_SECONDS):
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._refresh_lock = asyncio.Lock()
+        self._windows: dict[int, list[PreApprovalWindow]] = {}
+        self._day: date | None = None
+        self._watermark = IdWatermark()
+        self._last_refresh = 0.0
+
+    async def ensure_fresh(self, db: AsyncSession, now: datetime | None = None) -> None:
+        """
+        Makes sure the index covers the current day and includes recent rows.
+
+        - Reloads everything on the first call and on day rollover
+        - Otherwise pulls rows with an ID above the high-water mark, plus skipped
+          IDs below it, at most once per refresh interval
+        """
+        now = _as_utc(now or datetime.now(timezone.utc))
+        today = now.date()
+
+        if self._day == today and time.monotonic() - self._last_refresh < self.refresh_interval:
+            return
+
+        # Only one coroutine per worker hits the database; the others wait and re-check
+        async with self._refresh_lock:
+            if self._day != today:
+                await self._reload(db, today)
+            elif time.monotonic() - self._last_refresh >= self.refresh_interval:
+                await self._refresh(db, today)
+
+    async def _reload(self, db: AsyncSession, today: date) -> None:
+        repo = PreApprovalRepository(db)
+        # Read the high-water mark first so rows inserted mid-load are picked up by the next refresh
+        max_id = await repo.get_max_id()
+        recent_ids = await repo.get_ids_after(max(max_id - RELOAD_LOOKBACK, 0))
+        rows = await repo.get_overlapping(*day_bounds(today))
+
+        windows: dict[int, list[PreApprovalWindow]] = {}
+        for pa in rows:
+            windows.setdefault(pa.visitor_id, []).append(PreApprovalWindow.from_model(pa))
+        for visitor_windows in windows.values():
+            visitor_windows.sort()
+
+        with self._lock:
+            self._windows = windows
+            self._day = today
+            self._watermark.reset(max_id, recent_ids)
+            self._last_refresh = time.monotonic()
+
+        logger.info(f"📚 Pre-approval index loaded for {today}: {len(rows)} windows")
+
+    async def _refresh(self, db: AsyncSession, today: date) -> None:
+        start, end = day_bounds(today)
+        watermark = self._watermark
+        rows = await PreApprovalRepository(db).get_created_after(watermark.max_id, watermark.pending)
+
+        with self._lock:
+            for pa in rows:
+                self._insert(PreApprovalWindow.from_model(pa), start, end)
+            watermark.observe(pa.id for pa in rows)
+            self._last_refresh = time.monotonic()
+
+    def _insert(self, window: PreApprovalWindow, start: datetime, end: datetime) -> None:
+        """Inserts a window if it overlaps [start, end). Caller holds the lock."""
+        if window.valid_from >= end or window.valid_to < start:
+            return
+        visitor_windows = self._windows.setdefault(window.visitor_id, [])
+        if any(w.id == window.id for w in visitor_windows):
+            return
+        insort(visitor_windows, window)
+
+    def add(self, pa: PreApproval) -> None:
+        """
+        Adds a newly created pre-approval so this worker sees it immediately.
+        Ignored until the index has been loaded; the initial load will include it.
+        """
+        with self._lock:
+            if self._day is None:
+                return
+            start, end = day_bounds(self._day)
+            self._insert(PreApprovalWindow.from_model(pa), start, end)
+
+    def lookup(self, visitor_id: int, at: datetime) -> PreApprovalWindow | None:
+        """
+        Returns the first window for the visitor that contains `at`, pruning
+        windows that have already expired.
+        """
+        at = _as_utc(at)
+        with self._lock:
+            visitor_windows = self._windows.get(visitor_id)
+            if not visitor_windows:
+                return None
+
+            live = [w for w in visitor_windows if w.valid_to >= at]
+            if len(live) != len(visitor_windows):
+                if live:
+                    self._windows[visitor_id] = live
+                else:
+                    del self._windows[visitor_id]
+
+            for window in live:
+                if window.valid_from > at:
+                    break
+                return window
+        return None
+
+    def clear(self) -> None:
+        """Drops all cached windows; the next `ensure_fresh` reloads from the database."""
+        with self._lock:
+            self._windows = {}
+            self._day = None
+            self._watermark.clear()
+            self._last_refresh = 0.0
+
+
+# Shared per-process index
+preapproval_index = PreApprovalIndex()
@@ -1,48 +1,49 @@
 """
-utils/qr_generator.py — Generates a QR code, uploads it to Cloudinary, and returns the hosted badge URL.
+utils/qr_generator.py — Stores rendered QR badges and returns the hosted badge URL.
 """
 
-import qrcode
-import io
-from cloudinary.uploader import upload
+from app.utils.storage import get_storage
 from app.logger_config import setup_logger
 
-logger = setup_logger()
+logger = setup_logger(__name__)
 
-def generate_qr_and_upload(data: str, filename: str = "visitor_badge") -> str | None:
+BADGE_FOLDER = "visitor_badges"
+
+
+def badge_storage_key(content_hash: str) -> str:
+    """Returns the storage key of a badge given the hash of its payload."""
+    return f"{BADGE_FOLDER}/{content_hash}.png"
+
+
+def find_badge(content_hash: str) -> str | None:
+    """
+    Returns the URL of an already stored badge, or None if it has not been uploaded
+    yet (or the backend cannot check cheaply).
     """
-    Generates a QR code from the given data, uploads it to Cloudinary,
-    and returns the secure URL.
+    storage = get_storage()
+    key = badge_storage_key(content_hash)
+    if storage.fast_exists and storage.exists(key):
+        return storage.url_for(key)
+    return None
+
+
+def upload_badge_png(png: bytes, content_hash: str) -> str | None:
+    """
+    Uploads a rendered QR badge to the configured storage backend and returns its URL.
+
+    Badges are content-addressed: the key is derived from the badge payload,
+    so an existing badge is never overwritten.
 
     Args:
-        data (str): The content to encode in the QR code.
-        filename (str): The public ID to use when uploading (default: "visitor_badge").
+        png (bytes): PNG-encoded QR image.
+        content_hash (str): Hash of the badge payload.
 
     Returns:
-        str | None: Secure Cloudinary URL of the uploaded QR image or None if failed.
+        str | None: URL of the stored QR image or None if failed.
     """
-    try:
-        qr = qrcode.make(data)
-        buffered = io.BytesIO()
-        qr.save(buffered, format="PNG")
-        buffered.seek(0)
-
-        result = upload(
-            buffered,
-            folder="visitor_badges",
-            public_id=filename,
-            resource_type="image",
-            overwrite=True
-        )
-
-        url = result.get("secure_url")
-        if url:
-            logger.info(f"✅ QR badge uploaded successfully — {url}")
-        else:
-            logger.warning("⚠️ QR uploaded but no secure_url returned.")
-
-        return url
-
-    except Exception as e:
-        logger.error(f"❌ Failed to generate/upload QR code: {e}", exc_info=True)
-        return None
+    url = get_storage().save(badge_storage_key(content_hash), png, "image/png")
+    if url:
+        logger.info(f"✅ QR badge uploaded successfully — {url}")
+    else:
+        logger.warning("⚠️ QR badge upload failed.")
+    return url
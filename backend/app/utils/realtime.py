@@ -0,0 +1,150 @@
+"""
+utils/realtime.py — Socket.IO push channel for approval and badge events.
+
+Clients connect to `/ws/socket.io`:
+- Employees authenticate with their JWT (`auth={"token": ...}` or `?token=`) and
+  join the room `employee:<id>`, receiving `approval_created`,
+  `approvals_bulk_created`, `approval_decided` and `approvals_bulk_decided`
+  for their own visitors
+- Kiosks emit `watch_visitor` with the `watch_token` returned by the
+  registration and join `visitor:<id>`, receiving `badge_ready` once the QR
+  badge is stored
+
+With several worker processes, set SOCKETIO_MESSAGE_QUEUE (redis:// or amqp://)
+so an event emitted in one worker reaches clients connected to any other.
+"""
+
+import asyncio
+import os
+import socketio
+from urllib.parse import parse_qs
+from app.utils.auth import decode_token_cached, decode_visitor_watch_token
+from app.logger_config import setup_logger
+
+logger = setup_logger(__name__)
+
+SOCKETIO_MESSAGE_QUEUE = os.getenv("SOCKETIO_MESSAGE_QUEUE")
+SOCKETIO_PATH = "/ws"
+
+
+def employee_room(employee_id: int) -> str:
+    return f"employee:{employee_id}"
+
+
+def visitor_room(visitor_id: int) -> str:
+    return f"visitor:{visitor_id}"
+
+
+def _client_manager(url: str | None) -> socketio.AsyncManager | None:
+    """Builds the cross-process pub/sub manager for SOCKETIO_MESSAGE_QUEUE, if configured."""
+    if not url:
+        return None
+    if url.startswith(("redis://", "rediss://")):
+        return socketio.AsyncRedisManager(url)
+    if url.startswith(("amqp://", "amqps://")):
+        return socketio.AsyncAioPikaManager(url)
+    raise RuntimeError(f"Unsupported SOCKETIO_MESSAGE_QUEUE '{url}'. Expected a redis:// or amqp:// URL")
+
+
+sio = socketio.AsyncServer(
+    async_mode="asgi",
+    cors_allowed_origins="*",  # In production, specify allowed origins
+    client_manager=_client_manager(SOCKETIO_MESSAGE_QUEUE),
+)
+
+# ASGI app mounted by main.py at SOCKETIO_PATH; Starlette passes the full request
+# path to mounted apps, so the engine.io path includes the mount prefix
+socket_app = socketio.ASGIApp(sio, socketio_path=f"{SOCKETIO_PATH.strip('/')}/socket.io")
+
+
+@sio.event
+async def connect(sid: str, environ: dict, auth: dict | None = None):
+    """
+    Puts authenticated employees into their room. Connections without a token are
+    allowed (kiosks) but only receive events for visitors they explicitly watch.
+    """
+    token = (auth or {}).get("token")
+    if not token:
+        token = parse_qs(environ.get("QUERY_STRING", "")).get("token", [None])[0]
+    if not token:
+        return True
+
+    payload = decode_token_cached(token)
+    if not payload or "id" not in payload:
+        raise socketio.exceptions.ConnectionRefusedError("Invalid or expired token")
+
+    await sio.enter_room(sid, employee_room(payload["id"]))
+    logger.info(f"🔌 Employee {payload['id']} connected for live updates")
+    return True
+
+
+@sio.event
+async def watch_visitor(sid: str, data: dict):
+    """
+    Subscribes a kiosk to the badge events of one visitor. Expects `{"token": ...}`
+    with the registration's watch token, which names the visitor.
+    """
+    token = data.get("token") if isinstance(data, dict) else None
+    visitor_id = decode_visitor_watch_token(token) if isinstance(token, str) else None
+    if visitor_id is None:
+        return {"ok": False, "error": "A valid watch token is required"}
+    await sio.enter_room(sid, visitor_room(visitor_id))
+    return {"ok": True, "visitor_id": visitor_id}
+
+
+class EventPublisher:
+    """
+    Fire-and-forget emitter used by services; a failed emit is logged and never
+    affects the request that triggered it.
+    """
+
+    def __init__(self, server: socketio.AsyncServer):
+        self.server = server
+        self._tasks: set[asyncio.Task] = set()
+
+    def publish(self, event: str, data: dict, room: str) -> None:
+        """Schedules `event` for every client in `room` and returns immediately."""
+        task = asyncio.create_task(self._emit(event, data, room))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _emit(self, event: str, data: dict, room: str) -> None:
+        try:
+            await self.server.emit(event, data, room=room)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to push {event} to {room}: {e}")
+
+    def approval_created(self, approval) -> None:
+        self.publish("approval_created", approval_payload(approval), employee_room(approval.employee_id))
+
+    def approvals_bulk_created(self, employee_id: int, count: int) -> None:
+        self.publish("approvals_bulk_created", {"count": count}, employee_room(employee_id))
+
+    def approval_decided(self, approval) -> None:
+        self.publish("approval_decided", approval_payload(approval), employee_room(approval.employee_id))
+
+    def approvals_bulk_decided(self, employee_id: int, status: str, approval_ids: list[int]) -> None:
+        self.publish(
+            "approvals_bulk_decided",
+            {"status": status, "approval_ids": approval_ids},
+            employee_room(employee_id)
+        )
+
+    def badge_ready(self, visitor_id: int, badge_url: str) -> None:
+        self.publish("badge_ready", {"visitor_id": visitor_id, "badge_url": badge_url}, visitor_room(visitor_id))
+
+
+def approval_payload(approval) -> dict:
+    """Serializes the columns of an approval (or a row with the same attributes) for an event."""
+    return {
+        "id": approval.id,
+        "visitor_id": approval.visitor_id,
+        "employee_id": approval.employee_id,
+        "status": approval.status.value if hasattr(approval.status, "value") else approval.status,
+        "requested_at": approval.requested_at.isoformat() if approval.requested_at else None,
+        "decision_at": approval.decision_at.isoformat() if approval.decision_at else None,
+    }
+
+
+# Shared per-process publisher
+events = EventPublisher(sio)
@@ -0,0 +1,187 @@
+"""
+utils/record_stream.py — Incremental CSV / NDJSON parsing and encoding of streamed bodies.
+
+Parsing yields records as soon as their last line arrives, so a large import is
+processed while it is still being uploaded and never held in memory as a whole.
+Encoding turns an async row iterator into response chunks of about
+STREAM_CHUNK_BYTES, so a large report or export is sent while it is still being
+read; `gzip_chunks` compresses such a stream on the fly.
+"""
+
+import codecs
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, AsyncIterator, Sequence
+
+STREAM_CHUNK_BYTES = 64 * 1024
+
+# (row number, record, error) — exactly one of record / error is set
+ParsedRow = tuple[int, dict | None, str | None]
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decodes a byte stream as UTF-8 (BOM tolerated) and yields complete lines."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+async def iter_csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[ParsedRow]:
+    """
+    Parses a CSV stream with a header row into dicts keyed by the header.
+
+    Quoted fields may span lines: a record is complete once its quotes balance.
+
+    Args:
+        chunks (AsyncIterator[bytes]): Raw body chunks, e.g. `request.stream()`.
+
+    Yields:
+        ParsedRow: 1-based data row number and the parsed record or an error.
+    """
+    header: list[str] | None = None
+    record = ""
+    row = 0
+    async for line in _iter_lines(chunks):
+        record = f"{record}\n{line}" if record else line
+        if record.count('"') % 2:
+            continue  # inside a quoted field; wait for the closing quote
+        text, record = record, ""
+        if not text.strip():
+            continue
+
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [h.strip() for h in values]
+            continue
+
+        row += 1
+        if len(values) != len(header):
+            yield row, None, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield row, {k: (v.strip() or None) for k, v in zip(header, values)}, None
+
+    if record.strip():
+        yield row + 1, None, "Unterminated quoted field"
+
+
+async def iter_ndjson_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[ParsedRow]:
+    """
+    Parses a newline-delimited JSON stream, one object per line.
+
+    Args:
+        chunks (AsyncIterator[bytes]): Raw body chunks, e.g. `request.stream()`.
+
+    Yields:
+        ParsedRow: 1-based row number and the parsed record or an error.
+    """
+    row = 0
+    async for line in _iter_lines(chunks):
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row, None, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(record, dict):
+            yield row, None, "Expected a JSON object"
+            continue
+        yield row, record, None
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _csv_value(value: Any) -> Any:
+    """Writes timestamps as ISO 8601 and nested lists / objects as JSON."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, default=_json_value, ensure_ascii=False)
+    return value
+
+
+async def encode_csv(header: Sequence[str], rows: AsyncIterator[Sequence]) -> AsyncIterator[bytes]:
+    """
+    Encodes rows as UTF-8 CSV, header first; nested values become JSON cells.
+
+    Args:
+        header (Sequence[str]): Column names.
+        rows (AsyncIterator[Sequence]): Row values in header order.
+
+    Yields:
+        bytes: Chunks of about STREAM_CHUNK_BYTES.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(header)
+    async for row in rows:
+        writer.writerow([_csv_value(value) for value in row])
+        if buffer.tell() >= STREAM_CHUNK_BYTES:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def encode_ndjson(header: Sequence[str], rows: AsyncIterator[Sequence]) -> AsyncIterator[bytes]:
+    """
+    Encodes rows as newline-delimited JSON objects keyed by `header`.
+
+    Yields:
+        bytes: Chunks of about STREAM_CHUNK_BYTES.
+    """
+    buffer = io.StringIO()
+    async for row in rows:
+        buffer.write(json.dumps(dict(zip(header, row)), default=_json_value, ensure_ascii=False))
+        buffer.write("\n")
+        if buffer.tell() >= STREAM_CHUNK_BYTES:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+# Streamed response encoders and their media types, by format name
+ENCODERS = {
+    "csv": (encode_csv, "text/csv; charset=utf-8"),
+    "ndjson": (encode_ndjson, "application/x-ndjson"),
+}
+
+
+async def gzip_chunks(chunks: AsyncIterator[bytes], level: int = 6) -> AsyncIterator[bytes]:
+    """
+    Compresses a byte stream into a single gzip member as it is produced.
+
+    Args:
+        chunks (AsyncIterator[bytes]): Uncompressed chunks.
+        level (int): zlib compression level. Default is 6.
+
+    Yields:
+        bytes: Compressed chunks; the compressor buffers, so they are fewer than the input.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
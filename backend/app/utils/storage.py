@@ -0,0 +1,182 @@
+"""
+utils/storage.py — Pluggable object storage for visitor photos and QR badges.
+
+Backends (STORAGE_BACKEND):
+- cloudinary: hosted storage/CDN (default)
+- local: files on local disk, served by the API under /media
+
+Objects are addressed by keys such as `visitors/<sha256>.webp`. Keys are
+content hashes, so an object never changes once written.
+"""
+
+import os
+import tempfile
+from dotenv import load_dotenv
+from app.core.metrics import outbound_timer
+from app.logger_config import setup_logger
+
+load_dotenv()
+logger = setup_logger(__name__)
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "cloudinary").lower()
+LOCAL_STORAGE_ROOT = os.getenv("LOCAL_STORAGE_ROOT", "media")
+MEDIA_BASE_URL = os.getenv("MEDIA_BASE_URL", "http://localhost:8000/media").rstrip("/")
+
+
+class StorageBackend:
+    """
+    Interface shared by storage backends. All methods are blocking; call them from a thread.
+    """
+    name = "base"
+    # Whether `exists` is cheap enough to call before every upload
+    fast_exists = False
+
+    def save(self, key: str, data: bytes, content_type: str) -> str | None:
+        """Stores `data` under `key` and returns its public URL (None on failure)."""
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        """Returns True if an object is already stored under `key`."""
+        raise NotImplementedError
+
+    def url_for(self, key: str) -> str:
+        """Returns the public URL of `key` without checking that it exists."""
+        raise NotImplementedError
+
+
+class CloudinaryStorage(StorageBackend):
+    """
+    Stores objects as Cloudinary images; the key (minus extension) is the public ID.
+    `exists` goes through the rate-limited Admin API, so uploads rely on overwrite=False instead.
+    """
+    name = "cloudinary"
+
+    def __init__(self):
+        import cloudinary
+
+        cloudinary.config(
+            cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
+            api_key=os.getenv("CLOUDINARY_API_KEY"),
+            api_secret=os.getenv("CLOUDINARY_API_SECRET")
+        )
+
+    @staticmethod
+    def _public_id(key: str) -> tuple[str, str]:
+        public_id, _, ext = key.rpartition(".")
+        return (public_id, ext) if public_id else (key, "")
+
+    def save(self, key: str, data: bytes, content_type: str) -> str | None:
+        import io
+        import cloudinary.uploader
+
+        public_id, _ = self._public_id(key)
+        try:
+            with outbound_timer("cloudinary", "upload"):
+                result = cloudinary.uploader.upload(
+                    io.BytesIO(data),
+                    public_id=public_id,
+                    resource_type="image",
+                    overwrite=False
+                )
+        except Exception as e:
+            logger.error(f"❌ Failed to upload {key} to Cloudinary: {e}", exc_info=True)
+            return None
+
+        url = result.get("secure_url")
+        if not url:
+            logger.warning(f"⚠️ {key} uploaded but no secure_url returned.")
+        return url
+
+    def exists(self, key: str) -> bool:
+        import cloudinary.api
+        from cloudinary.exceptions import NotFound
+
+        public_id, _ = self._public_id(key)
+        try:
+            with outbound_timer("cloudinary", "exists"):
+                cloudinary.api.resource(public_id)
+            return True
+        except NotFound:
+            return False
+        except Exception as e:
+            logger.warning(f"⚠️ Could not check Cloudinary for {key}: {e}")
+            return False
+
+    def url_for(self, key: str) -> str:
+        from cloudinary.utils import cloudinary_url
+
+        public_id, ext = self._public_id(key)
+        url, _ = cloudinary_url(public_id, secure=True, format=ext or None)
+        return url
+
+
+class LocalStorage(StorageBackend):
+    """
+    Stores objects on local disk under sharded directories, e.g.
+    `visitors/ab/cd/abcd1234....webp`, to keep directory sizes small.
+    """
+    name = "local"
+    fast_exists = True
+
+    def __init__(self, root: str = LOCAL_STORAGE_ROOT, base_url: str = MEDIA_BASE_URL):
+        self.root = os.path.abspath(root)
+        self.base_url = base_url
+        os.makedirs(self.root, exist_ok=True)
+
+    def relative_path(self, key: str) -> str:
+        """Maps a key to its sharded path relative to the storage root."""
+        folder, _, name = key.rpartition("/")
+        shard = os.path.join(name[:2], name[2:4]) if len(name) >= 4 else ""
+        return os.path.join(folder, shard, name)
+
+    def resolve(self, relative_path: str) -> str | None:
+        """
+        Returns the absolute path for a relative media path, or None if it escapes the root.
+        """
+        path = os.path.realpath(os.path.join(self.root, relative_path))
+        if os.path.commonpath([path, self.root]) != self.root:
+            return None
+        return path
+
+    def save(self, key: str, data: bytes, content_type: str) -> str | None:
+        relative = self.relative_path(key)
+        path = os.path.join(self.root, relative)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temp file first so readers never see a partial object
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, path)
+            except OSError as e:
+                logger.error(f"❌ Failed to write {path}: {e}")
+                if os.path.exists(tmp):
+                    os.unlink(tmp)
+                return None
+        return self.url_for(key)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(os.path.join(self.root, self.relative_path(key)))
+
+    def url_for(self, key: str) -> str:
+        return f"{self.base_url}/{self.relative_path(key).replace(os.sep, '/')}"
+
+
+BACKENDS = {
+    "cloudinary": CloudinaryStorage,
+    "local": LocalStorage,
+}
+
+_storage: StorageBackend | None = None
+
+
+def get_storage() -> StorageBackend:
+    """Returns the process-wide storage backend configured by STORAGE_BACKEND."""
+    global _storage
+    if _storage is None:
+        if STORAGE_BACKEND not in BACKENDS:
+            raise RuntimeError(f"Unknown STORAGE_BACKEND '{STORAGE_BACKEND}'. Expected one of: {', '.join(BACKENDS)}")
+        _storage = BACKENDS[STORAGE_BACKEND]()
+        logger.info(f"🗄️ Using {_storage.name} storage backend")
+    return _storage
@@ -0,0 +1,219 @@
+"""
+utils/visitor_search_index.py — In-process trigram index for visitor search without pg_trgm.
+
+PostgreSQL answers `/visitors/search` from the trigram GIN indexes of migration 0009.
+Other databases (SQLite in development and benchmarks) have no trigram index, so
+each worker keeps its own, built the way pg_trgm splits text:
+
+- Words (runs of letters and digits, lower-cased) are padded with two leading and
+  one trailing space and cut into trigrams; a contact is one word of its alphanumerics
+- Each field (name, company, contact) maps trigrams to the IDs of the visitors
+  whose field contains them
+- A visitor matches when the query is a substring of a field, or when at least
+  SEARCH_MIN_SIMILARITY of the query's trigrams occur in its name or company
+  (pg_trgm's word_similarity, approximated); the score is that share for the best field
+
+Shares are counted straight off the query trigrams' posting lists, so a search
+costs the length of those lists, not a pass over every visitor. Loaded on first use, then refreshed
+by ID high-water mark; visitors registered in this process are added immediately.
+Visitors are never renamed by the app, so rows are not re-read once indexed.
+"""
+
+import asyncio
+import heapq
+import os
+import re
+import threading
+import time
+from array import array
+from collections import Counter
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import SEARCH_MIN_SIMILARITY
+from app.models import Visitor
+from app.repos.visitor_repo import VisitorRepository, contact_search_key
+from app.logger_config import setup_logger
+
+logger = setup_logger(__name__)
+
+# How often (seconds) a worker pulls visitors registered by other workers
+REFRESH_INTERVAL_SECONDS = float(os.getenv("VISITOR_SEARCH_INDEX_REFRESH_SECONDS", "5"))
+
+_WORD = re.compile(r"[^\W_]+")
+_EMPTY = array("q")
+
+
+def normalize(value: str) -> str:
+    """Lower-cased words separated by single spaces (punctuation dropped)."""
+    return " ".join(_WORD.findall(value.lower()))
+
+
+def trigrams(normalized: str) -> set[str]:
+    """Splits normalized text into pg_trgm-style trigrams (each word padded as "  word ")."""
+    grams = set()
+    for word in normalized.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _inner_trigrams(normalized: str) -> set[str]:
+    """Unpadded trigrams of each word: the ones any text containing it must have."""
+    grams = set()
+    for word in normalized.split():
+        grams.update(word[i:i + 3] for i in range(len(word) - 2))
+    return grams
+
+
+def _padded(normalized: str) -> str:
+    """
+    Joins the padded words, so a trigram occurs in the result exactly when it is one
+    of the text's trigrams, and normalized text `t` is a substring of the original
+    exactly when `t.replace(" ", "   ")` is a substring of the result.
+    """
+    return "  " + normalized.replace(" ", "   ") + " "
+
+
+class VisitorSearchIndex:
+    """
+    Per-process trigram index over visitor name, company and contact.
+    """
+
+    def __init__(self, refresh_interval: float = REFRESH_INTERVAL_SECONDS):
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._refresh_lock = asyncio.Lock()
+        # Per field (name, company, contact): trigram -> visitor IDs
+        self._postings: tuple[dict[str, array], ...] = ({}, {}, {})
+        # id -> padded (name, company, contact search key)
+        self._fields: dict[int, tuple[str, str, str]] = {}
+        self._loaded = False
+        self._max_id = 0
+        self._last_refresh = 0.0
+
+    async def ensure_fresh(self, db: AsyncSession) -> None:
+        """
+        Loads the index on first use; afterwards pulls visitors with an ID above
+        the high-water mark, at most once per refresh interval.
+        """
+        if self._loaded and time.monotonic() - self._last_refresh < self.refresh_interval:
+            return
+
+        # Only one coroutine per worker hits the database; the others wait and re-check
+        async with self._refresh_lock:
+            if self._loaded and time.monotonic() - self._last_refresh < self.refresh_interval:
+                return
+            started = time.perf_counter()
+            added = 0
+            async for rows in VisitorRepository(db).stream_search_terms(self._max_id):
+                with self._lock:
+                    for row in rows:
+                        self._insert(row.id, row.full_name, row.company, row.contact)
+                        self._max_id = max(self._max_id, row.id)
+                added += len(rows)
+            with self._lock:
+                self._last_refresh = time.monotonic()
+                if not self._loaded:
+                    self._loaded = True
+                    logger.info(
+                        f"🔎 Visitor search index loaded: {added} visitors in {time.perf_counter() - started:.1f}s"
+                    )
+
+    def _insert(self, visitor_id: int, name: str, company: str | None, contact: str) -> None:
+        """Indexes one visitor. Caller holds the lock."""
+        if visitor_id in self._fields:
+            return
+        values = (normalize(name or ""), normalize(company or ""), contact_search_key(contact or ""))
+        self._fields[visitor_id] = tuple(_padded(value) for value in values)
+        for postings, value in zip(self._postings, values):
+            for gram in trigrams(value):
+                ids = postings.get(gram)
+                if ids is None:
+                    ids = postings[gram] = array("q")
+                ids.append(visitor_id)
+
+    def add(self, visitor: Visitor) -> None:
+        """
+        Indexes a visitor registered in this process so it is searchable immediately.
+        Ignored until the index has been loaded; the initial load will include it.
+        """
+        with self._lock:
+            if self._loaded:
+                self._insert(visitor.id, visitor.full_name, visitor.company, visitor.contact)
+
+    def _match_text(self, field: int, text: str, scores: dict[int, float]) -> None:
+        """
+        Scores a name or company field: the share of the query's trigrams each visitor's
+        field contains, counted straight off the posting lists. Caller holds the lock.
+        """
+        grams = trigrams(text)
+        if not grams:
+            return
+        postings = self._postings[field]
+        counts: Counter[int] = Counter()
+        for gram in grams:
+            counts.update(postings.get(gram, _EMPTY))
+
+        # A substring contains every unpadded trigram of the query's words
+        needle = text.replace(" ", "   ")
+        inner = len(_inner_trigrams(text))
+        needed = SEARCH_MIN_SIMILARITY * len(grams)
+        for visitor_id, count in counts.items():
+            if count >= needed or (count >= inner and needle in self._fields[visitor_id][field]):
+                score = count / len(grams)
+                if score > scores.get(visitor_id, -1.0):
+                    scores[visitor_id] = score
+
+    def _match_contact(self, contact: str, scores: dict[int, float]) -> None:
+        """
+        Matches contacts by substring only: phone numbers share long prefixes, so
+        trigram similarity would match nearly all of them. Caller holds the lock.
+        """
+        inner = _inner_trigrams(contact)
+        if not inner:
+            return
+        postings = self._postings[2]
+        rarest = min(inner, key=lambda gram: len(postings.get(gram, _EMPTY)))
+        grams = trigrams(contact)
+        for visitor_id in postings.get(rarest, _EMPTY):
+            padded = self._fields[visitor_id][2]
+            if contact in padded:
+                score = sum(gram in padded for gram in grams) / len(grams)
+                if score > scores.get(visitor_id, -1.0):
+                    scores[visitor_id] = score
+
+    def search(self, text: str, limit: int, cursor: tuple[float, int] | None = None) -> list[tuple[float, int]]:
+        """
+        Ranks visitors against a query, best match first, then newest first.
+
+        Args:
+            text (str): Search text.
+            limit (int): Maximum number of hits to return.
+            cursor (tuple[float, int], optional): (score, id) of the last hit on the previous page.
+
+        Returns:
+            list[tuple[float, int]]: (score, visitor id) pairs.
+        """
+        normalized = normalize(text)
+        scores: dict[int, float] = {}
+        with self._lock:
+            self._match_text(0, normalized, scores)
+            self._match_text(1, normalized, scores)
+            self._match_contact(contact_search_key(text), scores)
+
+        hits = ((score, visitor_id) for visitor_id, score in scores.items())
+        if cursor:
+            hits = (hit for hit in hits if hit < cursor)
+        return heapq.nlargest(limit, hits)
+
+    def clear(self) -> None:
+        """Drops the index; the next `ensure_fresh` reloads it from the database."""
+        with self._lock:
+            self._postings = ({}, {}, {})
+            self._fields = {}
+            self._loaded = False
+            self._max_id = 0
+            self._last_refresh = 0.0
+
+
+# Shared per-process index
+visitor_search_index = VisitorSearchIndex()
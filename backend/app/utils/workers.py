@@ -0,0 +1,50 @@
+"""
+utils/workers.py — Shared process pools for CPU-bound work (badge rendering, image processing).
+
+Pools are created lazily, one per name, and shut down from the app lifespan.
+Workers are spawned (not forked) so they never inherit the event loop, sockets
+or locks held by the server's threads.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Default worker count per pool; CPU-bound work gains nothing past the core count
+DEFAULT_PROCESS_WORKERS = int(os.getenv("PROCESS_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_pools: dict[str, ProcessPoolExecutor] = {}
+_lock = threading.Lock()
+
+
+def process_pool(name: str, max_workers: int = DEFAULT_PROCESS_WORKERS) -> ProcessPoolExecutor:
+    """
+    Returns the named process pool, creating it on first use.
+
+    Args:
+        name (str): Pool name, e.g. "render".
+        max_workers (int): Worker processes for a newly created pool.
+
+    Returns:
+        ProcessPoolExecutor: The shared executor.
+    """
+    pool = _pools.get(name)
+    if pool is None:
+        with _lock:
+            pool = _pools.get(name)
+            if pool is None:
+                pool = ProcessPoolExecutor(
+                    max_workers=max_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+                _pools[name] = pool
+    return pool
+
+
+def shutdown_pools() -> None:
+    """Shuts down every process pool created so far."""
+    with _lock:
+        for pool in _pools.values():
+            pool.shutdown(wait=True, cancel_futures=True)
+        _pools.clear()
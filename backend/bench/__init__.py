@@ -0,0 +1,98 @@
+"""
+bench — Reproducible dataset seeding and load generation for the hot API endpoints.
+
+Run from `backend/`:
+    python -m bench.seed --scale 10k
+    python -m bench.run --concurrency 32 --duration 20 --output bench/results/current.json
+
+Both commands use DATABASE_URL (a local SQLite file by default). Storage and
+email always go to local stubs, so a benchmark never calls Cloudinary or SendGrid.
+"""
+
+import os
+from dataclasses import dataclass
+
+DEFAULT_DATABASE_URL = "sqlite:///bench.sqlite"
+
+# Every seeded employee shares this password so the login scenario can sign in as anyone
+BENCH_PASSWORD = "bench-password"
+
+DEPARTMENTS = ("Engineering", "Finance", "Operations", "Sales", "Security", "HR")
+
+# Visitor names and companies are combined from these, so searches hit realistic match counts
+FIRST_NAMES = (
+    "James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "David", "Elizabeth",
+    "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Charles", "Karen",
+    "Priya", "Arjun", "Wei", "Mei", "Hiroshi", "Yuki", "Ahmed", "Fatima", "Carlos", "Sofia",
+    "Olga", "Ivan", "Kwame", "Amara", "Lars", "Ingrid", "Mateo", "Lucia", "Noah", "Zara",
+)
+LAST_NAMES = (
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+    "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin",
+    "Lee", "Perez", "Thompson", "White", "Harris", "Sanchez", "Clark", "Ramirez", "Lewis", "Robinson",
+    "Sharma", "Patel", "Kumar", "Chen", "Wang", "Tanaka", "Suzuki", "Kim", "Nguyen", "Okafor",
+    "Mensah", "Ivanova", "Petrov", "Larsen", "Nielsen", "Rossi", "Bianchi", "Silva", "Santos", "Khan",
+)
+COMPANY_WORDS = (
+    "Acme", "Globex", "Initech", "Umbrella", "Stark", "Wayne", "Wonka", "Hooli", "Vandelay", "Cyberdyne",
+    "Soylent", "Tyrell", "Aperture", "Massive", "Oscorp", "Gringotts", "Monarch", "Virtucon", "Nakatomi", "Dunder",
+)
+COMPANY_SUFFIXES = ("Labs", "Systems", "Logistics", "Consulting", "Industries", "Partners", "Foods", "Energy")
+
+
+@dataclass(frozen=True)
+class Scale:
+    """Row counts of a seeded dataset; visitors and approvals are one-to-one."""
+    visitors: int
+    employees: int
+    preapprovals: int
+
+
+SCALES = {
+    "10k": Scale(visitors=10_000, employees=100, preapprovals=1_000),
+    "100k": Scale(visitors=100_000, employees=500, preapprovals=10_000),
+    "1m": Scale(visitors=1_000_000, employees=2_000, preapprovals=100_000),
+}
+
+
+def configure_environment() -> None:
+    """
+    Points the app at the benchmark database and stubs external services.
+
+    Must run before anything under `app` is imported, since settings are read at import time.
+    """
+    os.environ.setdefault("DATABASE_URL", DEFAULT_DATABASE_URL)
+    os.environ["STORAGE_BACKEND"] = "local"
+    os.environ["EMAIL_TRANSPORT"] = "memory"
+    os.environ.setdefault("LOCAL_STORAGE_ROOT", "bench/media")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.setdefault("LOG_FILE", "")
+
+
+def employee_email(employee_id: int) -> str:
+    return f"employee{employee_id}@bench.local"
+
+
+def employee_name(employee_id: int) -> str:
+    return f"Employee {employee_id}"
+
+
+def employee_department(employee_id: int) -> str:
+    return DEPARTMENTS[employee_id % len(DEPARTMENTS)]
+
+
+def visitor_name(visitor_id: int) -> str:
+    first = FIRST_NAMES[visitor_id % len(FIRST_NAMES)]
+    last = LAST_NAMES[(visitor_id // len(FIRST_NAMES)) % len(LAST_NAMES)]
+    return f"{first} {last}"
+
+
+def visitor_company(visitor_id: int) -> str:
+    word = COMPANY_WORDS[visitor_id % len(COMPANY_WORDS)]
+    suffix = COMPANY_SUFFIXES[(visitor_id // 7) % len(COMPANY_SUFFIXES)]
+    return f"{word} {suffix}"
+
+
+def host_of(visitor_id: int, employees: int) -> int:
+    """Employee ID hosting a seeded visitor (and owning its approval)."""
+    return (visitor_id - 1) % employees + 1
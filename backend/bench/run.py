@@ -0,0 +1,313 @@
+"""
+bench/run.py — Drives the hot endpoints at fixed concurrency and reports latency percentiles.
+
+    python -m bench.run [--scenarios get_visitor,register,approval_action,login,on_site,search]
+                        [--concurrency 32] [--duration 20] [--warmup 3]
+                        [--url http://localhost:8000]
+                        [--output bench/results/current.json]
+                        [--baseline bench/results/baseline.json --tolerance 10]
+
+Without --url the app runs in-process over httpx's ASGI transport (lifespan
+included); with --url it targets a running server that shares DATABASE_URL.
+Scenarios run one after another against a dataset seeded by `bench.seed`, each
+with a warmup window whose requests are discarded. Request choices come from
+a seeded RNG, so runs are repeatable.
+
+With --baseline, throughput and p95 are compared per scenario; a drop in
+throughput or a rise in p95 beyond --tolerance percent is a regression and
+makes the command exit with status 1.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from bench import (
+    BENCH_PASSWORD, configure_environment, employee_email, employee_name, employee_department, visitor_name
+)
+
+configure_environment()
+
+import httpx  # noqa: E402
+from sqlalchemy import func, select  # noqa: E402
+from app.core.config import engine  # noqa: E402
+from app.models import Employee, Visitor, Approval  # noqa: E402
+from app.utils.auth import create_access_token  # noqa: E402
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+@dataclass
+class Dataset:
+    """ID ranges of the seeded rows the scenarios pick from."""
+    employees: int
+    visitors: int
+    approvals: int
+
+
+@dataclass
+class ScenarioResult:
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    elapsed: float = 0.0
+
+    def summary(self) -> dict:
+        ordered = sorted(self.latencies)
+        requests = len(ordered) + self.errors
+        report = {
+            "requests": requests,
+            "errors": self.errors,
+            "throughput_rps": round(requests / self.elapsed, 1) if self.elapsed else 0.0,
+        }
+        for p in PERCENTILES:
+            report[f"p{p}_ms"] = round(_percentile(ordered, p) * 1000, 2)
+        report["max_ms"] = round(ordered[-1] * 1000, 2) if ordered else 0.0
+        return report
+
+
+def _percentile(ordered: list[float], p: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not ordered:
+        return 0.0
+    rank = max(math.ceil(p / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+# -----------------------
+# Scenarios: each builds one request from the RNG and the dataset
+# -----------------------
+
+async def get_visitor(client: httpx.AsyncClient, rng: random.Random, data: Dataset) -> httpx.Response:
+    return await client.get(f"/visitors/{rng.randint(1, data.visitors)}")
+
+
+async def register(client: httpx.AsyncClient, rng: random.Random, data: Dataset) -> httpx.Response:
+    host = rng.randint(1, data.employees)
+    return await client.post("/visitors/register", json={
+        "full_name": f"Bench Visitor {rng.randrange(10 ** 9)}",
+        "contact": f"+1666{rng.randrange(10 ** 7):07d}",
+        "company": "Bench Inc",
+        "purpose": "Benchmark",
+        "host_employee_name": employee_name(host),
+        "host_department": employee_department(host),
+    })
+
+
+async def approval_action(client: httpx.AsyncClient, rng: random.Random, data: Dataset) -> httpx.Response:
+    return await client.post(
+        f"/approvals/{rng.randint(1, data.approvals)}/action",
+        json={"status": rng.choice(("APPROVED", "REJECTED"))}
+    )
+
+
+async def login(client: httpx.AsyncClient, rng: random.Random, data: Dataset) -> httpx.Response:
+    return await client.post("/auth/login", json={
+        "email": employee_email(rng.randint(1, data.employees)),
+        "password": BENCH_PASSWORD,
+    })
+
+
+@lru_cache(maxsize=None)
+def _auth_headers(employee_id: int) -> dict:
+    token = create_access_token({"id": employee_id, "sub": employee_email(employee_id)})
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def on_site(client: httpx.AsyncClient, rng: random.Random, data: Dataset) -> httpx.Response:
+    employee_id = rng.randint(1, data.employees)
+    params = {"department": employee_department(employee_id)} if rng.random() < 0.5 else {}
+    return await client.get("/visitors/on-site", params=params, headers=_auth_headers(employee_id))
+
+
+async def search(client: httpx.AsyncClient, rng: random.Random, data: Dataset) -> httpx.Response:
+    # A last name, a first name with one letter dropped (typo), or the tail of a phone number
+    visitor_id = rng.randint(1, data.visitors)
+    first, last = visitor_name(visitor_id).split(" ")
+    kind = rng.random()
+    if kind < 0.4:
+        q = last
+    elif kind < 0.8 and len(first) > 4:
+        drop = rng.randrange(1, len(first))
+        q = first[:drop] + first[drop + 1:]
+    elif kind < 0.8:
+        q = first
+    else:
+        q = f"{visitor_id:07d}"[-6:]
+    return await client.get("/visitors/search", params={"q": q}, headers=_auth_headers(1))
+
+
+SCENARIOS = {
+    "get_visitor": get_visitor,
+    "register": register,
+    "approval_action": approval_action,
+    "login": login,
+    "on_site": on_site,
+    "search": search,
+}
+
+
+async def _load_dataset() -> Dataset:
+    async with engine.connect() as conn:
+        employees, visitors, approvals = (await conn.execute(select(
+            select(func.max(Employee.id)).scalar_subquery(),
+            select(func.max(Visitor.id)).scalar_subquery(),
+            select(func.max(Approval.id)).scalar_subquery(),
+        ))).one()
+    if not employees or not visitors or not approvals:
+        raise SystemExit("No benchmark data found; run `python -m bench.seed` first")
+    return Dataset(employees=employees, visitors=visitors, approvals=approvals)
+
+
+async def run_scenario(client, scenario, data: Dataset, concurrency: int, duration: float,
+                       warmup: float, seed: int) -> ScenarioResult:
+    """Runs `concurrency` workers issuing requests back to back for warmup + duration seconds."""
+    result = ScenarioResult()
+    started = time.perf_counter()
+    measure_from = started + warmup
+    deadline = measure_from + duration
+
+    async def worker(worker_id: int):
+        rng = random.Random(seed * 1000 + worker_id)
+        while True:
+            sent = time.perf_counter()
+            if sent >= deadline:
+                return
+            try:
+                response = await scenario(client, rng, data)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            if sent < measure_from:
+                continue
+            if ok:
+                result.latencies.append(time.perf_counter() - sent)
+            else:
+                result.errors += 1
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    result.elapsed = time.perf_counter() - measure_from
+    return result
+
+
+async def run(args) -> dict:
+    data = await _load_dataset()
+    await engine.dispose()
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    report = {
+        "meta": {
+            "database": engine.dialect.name,
+            "dataset": data.__dict__,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "target": args.url or "in-process",
+            "python": platform.python_version(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "scenarios": {},
+    }
+
+    async def measure(client):
+        for name in args.scenarios:
+            result = await run_scenario(
+                client, SCENARIOS[name], data, args.concurrency, args.duration, args.warmup, args.seed
+            )
+            report["scenarios"][name] = result.summary()
+            _print_row(name, report["scenarios"][name])
+
+    _print_header()
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=30) as client:
+            await measure(client)
+    else:
+        from app.main import app
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=30) as client:
+                await measure(client)
+    return report
+
+
+def _print_header() -> None:
+    columns = "".join(f"{f'p{p} ms':>10}" for p in PERCENTILES)
+    print(f"{'scenario':<16}{'requests':>10}{'errors':>8}{'req/s':>10}{columns}{'max ms':>10}")
+
+
+def _print_row(name: str, summary: dict) -> None:
+    columns = "".join(f"{summary[f'p{p}_ms']:>10.2f}" for p in PERCENTILES)
+    print(
+        f"{name:<16}{summary['requests']:>10}{summary['errors']:>8}"
+        f"{summary['throughput_rps']:>10.1f}{columns}{summary['max_ms']:>10.2f}"
+    )
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Prints throughput and p95 changes against a baseline report.
+
+    Returns:
+        list[str]: Descriptions of scenarios that regressed beyond `tolerance` percent.
+    """
+    regressions = []
+    print(f"\n{'scenario':<16}{'req/s Δ':>10}{'p95 Δ':>10}")
+    for name, current in report["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            print(f"{name:<16}{'(new)':>10}")
+            continue
+        rps_change = _change(current["throughput_rps"], previous["throughput_rps"])
+        p95_change = _change(current["p95_ms"], previous["p95_ms"])
+        print(f"{name:<16}{rps_change:>+9.1f}%{p95_change:>+9.1f}%")
+        if rps_change < -tolerance:
+            regressions.append(f"{name}: throughput {rps_change:+.1f}%")
+        if p95_change > tolerance:
+            regressions.append(f"{name}: p95 {p95_change:+.1f}%")
+    return regressions
+
+
+def _change(current: float, previous: float) -> float:
+    return (current - previous) / previous * 100 if previous else 0.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the hot API endpoints.")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        type=lambda value: [s.strip() for s in value.split(",") if s.strip()])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20, help="Measured seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=3, help="Discarded seconds before each scenario")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--url", help="Benchmark a running server instead of the in-process app")
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=10, help="Allowed regression in percent")
+    args = parser.parse_args()
+
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenario(s): {', '.join(sorted(unknown))}")
+
+    report = asyncio.run(run(args))
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            print("\nRegressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
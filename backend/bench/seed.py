@@ -0,0 +1,169 @@
+"""
+bench/seed.py — Seeds a deterministic benchmark dataset.
+
+    python -m bench.seed --scale 10k|100k|1m [--reset]
+
+Applies migrations, then inserts employees, visitors (created and checked in
+over 90 days; approved visits are admitted and, except in the last few hours,
+checked out, while pending and rejected ones stay open), one approval per
+visitor (requested at check-in) and pre-approvals for every tenth visitor,
+with explicit IDs so runs at the same scale produce identical data. Rows go
+in as multi-row INSERTs in chunks.
+"""
+
+import argparse
+import asyncio
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from bench import (
+    SCALES, Scale, BENCH_PASSWORD, configure_environment,
+    employee_email, employee_name, employee_department, host_of, visitor_name, visitor_company,
+)
+
+configure_environment()
+
+from sqlalchemy import delete, func, select, text  # noqa: E402
+from app.core.config import engine  # noqa: E402
+from app.models import (  # noqa: E402
+    Employee, Visitor, Approval, PreApproval, VisitorDailyVisit, VisitRollup, ApprovalStatus
+)
+from app.utils.auth import hash_password  # noqa: E402
+
+CHUNK_SIZE = 5_000
+
+# Check-ins are spread over this period; approved visits older than ON_SITE_HOURS are checked out
+HISTORY = timedelta(days=90)
+ON_SITE_HOURS = 8
+STATUSES = (ApprovalStatus.PENDING, ApprovalStatus.APPROVED, ApprovalStatus.REJECTED)
+
+
+def _employees(scale: Scale, password_hash: str):
+    for i in range(1, scale.employees + 1):
+        yield {
+            "id": i,
+            "name": employee_name(i),
+            "department": employee_department(i),
+            "email": employee_email(i),
+            "password": password_hash,
+        }
+
+
+def _check_in(scale: Scale, now: datetime, visitor_id: int) -> datetime:
+    return now - HISTORY / scale.visitors * (scale.visitors - visitor_id)
+
+
+def _visitors(scale: Scale, now: datetime):
+    for i in range(1, scale.visitors + 1):
+        host = host_of(i, scale.employees)
+        check_in = _check_in(scale, now, i)
+        admitted = STATUSES[i % len(STATUSES)] == ApprovalStatus.APPROVED
+        on_site = now - check_in < timedelta(hours=ON_SITE_HOURS)
+        yield {
+            "id": i,
+            "full_name": visitor_name(i),
+            "contact": f"+1555{i:07d}",
+            "company": visitor_company(i),
+            "purpose": "Meeting",
+            "host_employee_name": employee_name(host),
+            "host_department": employee_department(host),
+            "check_in": check_in,
+            "admitted_at": check_in + timedelta(minutes=5) if admitted else None,
+            "check_out": check_in + timedelta(hours=2) if admitted and not on_site else None,
+            "created_at": check_in,
+        }
+
+
+def _approvals(scale: Scale, now: datetime):
+    for i in range(1, scale.visitors + 1):
+        status = STATUSES[i % len(STATUSES)]
+        requested_at = _check_in(scale, now, i)
+        yield {
+            "id": i,
+            "visitor_id": i,
+            "employee_id": host_of(i, scale.employees),
+            "status": status,
+            "requested_at": requested_at,
+            "decision_at": None if status == ApprovalStatus.PENDING else requested_at + timedelta(minutes=5),
+        }
+
+
+def _preapprovals(scale: Scale, now: datetime):
+    step = max(scale.visitors // scale.preapprovals, 1)
+    for n, visitor_id in enumerate(range(step, scale.visitors + 1, step)[:scale.preapprovals], start=1):
+        yield {
+            "id": n,
+            "visitor_id": visitor_id,
+            "employee_id": host_of(visitor_id, scale.employees),
+            "valid_from": now - timedelta(days=1),
+            "valid_to": now + timedelta(days=30),
+            "max_visits_per_day": 5,
+        }
+
+
+async def _insert(conn, model, rows) -> int:
+    """Inserts generated rows in CHUNK_SIZE multi-row statements."""
+    table = model.__table__
+    total, chunk = 0, []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == CHUNK_SIZE:
+            await conn.execute(table.insert(), chunk)
+            total += len(chunk)
+            chunk = []
+    if chunk:
+        await conn.execute(table.insert(), chunk)
+        total += len(chunk)
+    return total
+
+
+async def seed(scale: Scale, reset: bool) -> None:
+    now = datetime.now(timezone.utc)
+    async with engine.begin() as conn:
+        existing = (await conn.execute(select(func.count()).select_from(Employee))).scalar_one()
+        if existing and not reset:
+            raise SystemExit("Database already has data; pass --reset to replace it")
+        if reset:
+            for model in (VisitRollup, VisitorDailyVisit, PreApproval, Approval, Visitor, Employee):
+                await conn.execute(delete(model))
+
+    password_hash = hash_password(BENCH_PASSWORD)
+    for model, rows in (
+        (Employee, _employees(scale, password_hash)),
+        (Visitor, _visitors(scale, now)),
+        (Approval, _approvals(scale, now)),
+        (PreApproval, _preapprovals(scale, now)),
+    ):
+        started = time.perf_counter()
+        async with engine.begin() as conn:
+            count = await _insert(conn, model, rows)
+            if conn.dialect.name == "postgresql":
+                # Explicit IDs bypass the sequence; move it past them so the app can insert
+                table = model.__tablename__
+                await conn.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))"
+                ))
+        print(f"  {model.__tablename__:<13} {count:>9,} rows in {time.perf_counter() - started:6.1f}s")
+
+    async with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            await conn.execute(text("ANALYZE"))
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Seed the benchmark dataset.")
+    parser.add_argument("--scale", choices=SCALES, default="10k")
+    parser.add_argument("--reset", action="store_true", help="Delete existing rows first")
+    args = parser.parse_args()
+
+    # Migrations run in their own process: Alembic's logging setup would replace the app's
+    subprocess.run([sys.executable, "-m", "alembic", "upgrade", "head"], check=True)
+
+    print(f"Seeding {args.scale} dataset")
+    asyncio.run(seed(SCALES[args.scale], args.reset))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+migrations/env.py — Alembic environment running migrations through the app's async engine settings.
+"""
+
+import asyncio
+from logging.config import fileConfig
+from alembic import context
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from app.core.config import Base, ASYNC_DATABASE_URL, CONNECT_ARGS
+from app.repos.partition_repo import PARTITIONED_TABLES, is_partition_name
+import app.models  # noqa: F401  (registers models on Base.metadata)
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def include_object(obj, name, type_, reflected, compare_to) -> bool:
+    """
+    Keeps autogenerate away from the PostgreSQL-only schema the models cannot express:
+    - monthly and default partitions (0008), managed by app.jobs.maintain_partitions
+    - foreign keys into visitors, which 0008 drops (a partitioned table's unique keys
+      must include the partition key, so visitors.id alone cannot be referenced)
+    - the pg_trgm search indexes (0009)
+    - the partition keys, which 0008 makes NOT NULL
+    """
+    if type_ == "table" and reflected and compare_to is None:
+        return not is_partition_name(name)
+    postgresql = context.get_context().dialect.name == "postgresql"
+    if type_ == "foreign_key_constraint" and not reflected:
+        return not (postgresql and obj.referred_table.name == "visitors")
+    if type_ == "column" and postgresql and obj.table.name in PARTITIONED_TABLES:
+        return name != PARTITIONED_TABLES[obj.table.name][1]
+    if type_ == "index" and reflected and compare_to is None:
+        return not name.endswith("_trgm")
+    return True
+
+
+def run_migrations_offline() -> None:
+    """Emit migration SQL to stdout without connecting to the database."""
+    context.configure(
+        url=ASYNC_DATABASE_URL.render_as_string(hide_password=False),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        include_object=include_object,
+        dialect_opts={"paramstyle": "named"},
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def do_run_migrations(connection) -> None:
+    context.configure(connection=connection, target_metadata=target_metadata, include_object=include_object)
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_migrations_online() -> None:
+    """Run migrations over a dedicated, unpooled async connection."""
+    connectable = create_async_engine(ASYNC_DATABASE_URL, poolclass=NullPool, connect_args=CONNECT_ARGS)
+
+    async with connectable.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+
+    await connectable.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    asyncio.run(run_migrations_online())
@@ -0,0 +1,83 @@
+"""Initial schema (visitors, employees, approvals, preapprovals)
+
+Matches the tables previously created by `Base.metadata.create_all` at startup.
+Databases created that way should be stamped rather than upgraded:
+
+    alembic stamp 0001
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+approval_status = sa.Enum("PENDING", "APPROVED", "REJECTED", name="approvalstatus")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "visitors",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("full_name", sa.String(), nullable=False),
+        sa.Column("contact", sa.String(), nullable=False),
+        sa.Column("company", sa.String()),
+        sa.Column("purpose", sa.String(), nullable=False),
+        sa.Column("host_employee_name", sa.String(), nullable=False),
+        sa.Column("host_department", sa.String(), nullable=False),
+        sa.Column("photo_url", sa.String()),
+        sa.Column("badge_url", sa.String()),
+        sa.Column("check_in", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("check_out", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+    op.create_table(
+        "employees",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("department", sa.String(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False, unique=True),
+        sa.Column("password", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_employees_id", "employees", ["id"])
+
+    op.create_table(
+        "approvals",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("visitor_id", sa.Integer(), sa.ForeignKey("visitors.id"), nullable=False),
+        sa.Column("employee_id", sa.Integer(), sa.ForeignKey("employees.id"), nullable=False),
+        sa.Column("status", approval_status, nullable=False),
+        sa.Column("requested_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("decision_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+    op.create_table(
+        "preapprovals",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("visitor_id", sa.Integer(), sa.ForeignKey("visitors.id"), nullable=False),
+        sa.Column("employee_id", sa.Integer(), sa.ForeignKey("employees.id"), nullable=False),
+        sa.Column("valid_from", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("valid_to", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("max_visits_per_day", sa.Integer()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_preapprovals_id", "preapprovals", ["id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_preapprovals_id", table_name="preapprovals")
+    op.drop_table("preapprovals")
+    op.drop_table("approvals")
+    op.drop_index("ix_employees_id", table_name="employees")
+    op.drop_table("employees")
+    op.drop_table("visitors")
+    approval_status.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,52 @@
+"""Composite and partial indexes for the approval and pre-approval hot queries
+
+- approvals (visitor_id, requested_at): latest approval per visitor (gate scan)
+- approvals (visitor_id, status, decision_at): latest APPROVED approval / approved visits today
+- approvals (employee_id, status, requested_at): GET /approvals/{employee_id}?status=...
+- approvals (employee_id, requested_at) WHERE status = 'PENDING': pending approvals for a host
+- preapprovals (visitor_id, valid_from, valid_to): active pre-approval window lookup
+- preapprovals (employee_id): GET /preapprovals/{employee_id}
+
+On PostgreSQL the indexes are built CONCURRENTLY so existing tables stay writable.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_approvals_visitor_requested", "approvals", ["visitor_id", "requested_at"], None),
+    ("ix_approvals_visitor_status_decision", "approvals", ["visitor_id", "status", "decision_at"], None),
+    ("ix_approvals_employee_status_requested", "approvals", ["employee_id", "status", "requested_at"], None),
+    ("ix_approvals_employee_pending", "approvals", ["employee_id", "requested_at"], "status = 'PENDING'"),
+    ("ix_preapprovals_visitor_window", "preapprovals", ["visitor_id", "valid_from", "valid_to"], None),
+    ("ix_preapprovals_employee", "preapprovals", ["employee_id"], None),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_where=sa.text(where) if where else None,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
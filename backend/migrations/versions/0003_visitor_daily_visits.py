@@ -0,0 +1,46 @@
+"""Per-visitor, per-day approved visit counter
+
+Replaces the `func.date(decision_at)` count on every scan with a primary-key
+lookup. Existing APPROVED approvals are backfilled, bucketed by UTC day.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "visitor_daily_visits",
+        sa.Column("visitor_id", sa.Integer(), sa.ForeignKey("visitors.id"), primary_key=True),
+        sa.Column("visit_date", sa.Date(), primary_key=True),
+        sa.Column("visits", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+    if op.get_bind().dialect.name == "postgresql":
+        visit_date = "(decision_at AT TIME ZONE 'UTC')::date"
+    else:
+        visit_date = "date(decision_at)"
+
+    op.execute(
+        f"""
+        INSERT INTO visitor_daily_visits (visitor_id, visit_date, visits)
+        SELECT visitor_id, {visit_date}, COUNT(*)
+        FROM approvals
+        WHERE status = 'APPROVED' AND decision_at IS NOT NULL
+        GROUP BY visitor_id, {visit_date}
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("visitor_daily_visits")
@@ -0,0 +1,43 @@
+"""Keyset pagination indexes for the approval and pre-approval listings
+
+- approvals (employee_id, requested_at, id): GET /approvals/{employee_id} pages
+- preapprovals (employee_id, created_at, id): GET /preapprovals/{employee_id} pages;
+  replaces ix_preapprovals_employee, whose leading column it covers
+
+Pages are read newest first as `(timestamp, id) < cursor`, so each page is a
+bounded range scan regardless of how much history the employee has.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_approvals_employee_requested_id", "approvals", ["employee_id", "requested_at", "id"]),
+    ("ix_preapprovals_employee_created_id", "preapprovals", ["employee_id", "created_at", "id"]),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index("ix_preapprovals_employee", table_name="preapprovals", postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_preapprovals_employee", "preapprovals", ["employee_id"],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
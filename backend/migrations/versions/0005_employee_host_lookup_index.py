@@ -0,0 +1,35 @@
+"""Expression index for case-insensitive host resolution
+
+- employees (lower(trim(name)), lower(trim(department))): visitor registration
+  and bulk import resolve their host on these normalized values instead of
+  two unindexed ILIKE scans
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_employees_host_lookup",
+            "employees",
+            [sa.text("lower(trim(name))"), sa.text("lower(trim(department))")],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_employees_host_lookup", table_name="employees", postgresql_concurrently=True, if_exists=True)
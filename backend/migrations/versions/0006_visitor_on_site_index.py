@@ -0,0 +1,50 @@
+"""Admission time and partial index for the on-site visitor roster
+
+- visitors.admitted_at: when the visit was first approved, by the host or by a
+  pre-approval at the gate; registration alone (pending, rejected, no-shows)
+  does not put anyone in the building. Backfilled from approved approvals
+- visitors (admitted_at, id) WHERE check_out IS NULL AND admitted_at IS NOT NULL:
+  the roster only touches admitted, open visits, so its cost tracks current
+  occupancy rather than total history
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+ON_SITE = "check_out IS NULL AND admitted_at IS NOT NULL"
+
+
+def upgrade() -> None:
+    op.add_column("visitors", sa.Column("admitted_at", sa.DateTime(timezone=True), nullable=True))
+    op.execute(
+        "UPDATE visitors SET admitted_at = ("
+        "SELECT min(approvals.decision_at) FROM approvals "
+        "WHERE approvals.visitor_id = visitors.id AND approvals.status = 'APPROVED')"
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_visitors_on_site",
+            "visitors",
+            ["admitted_at", "id"],
+            postgresql_where=sa.text(ON_SITE),
+            sqlite_where=sa.text(ON_SITE),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_visitors_on_site", table_name="visitors", postgresql_concurrently=True, if_exists=True)
+    op.drop_column("visitors", "admitted_at")
@@ -0,0 +1,63 @@
+"""Hourly visit analytics rollup
+
+- visit_rollups (day, hour, employee_id): registrations, decisions, checkouts
+  and on-site time per UTC hour and host, so reports never scan `visitors` or
+  `approvals`
+- Indexes on the timestamps nightly compaction recomputes a day from:
+  visitors check_in and check_out, approvals decision_at (the latter two
+  partial, as most rows are open or pending)
+
+The table starts empty; backfill history with
+`python -m app.jobs.compact_visit_rollups --since <first day>`.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+# Compaction's day-range lookups: (name, table, column, partial predicate)
+INDEXES = [
+    ("ix_visitors_check_in", "visitors", "check_in", None),
+    ("ix_visitors_check_out", "visitors", "check_out", "check_out IS NOT NULL"),
+    ("ix_approvals_decision_at", "approvals", "decision_at", "decision_at IS NOT NULL"),
+]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "visit_rollups",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("hour", sa.SmallInteger(), primary_key=True),
+        sa.Column("employee_id", sa.Integer(), sa.ForeignKey("employees.id"), primary_key=True),
+        sa.Column("registered", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("approved", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("rejected", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("checked_out", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("visit_seconds", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+
+    with op.get_context().autocommit_block():
+        for name, table, column, where in INDEXES:
+            op.create_index(
+                name, table, [column],
+                postgresql_where=sa.text(where) if where else None,
+                sqlite_where=sa.text(where) if where else None,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    op.drop_table("visit_rollups")
@@ -0,0 +1,148 @@
+"""Monthly range partitioning of visitors and approvals (PostgreSQL)
+
+- visitors by created_at and approvals by requested_at, one partition per UTC
+  month (`<table>_pYYYY_MM`) plus `<table>_default`: hot indexes are per month,
+  and expired months are archived and dropped whole by
+  `python -m app.jobs.maintain_partitions`
+- Primary keys become (id, <partition key>), as PostgreSQL requires; IDs still
+  come from the existing sequences. Lookups by id alone cannot be pruned and
+  probe each partition's key index, which the retention window keeps few
+- Foreign keys into visitors (approvals, preapprovals, visitor_daily_visits) are
+  dropped: a partitioned table cannot be referenced by id alone
+- Existing rows are copied into the new tables under an exclusive lock, so run
+  this in a maintenance window; partitions are created from the oldest row's
+  month through PARTITION_AHEAD_MONTHS ahead
+- SQLite (local development, benchmarks) stays unpartitioned
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+"""
+
+from datetime import date, datetime, timezone
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+PARTITION_AHEAD_MONTHS = 3
+
+# table -> (partition key, secondary indexes as (name, columns, partial predicate))
+TABLES = {
+    "visitors": ("created_at", [
+        ("ix_visitors_on_site", ["admitted_at", "id"], "check_out IS NULL AND admitted_at IS NOT NULL"),
+        ("ix_visitors_check_in", ["check_in"], None),
+        ("ix_visitors_check_out", ["check_out"], "check_out IS NOT NULL"),
+    ]),
+    "approvals": ("requested_at", [
+        ("ix_approvals_visitor_requested", ["visitor_id", "requested_at"], None),
+        ("ix_approvals_employee_requested_id", ["employee_id", "requested_at", "id"], None),
+        ("ix_approvals_visitor_status_decision", ["visitor_id", "status", "decision_at"], None),
+        ("ix_approvals_employee_status_requested", ["employee_id", "status", "requested_at"], None),
+        ("ix_approvals_employee_pending", ["employee_id", "requested_at"], "status = 'PENDING'"),
+        ("ix_approvals_decision_at", ["decision_at"], "decision_at IS NOT NULL"),
+    ]),
+}
+
+# Foreign keys from the partitioned tables, recreated on the new parents
+OUTBOUND_FOREIGN_KEYS = {
+    "approvals": [("approvals_employee_id_fkey", "employee_id", "employees")],
+}
+
+# Foreign keys into visitors(id), which cannot survive partitioning
+INBOUND_FOREIGN_KEYS = [
+    ("approvals_visitor_id_fkey", "approvals"),
+    ("preapprovals_visitor_id_fkey", "preapprovals"),
+    ("visitor_daily_visits_visitor_id_fkey", "visitor_daily_visits"),
+]
+
+
+def _month_start(value: datetime) -> date:
+    return value.astimezone(timezone.utc).date().replace(day=1)
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _bound(month: date) -> str:
+    return f"'{month.isoformat()} 00:00:00+00'"
+
+
+def _drop_secondary(table: str) -> None:
+    for name, _, _ in OUTBOUND_FOREIGN_KEYS.get(table, []):
+        op.drop_constraint(name, table, type_="foreignkey")
+    for name, _, _ in TABLES[table][1]:
+        op.drop_index(name, table_name=table)
+
+
+def _create_secondary(table: str) -> None:
+    for name, columns, where in TABLES[table][1]:
+        op.create_index(name, table, columns, postgresql_where=sa.text(where) if where else None)
+    for name, column, referenced in OUTBOUND_FOREIGN_KEYS.get(table, []):
+        op.create_foreign_key(name, table, referenced, [column], ["id"])
+
+
+def _swap(table: str, old: str, create: str, primary_key: str) -> None:
+    """Renames `table` to `old` and creates its (empty) replacement with `create`."""
+    _drop_secondary(table)
+    op.execute(f"ALTER TABLE {table} RENAME TO {old}")
+    op.execute(f"ALTER TABLE {old} RENAME CONSTRAINT {table}_pkey TO {old}_pkey")
+    op.execute(create)
+    op.execute(f"ALTER TABLE {table} ADD PRIMARY KEY ({primary_key})")
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    for name, table in INBOUND_FOREIGN_KEYS:
+        op.drop_constraint(name, table, type_="foreignkey")
+
+    current = _month_start(datetime.now(timezone.utc))
+    for table, (key, _) in TABLES.items():
+        old = f"{table}_unpartitioned"
+        op.execute(f"UPDATE {table} SET {key} = now() WHERE {key} IS NULL")
+        _swap(
+            table, old,
+            f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS) PARTITION BY RANGE ({key})",
+            f"id, {key}",
+        )
+
+        oldest = bind.execute(sa.text(f"SELECT min({key}) FROM {old}")).scalar()
+        month = min(_month_start(oldest), current) if oldest else current
+        while month <= _add_months(current, PARTITION_AHEAD_MONTHS):
+            op.execute(
+                f"CREATE TABLE {table}_p{month:%Y_%m} PARTITION OF {table} "
+                f"FOR VALUES FROM ({_bound(month)}) TO ({_bound(_add_months(month, 1))})"
+            )
+            month = _add_months(month, 1)
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+        op.execute(f"INSERT INTO {table} SELECT * FROM {old}")
+        op.execute(f"DROP TABLE {old}")
+        _create_secondary(table)
+        op.execute(f"ANALYZE {table}")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    for table in reversed(list(TABLES)):
+        old = f"{table}_partitioned"
+        _swap(table, old, f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS)", "id")
+        op.execute(f"INSERT INTO {table} SELECT * FROM {old}")
+        op.execute(f"DROP TABLE {old}")
+        _create_secondary(table)
+
+    # Archived months may have left rows pointing at visitors that no longer exist
+    for name, table in INBOUND_FOREIGN_KEYS:
+        op.create_foreign_key(name, table, "visitors", ["visitor_id"], ["id"], postgresql_not_valid=True)
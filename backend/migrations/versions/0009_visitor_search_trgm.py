@@ -0,0 +1,80 @@
+"""Trigram indexes for fuzzy visitor search (PostgreSQL)
+
+- Enables pg_trgm (a trusted extension: the database owner can create it)
+- GIN gin_trgm_ops indexes on visitors full_name, company and the contact's
+  lower-cased alphanumerics: they answer both `ILIKE '%...%'` and the
+  word-similarity operator `<%` behind `/visitors/search`
+- visitors is partitioned (0008), and CONCURRENTLY is not supported on a
+  partitioned table: each index is declared ON ONLY the parent, built
+  concurrently on every partition and attached, so registrations keep flowing
+  during the build. Partitions created later get the indexes when attached
+- SQLite (local development, benchmarks) uses the in-process search index instead
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+# index suffix -> indexed expression; the contact expression must match CONTACT_SEARCH_KEY in visitor_repo
+INDEXES = {
+    "full_name_trgm": "full_name",
+    "company_trgm": "company",
+    "contact_trgm": "(lower(regexp_replace(contact, '[^[:alnum:]]', '', 'g')))",
+}
+
+
+def _partitions(bind) -> list[str]:
+    return list(bind.execute(sa.text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE parent.relname = 'visitors' ORDER BY child.relname"
+    )).scalars())
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    partitioned = bind.execute(sa.text(
+        "SELECT relkind::text FROM pg_class WHERE relname = 'visitors' AND relkind IN ('r', 'p')"
+    )).scalar() == "p"
+
+    with op.get_context().autocommit_block():
+        for suffix, expression in INDEXES.items():
+            name = f"ix_visitors_{suffix}"
+            using = f"USING gin ({expression} gin_trgm_ops)"
+            if not partitioned:
+                op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON visitors {using}")
+                continue
+            # Invalid until every partition's index is attached
+            op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON ONLY visitors {using}")
+            for partition in _partitions(bind):
+                child = f"{partition}_{suffix}"
+                op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {child} ON {partition} {using}")
+                attached = bind.execute(sa.text(
+                    "SELECT 1 FROM pg_inherits JOIN pg_class c ON c.oid = pg_inherits.inhrelid "
+                    "WHERE c.relname = :child"
+                ), {"child": child}).scalar()
+                if not attached:
+                    op.execute(f"ALTER INDEX {name} ATTACH PARTITION {child}")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    # pg_trgm itself is left installed; other objects may depend on it
+    for suffix in INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS ix_visitors_{suffix}")
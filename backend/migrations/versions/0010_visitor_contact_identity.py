@@ -0,0 +1,72 @@
+"""Expression index for recognizing returning visitors
+
+- visitors (normalized contact, id): registration looks up the visitor's latest
+  earlier visit by contact to reuse the stored photo. The contact is lower-cased
+  with spaces, dashes, brackets and dots removed using plain replace(), so the
+  same index serves SQLite and PostgreSQL
+- On PostgreSQL visitors is partitioned (0008): the index is declared ON ONLY the
+  parent, built concurrently on every partition and attached, as in 0009
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+NAME = "ix_visitors_contact_identity"
+SUFFIX = "contact_identity"
+
+# Must match contact_identity() in app/models.py
+CONTACT_IDENTITY = (
+    "lower(replace(replace(replace(replace(replace("
+    "contact, ' ', ''), '-', ''), '(', ''), ')', ''), '.', ''))"
+)
+
+
+def _partitions(bind) -> list[str]:
+    return list(bind.execute(sa.text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE parent.relname = 'visitors' ORDER BY child.relname"
+    )).scalars())
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    partitioned = bind.dialect.name == "postgresql" and bind.execute(sa.text(
+        "SELECT relkind::text FROM pg_class WHERE relname = 'visitors' AND relkind IN ('r', 'p')"
+    )).scalar() == "p"
+
+    with op.get_context().autocommit_block():
+        if not partitioned:
+            op.create_index(
+                NAME, "visitors", [sa.text(CONTACT_IDENTITY), sa.text("id")],
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+            return
+
+        columns = f"({CONTACT_IDENTITY}, id)"
+        # Invalid until every partition's index is attached
+        op.execute(f"CREATE INDEX IF NOT EXISTS {NAME} ON ONLY visitors {columns}")
+        for partition in _partitions(bind):
+            child = f"{partition}_{SUFFIX}"
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {child} ON {partition} {columns}")
+            attached = bind.execute(sa.text(
+                "SELECT 1 FROM pg_inherits JOIN pg_class c ON c.oid = pg_inherits.inhrelid "
+                "WHERE c.relname = :child"
+            ), {"child": child}).scalar()
+            if not attached:
+                op.execute(f"ALTER INDEX {NAME} ATTACH PARTITION {child}")
+
+
+def downgrade() -> None:
+    op.drop_index(NAME, table_name="visitors", if_exists=True)
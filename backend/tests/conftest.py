@@ -0,0 +1,63 @@
+"""
+tests/conftest.py — Shared fixtures: a migrated throwaway database and an in-process API client.
+
+The environment is set before any app module is imported, since configuration
+is read at import time. Tests run against a temporary SQLite file by default;
+set TEST_DATABASE_URL to an empty database to run them elsewhere (PostgreSQL).
+
+    cd backend && python -m pytest
+"""
+
+import os
+import tempfile
+
+_tmp = tempfile.mkdtemp(prefix="vms-tests-")
+os.environ.update(
+    DATABASE_URL=os.getenv("TEST_DATABASE_URL", f"sqlite:///{_tmp}/test.sqlite"),
+    QUERY_BUDGET_MODE="strict",
+    EMAIL_TRANSPORT="memory",
+    STORAGE_BACKEND="local",
+    LOCAL_STORAGE_ROOT=os.path.join(_tmp, "media"),
+    LOG_FILE="",
+    LOG_LEVEL="WARNING",
+)
+
+import httpx
+import pytest
+from alembic import command
+from alembic.config import Config
+from app.core.config import AsyncSessionLocal, engine
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="session", autouse=True)
+def migrated_database():
+    """Builds the schema with the project's migrations, once per run."""
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    command.upgrade(config, "head")
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def client():
+    """API client running the app's lifespan, so background workers start and stop per test."""
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            yield http
+
+
+@pytest.fixture
+async def db():
+    async with AsyncSessionLocal() as session:
+        yield session
+    # Pooled connections belong to this test's event loop
+    await engine.dispose()
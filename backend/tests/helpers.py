@@ -0,0 +1,55 @@
+"""
+tests/helpers.py — Builders for the rows and credentials the tests need.
+"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from app.models import Employee, Visitor, Approval, ApprovalStatus
+from app.utils.auth import create_access_token
+
+
+def auth_headers(employee: Employee) -> dict:
+    token = create_access_token({"sub": employee.email, "id": employee.id})
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def create_employee(db, name: str | None = None, department: str = "Engineering") -> Employee:
+    """Adds an employee with a unique name and email and commits it."""
+    suffix = uuid.uuid4().hex[:8]
+    employee = Employee(
+        name=name or f"Host {suffix}",
+        department=department,
+        email=f"host-{suffix}@example.com",
+        password="not-a-hash",
+    )
+    db.add(employee)
+    await db.commit()
+    return employee
+
+
+async def create_visitor(db, host: Employee, status: ApprovalStatus | None = ApprovalStatus.PENDING) -> Visitor:
+    """Adds a visitor for `host`, with an approval in `status` unless it is None, and commits."""
+    suffix = uuid.uuid4().hex[:8]
+    visitor = Visitor(
+        full_name=f"Visitor {suffix}",
+        contact=f"visitor-{suffix}@example.com",
+        purpose="Meeting",
+        host_employee_name=host.name,
+        host_department=host.department,
+    )
+    db.add(visitor)
+    await db.flush()
+    if status is not None:
+        now = datetime.now(timezone.utc)
+        decided = status != ApprovalStatus.PENDING
+        db.add(Approval(
+            visitor_id=visitor.id,
+            employee_id=host.id,
+            status=status,
+            requested_at=now - timedelta(minutes=5),
+            decision_at=now if decided else None,
+        ))
+        if status == ApprovalStatus.APPROVED:
+            visitor.admitted_at = now
+    await db.commit()
+    return visitor
@@ -0,0 +1,63 @@
+"""
+tests/test_batch_action.py — Batch decisions only touch the caller's approvals and report the rest as skipped.
+"""
+
+import pytest
+from sqlalchemy import select
+from app.models import Approval, ApprovalStatus, Visitor
+from tests.helpers import auth_headers, create_employee, create_visitor
+
+pytestmark = pytest.mark.anyio
+
+
+async def approval_ids(db, visitors) -> list[int]:
+    rows = await db.scalars(
+        select(Approval.id).filter(Approval.visitor_id.in_([v.id for v in visitors])).order_by(Approval.id)
+    )
+    return list(rows)
+
+
+async def test_batch_updates_only_own_pending_approvals(client, db):
+    host, other = await create_employee(db), await create_employee(db)
+    own = await approval_ids(db, [await create_visitor(db, host) for _ in range(3)])
+    already = await approval_ids(db, [await create_visitor(db, host, status=ApprovalStatus.APPROVED)])
+    foreign = await approval_ids(db, [await create_visitor(db, other)])
+    missing = max(own + already + foreign) + 1000
+
+    requested = [*own, own[0], *already, *foreign, missing]
+    response = await client.post(
+        "/approvals/batch-action",
+        json={"approval_ids": requested, "status": "APPROVED"},
+        headers=auth_headers(host),
+    )
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["updated"] == own
+    assert body["skipped"] == [*already, *foreign, missing]
+
+    statuses = dict((await db.execute(
+        select(Approval.id, Approval.status).filter(Approval.id.in_(own + foreign))
+    )).all())
+    assert all(statuses[i] == ApprovalStatus.APPROVED for i in own)
+    assert statuses[foreign[0]] == ApprovalStatus.PENDING
+
+    admitted = await db.scalars(
+        select(Visitor.admitted_at).join(Approval, Approval.visitor_id == Visitor.id).filter(Approval.id.in_(own))
+    )
+    assert all(at is not None for at in admitted)
+
+
+async def test_batch_rejects_pending_status(client, db):
+    host = await create_employee(db)
+    ids = await approval_ids(db, [await create_visitor(db, host)])
+    response = await client.post(
+        "/approvals/batch-action",
+        json={"approval_ids": ids, "status": "PENDING"},
+        headers=auth_headers(host),
+    )
+    assert response.status_code == 400
+
+
+async def test_batch_requires_authentication(client):
+    response = await client.post("/approvals/batch-action", json={"approval_ids": [1], "status": "APPROVED"})
+    assert response.status_code == 422
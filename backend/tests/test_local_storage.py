@@ -0,0 +1,44 @@
+"""
+tests/test_local_storage.py — LocalStorage keeps every resolved media path inside its root.
+"""
+
+import os
+import pytest
+from app.utils.storage import LocalStorage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return LocalStorage(root=str(tmp_path / "media"), base_url="http://test/media")
+
+
+def test_saved_object_resolves_inside_root(storage):
+    url = storage.save("visitors/abcd1234.webp", b"image", "image/webp")
+    relative = url.removeprefix("http://test/media/")
+    assert relative == "visitors/ab/cd/abcd1234.webp"
+
+    path = storage.resolve(relative)
+    with open(path, "rb") as f:
+        assert f.read() == b"image"
+
+
+@pytest.mark.parametrize("relative", [
+    "../secret.txt",
+    "visitors/../../secret.txt",
+    "/etc/passwd",
+    "visitors/ab/../../../secret.txt",
+])
+def test_path_traversal_is_rejected(storage, relative):
+    assert storage.resolve(relative) is None
+
+
+def test_symlink_out_of_root_is_rejected(storage, tmp_path):
+    (tmp_path / "secret.txt").write_text("secret")
+    os.symlink(tmp_path / "secret.txt", os.path.join(storage.root, "link.txt"))
+    assert storage.resolve("link.txt") is None
+
+
+def test_root_prefix_sibling_is_rejected(storage, tmp_path):
+    sibling = tmp_path / "media-other"
+    sibling.mkdir()
+    assert storage.resolve("../media-other/file") is None
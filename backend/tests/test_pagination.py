@@ -0,0 +1,69 @@
+"""
+tests/test_pagination.py — Keyset cursors: encoding round-trips and walking a listing page by page.
+"""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+import pytest
+from app.utils.pagination import (
+    NEXT_CURSOR_HEADER, decode_cursor, decode_rank_cursor, encode_cursor, encode_rank_cursor, paginate
+)
+from tests.helpers import auth_headers, create_employee, create_visitor
+
+
+def test_cursor_round_trip():
+    value = datetime(2026, 10, 18, 9, 30, 15, 123456, tzinfo=timezone.utc)
+    cursor = encode_cursor(value, 42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (value, 42)
+
+
+def test_rank_cursor_round_trip():
+    assert decode_rank_cursor(encode_rank_cursor(0.8125, 7)) == (0.8125, 7)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", encode_rank_cursor(0.5, 1)[:-2], "W10"])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_paginate_sets_cursor_only_when_rows_remain():
+    now = datetime.now(timezone.utc)
+    rows = [SimpleNamespace(id=i, requested_at=now - timedelta(minutes=i)) for i in range(1, 5)]
+
+    page = paginate(rows, 3, "requested_at")
+    assert page.items == rows[:3]
+    assert decode_cursor(page.next_cursor) == (rows[2].requested_at, 3)
+
+    assert paginate(rows[:3], 3, "requested_at").next_cursor is None
+    assert paginate(rows, None, "requested_at").items == rows
+
+
+@pytest.mark.anyio
+async def test_listing_pages_cover_every_row_once(client, db):
+    host = await create_employee(db)
+    visitors = [await create_visitor(db, host) for _ in range(7)]
+    headers = auth_headers(host)
+
+    seen, params = [], {"limit": 3}
+    while True:
+        response = await client.get(f"/approvals/{host.id}", headers=headers, params=params)
+        assert response.status_code == 200, response.text
+        seen.extend(a["id"] for a in response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            break
+        params = {"limit": 3, "cursor": cursor}
+
+    unpaged = await client.get(f"/approvals/{host.id}", headers=headers)
+    assert [a["id"] for a in unpaged.json()] == seen
+    assert len(seen) == len(set(seen)) == len(visitors)
+    assert NEXT_CURSOR_HEADER not in unpaged.headers
+
+
+@pytest.mark.anyio
+async def test_invalid_cursor_is_a_client_error(client, db):
+    host = await create_employee(db)
+    response = await client.get(f"/approvals/{host.id}", headers=auth_headers(host), params={"cursor": "bogus"})
+    assert response.status_code == 400
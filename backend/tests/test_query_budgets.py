@@ -0,0 +1,145 @@
+"""
+tests/test_query_budgets.py — Drives the hot routes with QUERY_BUDGET_MODE=strict.
+
+An overrun turns the response into a 500 naming the route, so every request
+below fails as soon as a route issues more statements than ROUTE_QUERY_BUDGETS allows.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+import pytest
+from sqlalchemy import select
+from app.core import query_budget
+from app.core.query_budget import QUERY_COUNT_HEADER, budget_for
+from app.models import Approval, ApprovalStatus
+from tests.helpers import auth_headers, create_employee, create_visitor
+
+pytestmark = pytest.mark.anyio
+
+
+def assert_within_budget(response, method: str, route: str, expected_status: int = 200):
+    assert response.status_code == expected_status, response.text
+    assert int(response.headers[QUERY_COUNT_HEADER]) <= budget_for(method, route)
+
+
+async def preapprove(client, host, visitor) -> None:
+    now = datetime.now(timezone.utc)
+    response = await client.post("/preapprovals/", headers=auth_headers(host), json={
+        "visitor_id": visitor.id,
+        "employee_id": host.id,
+        "valid_from": (now - timedelta(hours=1)).isoformat(),
+        "valid_to": (now + timedelta(hours=8)).isoformat(),
+        "max_visits_per_day": 2,
+    })
+    assert response.status_code == 201, response.text
+
+
+async def test_registration_and_gate_flow(client, db):
+    host = await create_employee(db)
+    response = await client.post("/visitors/register", json={
+        "full_name": "Ada Lovelace",
+        "contact": "+44 20 7946 0000",
+        "company": "Analytical Engines",
+        "purpose": "Design review",
+        "host_employee_name": host.name.upper(),
+        "host_department": host.department.lower(),
+    })
+    assert_within_budget(response, "POST", "/visitors/register", 201)
+    visitor_id = response.json()["id"]
+
+    response = await client.post(f"/visitors/{visitor_id}/scan")
+    assert_within_budget(response, "POST", "/visitors/{visitor_id}/scan")
+    assert response.json()["allowed"] is False
+
+    response = await client.get(f"/visitors/{visitor_id}")
+    assert_within_budget(response, "GET", "/visitors/{visitor_id}")
+
+    response = await client.patch(f"/visitors/{visitor_id}/checkout")
+    assert_within_budget(response, "PATCH", "/visitors/{visitor_id}/checkout")
+
+
+async def test_get_visitor_auto_approves_within_budget(client, db):
+    host = await create_employee(db)
+    visitor = await create_visitor(db, host, status=None)
+    await preapprove(client, host, visitor)
+
+    response = await client.get(f"/visitors/{visitor.id}")
+    assert_within_budget(response, "GET", "/visitors/{visitor_id}")
+    assert response.json()["approval"]["status"] == "APPROVED"
+
+    response = await client.post(f"/visitors/{visitor.id}/scan")
+    assert_within_budget(response, "POST", "/visitors/{visitor_id}/scan")
+    assert response.json()["allowed"] is True
+    assert response.json()["auto_approved"] is False
+
+
+async def test_scan_auto_approves_within_budget(client, db):
+    host = await create_employee(db)
+    visitor = await create_visitor(db, host)
+    await preapprove(client, host, visitor)
+
+    response = await client.post(f"/visitors/{visitor.id}/scan")
+    assert_within_budget(response, "POST", "/visitors/{visitor_id}/scan")
+    assert response.json()["auto_approved"] is True
+
+
+async def test_host_listings_and_decisions(client, db):
+    host = await create_employee(db)
+    visitors = [await create_visitor(db, host) for _ in range(3)]
+    headers = auth_headers(host)
+
+    response = await client.get(f"/approvals/{host.id}", headers=headers)
+    assert_within_budget(response, "GET", "/approvals/{employee_id}")
+    approvals = response.json()
+    assert {a["visitor_id"] for a in approvals} == {v.id for v in visitors}
+
+    response = await client.post(f"/approvals/{approvals[0]['id']}/action", json={"status": "APPROVED"})
+    assert_within_budget(response, "POST", "/approvals/{approval_id}/action")
+
+    response = await client.get(f"/preapprovals/{host.id}", headers=headers)
+    assert_within_budget(response, "GET", "/preapprovals/{employee_id}")
+
+    response = await client.get("/visitors/on-site", headers=headers, params={"host": host.name})
+    assert_within_budget(response, "GET", "/visitors/on-site")
+    assert [v["id"] for v in response.json()] == [approvals[0]["visitor_id"]]
+
+    response = await client.get("/visitors/search", headers=headers, params={"q": visitors[1].full_name})
+    assert_within_budget(response, "GET", "/visitors/search")
+    assert visitors[1].id in [v["id"] for v in response.json()]
+
+
+async def test_reports_and_export(client, db):
+    host = await create_employee(db)
+    await create_visitor(db, host, status=ApprovalStatus.APPROVED)
+    headers = auth_headers(host)
+
+    response = await client.get("/reports/visits", headers=headers, params={"start": date.today().isoformat()})
+    assert_within_budget(response, "GET", "/reports/visits")
+
+    response = await client.get("/visitors/export", headers=headers)
+    assert_within_budget(response, "GET", "/visitors/export")
+
+
+async def test_login_within_budget(client, db):
+    from app.utils.auth import hash_password
+
+    host = await create_employee(db)
+    host.password = hash_password("correct horse")
+    await db.commit()
+
+    response = await client.post("/auth/login", json={"email": host.email, "password": "correct horse"})
+    assert_within_budget(response, "POST", "/auth/login")
+
+
+async def test_strict_overrun_replaces_response_after_commit(client, db, monkeypatch):
+    """The budget is checked once the handler has committed: the write stays applied."""
+    host = await create_employee(db)
+    visitor = await create_visitor(db, host)
+    approval_id = await db.scalar(select(Approval.id).filter_by(visitor_id=visitor.id))
+    monkeypatch.setitem(query_budget.QUERY_BUDGETS, "POST /approvals/{approval_id}/action", 0)
+
+    response = await client.post(f"/approvals/{approval_id}/action", json={"status": "REJECTED"})
+    assert response.status_code == 500
+    assert "Query budget exceeded for POST /approvals/{approval_id}/action" in response.json()["detail"]
+
+    db.expire_all()
+    assert await db.scalar(select(Approval.status).filter_by(id=approval_id)) == ApprovalStatus.REJECTED
@@ -0,0 +1,48 @@
+"""
+tests/test_token_cache.py — Cached JWT payloads stop being served once the token expires.
+"""
+
+from datetime import timedelta
+from app.utils import auth
+from app.utils.auth import TokenCache, create_access_token, decode_token_cached
+
+
+def test_entry_expires_with_the_token(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(auth.time, "time", lambda: clock[0])
+    cache = TokenCache()
+    cache.put(b"digest", {"id": 1, "exp": 1060})
+
+    assert cache.get(b"digest") == {"id": 1, "exp": 1060}
+    clock[0] = 1060
+    assert cache.get(b"digest") is None
+    clock[0] = 1000
+    assert cache.get(b"digest") is None  # dropped, not just hidden
+
+
+def test_tokens_without_expiry_are_not_cached():
+    cache = TokenCache()
+    cache.put(b"digest", {"id": 1})
+    assert cache.get(b"digest") is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TokenCache(max_entries=2)
+    cache.put(b"a", {"exp": 2**40})
+    cache.put(b"b", {"exp": 2**40})
+    cache.get(b"a")
+    cache.put(b"c", {"exp": 2**40})
+    assert cache.get(b"b") is None
+    assert cache.get(b"a") is not None
+
+
+def test_cached_payload_is_a_copy():
+    cache = TokenCache()
+    cache.put(b"digest", {"id": 1, "exp": 2**40})
+    cache.get(b"digest")["id"] = 2
+    assert cache.get(b"digest")["id"] == 1
+
+
+def test_expired_token_is_rejected():
+    token = create_access_token({"id": 1}, expires_delta=timedelta(seconds=-1))
+    assert decode_token_cached(token) is None
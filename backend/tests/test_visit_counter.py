@@ -0,0 +1,40 @@
+"""
+tests/test_visit_counter.py — The conditional upsert never counts past the daily limit, even under concurrent scans.
+"""
+
+import asyncio
+from datetime import date
+import pytest
+from app.core.config import AsyncSessionLocal
+from app.repos.visit_counter_repo import VisitCounterRepository
+from tests.helpers import create_employee, create_visitor
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_try_increment_stops_at_limit(db):
+    visitor = await create_visitor(db, await create_employee(db))
+    repo = VisitCounterRepository(db)
+    today = date.today()
+
+    assert [await repo.try_increment(visitor.id, today, 2) for _ in range(3)] == [1, 2, None]
+    assert await repo.try_increment(visitor.id, today, 0) is None
+    await db.commit()
+    assert await repo.get_count(visitor.id, today) == 2
+
+
+async def test_concurrent_scans_respect_limit(db):
+    visitor = await create_visitor(db, await create_employee(db))
+    today = date.today()
+    limit = 3
+
+    async def scan() -> int | None:
+        async with AsyncSessionLocal() as session:
+            counted = await VisitCounterRepository(session).try_increment(visitor.id, today, limit)
+            await session.commit()
+            return counted
+
+    results = await asyncio.gather(*(scan() for _ in range(10)))
+    assert sorted(r for r in results if r is not None) == [1, 2, 3]
+    assert results.count(None) == 10 - limit
+    assert await VisitCounterRepository(db).get_count(visitor.id, today) == limit